@@ -0,0 +1,41 @@
+"""Batch commute computation endpoints."""
+from fastapi import APIRouter, HTTPException
+from ..schemas.commute import CommuteFillRequest, CommuteFillResponse
+from ..services.content.commute import CommuteCalculator
+from ..services.sources.amap import get_amap_source
+
+router = APIRouter(prefix="/commute", tags=["Commute"])
+
+
+@router.post("/fill", response_model=CommuteFillResponse)
+async def fill_commutes(request: CommuteFillRequest):
+    """
+    批量计算通勤
+    
+    接收单天 (`day`) 或整个行程 (`trip`)，并发计算所有相邻节点之间的路线，
+    返回填充好 `to_next_commute` 的结果。路线按量化后的起终点与出行方式缓存。
+    """
+    amap = get_amap_source()
+    if not amap.key_pool:
+        raise HTTPException(status_code=503, detail="数据源错误: AMAP_KEY_WEB not configured")
+    
+    calculator = CommuteCalculator(amap, max_concurrency=amap.settings.AMAP_MAX_CONCURRENT_ROUTES)
+    
+    if request.trip is not None:
+        trip = await calculator.fill_trip(
+            request.trip, mode=request.mode, overwrite=request.overwrite, city=request.city
+        )
+        return CommuteFillResponse(
+            trip=trip,
+            legs_computed=calculator.legs_computed,
+            legs_failed=calculator.legs_failed,
+        )
+    
+    day = await calculator.fill_day(
+        request.day, request.city, mode=request.mode, overwrite=request.overwrite
+    )
+    return CommuteFillResponse(
+        day=day,
+        legs_computed=calculator.legs_computed,
+        legs_failed=calculator.legs_failed,
+    )
@@ -1,126 +1,766 @@
 """Content API endpoints for searching attractions, hotels, dining, etc."""
-from fastapi import APIRouter, Query, HTTPException
+import asyncio
+import json
+from typing import Any, AsyncIterator, Literal
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import Session
+from ..db.base import get_db
+from ..models.favorite import Favorite
+from ..models.itinerary import ItineraryPlan
+from ..models.user import User
+from ..schemas.itinerary import TripContent
 from ..schemas.content import (
     ContentCategory,
     DataSource,
+    ContentCityGroup,
+    ContentCluster,
+    ContentClusterResponse,
     ContentSearchResponse,
+    ContentSuggestResponse,
+    ContentDetailResponse,
+    ContentDetailsRequest,
+    ContentDetailsResponse,
     AttractionItem,
     DiningItem,
     HotelItem,
     GeoLocation,
 )
-from ..services.sources.amap import AmapSource
+from .deps import get_optional_user
+from ..services.content.aggregator import AMAP_CATEGORY_MAP, SOURCE_REGISTRY, ContentAggregator
+from ..services.content.cluster import build_index, get_cluster_service
+from ..services.content.prefetch import get_plan_prefetcher
+from ..services.content.rank import rerank_by_anchors
+from ..services.content.resolve import resolve_entities
+from ..services.content.suggest import get_suggest_service
+from ..services.content.warmer import get_cache_warmer
+from ..services.media.thumbnails import get_thumbnail_cache
+from ..services.sources.amap import get_amap_source
+from ..services.sources.geo import parse_coord
+from ..services.sources.local import get_local_poi_source
+from ..services.sources.snapshot import PoiSnapshot, get_poi_snapshot
 
 router = APIRouter(prefix="/content", tags=["content"])
 
-# 高德 POI 类型映射
-AMAP_CATEGORY_MAP = {
-    ContentCategory.ATTRACTION: "风景名胜|旅游景点",
-    ContentCategory.HOTEL: "住宿服务",
-    ContentCategory.DINING: "餐饮服务",
-}
+
+# 单次请求最多同时搜索的城市数
+MAX_SEARCH_CITIES = 5
 
 
 @router.get("/search", response_model=ContentSearchResponse)
 async def search_content(
     keyword: str = Query(..., description="搜索关键词"),
-    city: str = Query(..., description="城市名称"),
+    city: list[str] = Query(..., description="城市名称，可重复传入以同时搜索多个城市"),
     category: ContentCategory | None = Query(None, description="内容类别"),
+    sources: list[DataSource] = Query([], description="数据源，可重复传入；为空时仅使用高德"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=50, description="每页数量"),
+    mode: Literal["full", "list"] = Query("full", description="list 模式只请求列表所需的基础字段"),
+    fields: str | None = Query(None, description="返回的条目字段，逗号分隔，如 name,location,rating"),
+    anchor: str | None = Query(None, description="重排锚点坐标，如当天节点 \"lng,lat;lng,lat\""),
+    plan_id: str | None = Query(None, description="以该行程某天的节点为重排锚点（需登录）"),
+    day: int | None = Query(None, ge=1, description="与 plan_id 一起使用的 day_index"),
+    current_user: User | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
 ):
     """
     搜索内容（景点/住宿/美食）
     
-    目前支持高德地图 POI 数据源，后续扩展携程、小红书等。
+    并发查询所有请求的数据源（高德、小红书等），每个数据源有独立的截止时间
+    (`CONTENT_SOURCE_DEADLINES`)，超时的数据源列在 `sources_timed_out` 中，
+    不影响其他数据源按时返回。多数据源结果会做实体消解，同一地点合并为一条并在
+    `provenance` 中保留全部来源。高德不可用时返回最近一次成功的结果，并标记 `stale=true`。
+    
+    `mode=list` 时高德使用 `extensions=base`，不返回评分、营业时间、照片等详情字段，
+    需要时按 `source_id` 单独获取详情。`fields` 只裁剪返回的 JSON，
+    `source`、`source_id` 总会保留。
+    
+    传入多个 `city` 时各城市并发搜索（共享高德缓存与 Key 池），结果按城市分组在 `groups` 中，
+    每组有各自的 `total`；顶层 `items` 为空，`total` 为各城市之和。单个城市失败只在该组的
+    `error` 中体现，全部失败时返回 503（均因高德限流失败时返回 429）。
+    
+    传入 `anchor`（或 `plan_id` + `day`）时，当前页结果按综合得分重排：数据源原始排名、
+    评分以及到最近锚点的距离，向量化计算。
+    """
+    cities = list(dict.fromkeys(c.strip() for c in city if c.strip()))
+    if not cities:
+        raise HTTPException(status_code=400, detail="城市不能为空")
+    if len(cities) > MAX_SEARCH_CITIES:
+        raise HTTPException(status_code=400, detail=f"最多同时搜索 {MAX_SEARCH_CITIES} 个城市")
+    
+    anchors = _parse_anchors(anchor) if anchor else []
+    if plan_id:
+        anchors += _plan_day_anchors(db, current_user, plan_id, day)
+    
+    aggregator = ContentAggregator()
+    
+    async def search_city(name: str) -> ContentCityGroup:
+        group = await _search_city(
+            aggregator, keyword, name, category, sources or [DataSource.AMAP],
+            page, page_size, lightweight=mode == "list",
+        )
+        if anchors:
+            group.items = rerank_by_anchors(group.items, anchors)
+        return group
+    
+    if len(cities) == 1:
+        group = await search_city(cities[0])
+        if group.error:
+            raise HTTPException(
+                status_code=429 if group.rate_limited else 503,
+                detail=f"数据源错误: {group.error}",
+            )
+        response = ContentSearchResponse.model_construct(
+            items=group.items,
+            total=group.total,
+            page=page,
+            page_size=page_size,
+            sources_used=group.sources_used,
+            sources_timed_out=group.sources_timed_out,
+            sources_failed=group.sources_failed,
+            stale=group.stale,
+        )
+        if fields:
+            payload = response.model_dump(mode="json", exclude={"items", "groups"})
+            payload["items"] = _dump_items(response.items, _parse_fields(fields))
+            return JSONResponse(payload)
+        return _json_response(response)
+    
+    groups = await asyncio.gather(*(search_city(name) for name in cities))
+    if all(g.error for g in groups):
+        raise HTTPException(
+            status_code=429 if all(g.rate_limited for g in groups) else 503,
+            detail=f"数据源错误: {'; '.join(f'{g.city}: {g.error}' for g in groups)}"
+        )
+    
+    response = ContentSearchResponse.model_construct(
+        items=[],
+        total=sum(g.total for g in groups),
+        page=page,
+        page_size=page_size,
+        sources_used=list(dict.fromkeys(s for g in groups for s in g.sources_used)),
+        sources_timed_out=list(dict.fromkeys(s for g in groups for s in g.sources_timed_out)),
+        sources_failed=list(dict.fromkeys(s for g in groups for s in g.sources_failed)),
+        stale=any(g.stale for g in groups),
+        groups=groups,
+    )
+    if fields:
+        item_fields = _parse_fields(fields)
+        payload = response.model_dump(mode="json", exclude={"groups"})
+        payload["groups"] = [
+            {**g.model_dump(mode="json", exclude={"items"}), "items": _dump_items(g.items, item_fields)}
+            for g in groups
+        ]
+        return JSONResponse(payload)
+    return _json_response(response)
+
+
+@router.get("/search/stream")
+async def search_content_stream(
+    keyword: str = Query(..., description="搜索关键词"),
+    city: str = Query(..., description="城市名称"),
+    category: ContentCategory | None = Query(None, description="内容类别"),
+    sources: list[DataSource] = Query([], description="数据源，可重复传入；为空时仅使用高德"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=50, description="每页数量"),
+    mode: Literal["full", "list"] = Query("full", description="list 模式只请求列表所需的基础字段"),
+    fields: str | None = Query(None, description="返回的条目字段，逗号分隔，如 name,location,rating"),
+    stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format", description="流格式"),
+):
+    """
+    流式搜索内容
+    
+    参数与 `/content/search` 相同。每个数据源（高德多分页时为每个分页）返回即推送一帧
+    `{"type": "items", "source": ..., "items": [...]}`，最后推送一帧 `{"type": "summary", ...}`，
+    字段与 `ContentSearchResponse` 除 `items` 外一致。流式结果不做跨数据源实体消解。
     """
-    amap = AmapSource()
+    aggregator = ContentAggregator()
+    item_fields = _parse_fields(fields) if fields else None
+    suggest = get_suggest_service()
+    
+    async def frames() -> AsyncIterator[dict[str, Any]]:
+        totals: dict[DataSource, int] = {}
+        timed_out: list[DataSource] = []
+        failed: list[DataSource] = []
+        stale = False
+        query_observed = False
+        async for chunk in aggregator.stream(
+            keyword=keyword,
+            city=city,
+            category=category,
+            sources=sources or [DataSource.AMAP],
+            page=page,
+            page_size=page_size,
+            lightweight=mode == "list",
+        ):
+            if chunk.timed_out:
+                timed_out.append(chunk.source)
+                continue
+            if chunk.result is None:
+                failed.append(chunk.source)
+                continue
+            
+            result = chunk.result
+            totals[chunk.source] = max(totals.get(chunk.source, 0), result.total_count)
+            stale = stale or result.stale
+            if chunk.source == DataSource.AMAP:
+                suggest.observe_pois(city, result.data)
+                if not query_observed and result.data:
+                    suggest.observe_query(city, keyword, result.data)
+                    query_observed = True
+            items = [
+                item for item in (_convert_poi_to_item(poi, category) for poi in result.data)
+                if item
+            ]
+            yield {
+                "type": "items",
+                "source": chunk.source.value,
+                "items": _dump_items(items, item_fields),
+            }
+        
+        yield {
+            "type": "summary",
+            "total": sum(totals.values()),
+            "page": page,
+            "page_size": page_size,
+            "sources_used": [s.value for s in totals],
+            "sources_timed_out": [s.value for s in timed_out],
+            "sources_failed": [s.value for s in failed if s not in totals],
+            "stale": stale,
+        }
     
-    # 获取高德 POI 类型
-    amap_type = AMAP_CATEGORY_MAP.get(category) if category else None
+    async def encode() -> AsyncIterator[str]:
+        async for frame in frames():
+            data = json.dumps(frame, ensure_ascii=False)
+            if stream_format == "sse":
+                yield f"event: {frame['type']}\ndata: {data}\n\n"
+            else:
+                yield data + "\n"
     
-    result = await amap.search(
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        encode(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/suggest", response_model=ContentSuggestResponse)
+async def suggest_content(
+    q: str = Query(..., min_length=1, description="已输入的前缀"),
+    city: str = Query(..., description="城市名称"),
+    limit: int = Query(8, ge=1, le=20, description="返回数量（不超过 SUGGEST_TOP_K）"),
+):
+    """
+    搜索联想
+    
+    从内存前缀树返回以 `q` 开头、热度最高的 POI 名称与历史搜索词，不请求高德；
+    用户确认输入后再调用 `/content/search` 做完整搜索。
+    """
+    suggestions = await get_suggest_service().suggest(city, q, limit)
+    return ContentSuggestResponse(q=q, city=city, suggestions=suggestions)
+
+
+@router.get("/around", response_model=ContentSearchResponse)
+async def search_around(
+    lng: float = Query(..., ge=-180, le=180, description="中心点经度"),
+    lat: float = Query(..., ge=-90, le=90, description="中心点纬度"),
+    radius: int = Query(1000, ge=50, le=20000, description="搜索半径（米）"),
+    category: ContentCategory | None = Query(None, description="内容类别"),
+    keyword: str | None = Query(None, description="可选关键词"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=50, description="每页数量"),
+):
+    """
+    周边搜索（景点/住宿/美食）
+    
+    查询范围按 geohash 瓦片拆分并分别缓存，结果按距离由近到远排序。
+    POI 密集的瓦片细分后仍超出拉取上限时，响应中 `truncated=true`。
+    """
+    amap = get_amap_source()
+    
+    result = await amap.search_around(
+        lng=lng,
+        lat=lat,
+        radius=radius,
+        category=AMAP_CATEGORY_MAP.get(category) if category else None,
         keyword=keyword,
-        city=city,
-        category=amap_type,
         page=page,
         page_size=page_size,
     )
     
     if not result.success:
         raise HTTPException(
-            status_code=503,
+            status_code=429 if result.rate_limited else 503,
             detail=f"数据源错误: {result.error}"
         )
     
-    # 转换为统一格式
     items = []
     for poi in result.data:
         item = _convert_poi_to_item(poi, category)
         if item:
             items.append(item)
     
-    return ContentSearchResponse(
+    return _json_response(ContentSearchResponse.model_construct(
         items=items,
         total=result.total_count,
         page=page,
         page_size=page_size,
         sources_used=[DataSource.AMAP],
+        truncated=result.truncated,
+    ))
+
+
+@router.get("/nearest", response_model=ContentSearchResponse)
+async def nearest_pois(
+    city: str = Query(..., description="城市名称（需已生成离线快照）"),
+    lng: float = Query(..., ge=-180, le=180, description="中心点经度"),
+    lat: float = Query(..., ge=-90, le=90, description="中心点纬度"),
+    k: int = Query(10, ge=1, le=200, description="返回数量"),
+    radius: int = Query(3000, ge=50, le=20000, description="搜索半径（米）"),
+    category: ContentCategory | None = Query(None, description="内容类别"),
+):
+    """
+    最近 POI（离线快照）
+    
+    基于内存映射的城市 POI 快照做向量化距离计算，不请求高德；结果按距离由近到远排序。
+    """
+    snapshot = _require_snapshot(city)
+    idx, _ = snapshot.nearest(
+        lng, lat, k=k, radius_m=radius,
+        categories=AMAP_CATEGORY_MAP.get(category) if category else None,
+    )
+    return _snapshot_response(snapshot, idx, len(idx), category, k)
+
+
+@router.get("/bbox", response_model=ContentSearchResponse)
+async def bbox_pois(
+    city: str = Query(..., description="城市名称（需已生成离线快照）"),
+    min_lng: float = Query(..., ge=-180, le=180),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    category: ContentCategory | None = Query(None, description="内容类别"),
+    limit: int = Query(500, ge=1, le=5000, description="最多返回数量"),
+):
+    """
+    矩形范围内的 POI（离线快照）
+    
+    `total` 为范围内的 POI 总数，`items` 最多返回 `limit` 条。
+    """
+    if min_lng > max_lng or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox 范围无效")
+    snapshot = _require_snapshot(city)
+    idx = snapshot.within_bbox(
+        min_lng, min_lat, max_lng, max_lat,
+        categories=AMAP_CATEGORY_MAP.get(category) if category else None,
+    )
+    return _snapshot_response(snapshot, idx[:limit], len(idx), category, limit)
+
+
+# 内容类别 -> 收藏类型
+FAVORITE_TYPES = {
+    ContentCategory.ATTRACTION: "spot",
+    ContentCategory.HOTEL: "hotel",
+    ContentCategory.DINING: "dining",
+}
+
+
+@router.get("/clusters", response_model=ContentClusterResponse)
+async def cluster_pois(
+    city: str = Query(..., description="城市名称"),
+    min_lng: float = Query(..., ge=-180, le=180),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    zoom: float = Query(..., ge=0, le=22, description="地图缩放级别"),
+    category: ContentCategory | None = Query(None, description="内容类别"),
+    favorites: bool = Query(False, description="同时返回当前用户收藏的聚合点（需登录）"),
+    current_user: User | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    """
+    地图 POI 聚合
+    
+    对该城市已缓存的 POI（离线快照或本地 POI 存储）建立分层网格聚合索引，返回视口内
+    当前缩放级别的聚合点及其数量；缩放级别超过 `CLUSTER_MAX_ZOOM` 或聚合点只含一个 POI 时
+    返回单个 POI 的 id 与名称。返回的点数只与视口大小有关，与 POI 密度无关。
+    """
+    if min_lng > max_lng or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox 范围无效")
+    bbox = (min_lng, min_lat, max_lng, max_lat)
+    
+    index = await get_cluster_service().get_index(
+        city, AMAP_CATEGORY_MAP.get(category) if category else None,
+    )
+    clusters = [_cluster(c, "poi") for c in index.query(*bbox, zoom)]
+    
+    if favorites:
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="聚合收藏需要登录")
+        query = db.query(Favorite).filter(Favorite.user_id == current_user.id)
+        if category:
+            query = query.filter(Favorite.type == FAVORITE_TYPES[category])
+        favorite_index = build_index([
+            {"id": f.id, "name": f.name, "category": f.type, "location": f.location}
+            for f in query.all()
+        ])
+        clusters += [_cluster(c, "favorite") for c in favorite_index.query(*bbox, zoom)]
+    
+    return _json_response(ContentClusterResponse.model_construct(
+        city=city,
+        zoom=zoom,
+        total=sum(c.count for c in clusters),
+        clusters=clusters,
+    ))
+
+
+@router.get("/cache/stats")
+async def cache_stats(top: int = Query(20, ge=0, le=200, description="返回统计最多的 key 数量")):
+    """
+    内容搜索缓存统计
+    
+    返回 AMap 搜索缓存的命中/未命中/淘汰次数，以及按 key 的明细（key 仅显示摘要，不暴露用户查询内容），
+    `upstream_calls_saved` 即缓存为 AMap 配额节省的请求数。
+    """
+    amap = get_amap_source()
+    return {
+        "amap_search": amap.search_cache.stats(top=top),
+        "amap_around": amap.around_cache.stats(top=top),
+        "amap_regeo": amap.regeo_cache.stats(top=top),
+        "amap_geocode": amap.geocode_cache.stats(top=top),
+        "amap_route": amap.route_cache.stats(top=top),
+        "amap_detail": amap.detail_cache.stats(top=top),
+        "amap_keys": amap.key_pool.stats(),
+        "amap_breaker": amap.breaker.stats(),
+        "local_poi": get_local_poi_source().stats(),
+        "suggest_entries": get_suggest_service().stats(),
+        "plan_prefetch": get_plan_prefetcher().stats(),
+        "cache_warmer": get_cache_warmer().stats(),
+        "clusters": get_cluster_service().stats(),
+        "media_thumbs": get_thumbnail_cache().stats(),
+    }
+
+
+@router.post("/details", response_model=ContentDetailsResponse)
+async def get_content_details(request: ContentDetailsRequest):
+    """
+    批量获取内容详情
+    
+    按数据源分组后并发获取：高德先查缓存，未命中的 id 一次性批量查询本地存储，
+    仍缺失的在限流预算内并发回源；同一 id 的并发请求只回源一次。
+    打开包含多个节点的行程时用一次请求代替逐个获取。
+    """
+    by_source: dict[DataSource, list[str]] = {}
+    for ref in request.items:
+        if ref.source not in SOURCE_REGISTRY:
+            raise HTTPException(status_code=400, detail=f"不支持的数据源: {ref.source.value}")
+        by_source.setdefault(ref.source, []).append(ref.id)
+    
+    sources = list(by_source)
+    outcomes = await asyncio.gather(
+        *(SOURCE_REGISTRY[s]().get_details(by_source[s]) for s in sources)
     )
+    details = dict(zip(sources, outcomes))
+    
+    items = []
+    missing = []
+    for ref in request.items:
+        poi = details[ref.source].get(ref.id)
+        item = _convert_poi_to_item(poi, request.category or _infer_category(poi)) if poi else None
+        if item is None:
+            missing.append(ref)
+        else:
+            items.append(item)
+    return _json_response(ContentDetailsResponse.model_construct(items=items, missing=missing))
+
+
+@router.get("/{source}/{item_id}", response_model=ContentDetailResponse)
+async def get_content_detail(
+    source: DataSource,
+    item_id: str,
+    category: ContentCategory | None = Query(None, description="内容类别，为空时按数据源类别推断"),
+):
+    """
+    获取单条内容详情
+    
+    该路由需声明在所有两段式 GET 路由之后，避免覆盖 `/search/stream`、`/cache/stats`。
+    """
+    factory = SOURCE_REGISTRY.get(source)
+    if factory is None:
+        raise HTTPException(status_code=400, detail=f"不支持的数据源: {source.value}")
+    
+    poi = await factory().get_detail(item_id)
+    item = _convert_poi_to_item(poi, category or _infer_category(poi)) if poi else None
+    if item is None:
+        raise HTTPException(status_code=404, detail="内容不存在")
+    return _json_response(ContentDetailResponse.model_construct(item=item))
+
+
+def _infer_category(poi: dict) -> ContentCategory:
+    """由数据源类别（如高德的 "餐饮服务"）推断统一内容类别，无法判断时视为景点"""
+    raw = poi.get("category")
+    try:
+        return ContentCategory(raw)
+    except ValueError:
+        pass
+    for category, types in AMAP_CATEGORY_MAP.items():
+        if raw in types.split("|"):
+            return category
+    return ContentCategory.ATTRACTION
+
+
+async def _search_city(
+    aggregator: ContentAggregator,
+    keyword: str,
+    city: str,
+    category: ContentCategory | None,
+    sources: list[DataSource],
+    page: int,
+    page_size: int,
+    lightweight: bool,
+) -> ContentCityGroup:
+    """搜索单个城市并转换为统一格式；所有数据源均失败时在 error 中返回原因"""
+    result = await aggregator.search(
+        keyword=keyword,
+        city=city,
+        category=category,
+        sources=sources,
+        page=page,
+        page_size=page_size,
+        lightweight=lightweight,
+    )
+    
+    if not result.results:
+        errors = [f"{s.value}: {e}" for s, e in result.failed.items()]
+        errors += [f"{s.value}: timed out" for s in result.timed_out]
+        return ContentCityGroup.model_construct(
+            city=city,
+            items=[],
+            total=0,
+            sources_timed_out=result.timed_out,
+            sources_failed=list(result.failed.keys()),
+            error="; ".join(errors),
+            rate_limited=(
+                not result.timed_out and len(result.rate_limited) == len(result.failed)
+            ),
+        )
+    
+    if DataSource.AMAP in result.results:
+        suggest = get_suggest_service()
+        amap_pois = result.results[DataSource.AMAP].data
+        suggest.observe_pois(city, amap_pois)
+        suggest.observe_query(city, keyword, amap_pois)
+    
+    # 转换为统一格式
+    items = []
+    for source_result in result.results.values():
+        for poi in source_result.data:
+            item = _convert_poi_to_item(poi, category)
+            if item:
+                items.append(item)
+    
+    # 多数据源时合并指向同一地点的条目
+    if len(result.results) > 1:
+        items = resolve_entities(items)
+    
+    return ContentCityGroup.model_construct(
+        city=city,
+        items=items,
+        total=sum(r.total_count for r in result.results.values()),
+        sources_used=list(result.results.keys()),
+        sources_timed_out=result.timed_out,
+        sources_failed=list(result.failed.keys()),
+        stale=any(r.stale for r in result.results.values()),
+    )
+
+
+def _parse_anchors(anchor: str) -> list[tuple[float, float]]:
+    anchors = [parse_coord(part.strip()) for part in anchor.split(";") if part.strip()]
+    if not anchors or None in anchors:
+        raise HTTPException(status_code=400, detail="anchor 格式应为 \"lng,lat;lng,lat\"")
+    return anchors
+
+
+def _plan_day_anchors(
+    db: Session,
+    user: User | None,
+    plan_id: str,
+    day: int | None,
+) -> list[tuple[float, float]]:
+    """行程某天（未指定时为全部天）节点的坐标"""
+    if user is None:
+        raise HTTPException(status_code=401, detail="按行程重排需要登录")
+    plan = db.query(ItineraryPlan).filter(
+        ItineraryPlan.id == plan_id,
+        ItineraryPlan.user_id == user.id
+    ).first()
+    if not plan:
+        raise HTTPException(status_code=404, detail="行程不存在")
+    trip = TripContent.model_validate(plan.content_json)
+    return [
+        (node.location.lng, node.location.lat)
+        for d in trip.days if day is None or d.day_index == day
+        for node in d.nodes
+    ]
+
+
+def _cluster(cluster: dict[str, Any], layer: str) -> ContentCluster:
+    return ContentCluster.model_construct(
+        location=GeoLocation.model_construct(lng=cluster["lng"], lat=cluster["lat"]),
+        count=cluster["count"],
+        layer=layer,
+        **(cluster["point"] or {}),
+    )
+
+
+def _require_snapshot(city: str) -> PoiSnapshot:
+    snapshot = get_poi_snapshot(city)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"城市 {city} 没有离线 POI 快照")
+    return snapshot
+
+
+def _snapshot_response(
+    snapshot: PoiSnapshot,
+    idx: np.ndarray,
+    total: int,
+    category: ContentCategory | None,
+    page_size: int,
+) -> Response:
+    items = [
+        item for item in (_convert_poi_to_item(snapshot.record(int(i)), category) for i in idx)
+        if item
+    ]
+    return _json_response(ContentSearchResponse.model_construct(
+        items=items,
+        total=total,
+        page=1,
+        page_size=page_size,
+        sources_used=[DataSource.AMAP],
+    ))
+
+
+def _parse_fields(fields: str) -> set[str]:
+    """解析字段投影参数，`source` 与 `source_id` 始终保留以便按需获取详情"""
+    return {f.strip() for f in fields.split(",") if f.strip()} | {"source", "source_id"}
+
+
+def _dump_items(items: list, item_fields: set[str] | None) -> list[dict[str, Any]]:
+    """序列化条目，item_fields 不为空时只保留其中的字段"""
+    return [item.model_dump(mode="json", include=item_fields) for item in items]
 
 
 def _convert_poi_to_item(
     poi: dict,
     category: ContentCategory | None
 ) -> AttractionItem | DiningItem | HotelItem | None:
-    """将 POI 数据转换为对应类型的 Item"""
+    """
+    将 POI 数据转换为对应类型的 Item
+    
+    数据源标准化后的字段类型是确定的，这里逐字段显式转换后用 `model_construct` 构建，
+    跳过 Pydantic 校验（高德空字段返回的 `[]` 等也在这里转为 None）。
+    """
     
     # 解析位置
     location = None
     if poi.get("location"):
-        location = GeoLocation(
-            lng=poi["location"]["lng"],
-            lat=poi["location"]["lat"]
+        location = GeoLocation.model_construct(
+            lng=float(poi["location"]["lng"]),
+            lat=float(poi["location"]["lat"])
         )
     
     # 基础字段
     base = {
-        "name": poi.get("name", ""),
-        "address": poi.get("address"),
-        "city": poi.get("city", ""),
-        "district": poi.get("district"),
+        "name": _text(poi.get("name")) or "",
+        "address": _text(poi.get("address")),
+        "city": _text(poi.get("city")) or "",
+        "district": _text(poi.get("district")),
         "location": location,
-        "source": DataSource.AMAP,
+        "source": DataSource(poi.get("source") or DataSource.AMAP),
         "source_id": poi.get("id"),
+        "provenance": [],
     }
+    rating = _number(poi.get("rating"))
+    photos = _texts(poi.get("photos"))
     
     # 根据类别返回不同类型
-    if category == ContentCategory.ATTRACTION:
-        return AttractionItem(
-            **base,
-            rating=float(poi["rating"]) if poi.get("rating") else None,
-            photos=poi.get("photos", []),
-            open_hours=poi.get("business_hours"),
-        )
-    elif category == ContentCategory.DINING:
-        return DiningItem(
+    if category == ContentCategory.DINING:
+        return DiningItem.model_construct(
             **base,
-            rating=float(poi["rating"]) if poi.get("rating") else None,
-            avg_cost=float(poi["cost"]) if poi.get("cost") else None,
-            photos=poi.get("photos", []),
-            business_hours=poi.get("business_hours"),
-            tel=poi.get("tel"),
+            category=ContentCategory.DINING,
+            rating=rating,
+            avg_cost=_number(poi.get("cost")),
+            photos=photos,
+            business_hours=_text(poi.get("business_hours")),
+            tel=_text(poi.get("tel")),
         )
     elif category == ContentCategory.HOTEL:
-        return HotelItem(
+        return HotelItem.model_construct(
             **base,
-            rating=float(poi["rating"]) if poi.get("rating") else None,
-            photos=poi.get("photos", []),
+            category=ContentCategory.HOTEL,
+            rating=rating,
+            photos=photos,
         )
     else:
         # 默认返回景点类型
-        return AttractionItem(
+        return AttractionItem.model_construct(
             **base,
-            rating=float(poi["rating"]) if poi.get("rating") else None,
-            photos=poi.get("photos", []),
+            category=ContentCategory.ATTRACTION,
+            rating=rating,
+            review_count=_integer(poi.get("review_count")),
+            description=_text(poi.get("description")),
+            tags=_texts(poi.get("tags")),
+            photos=photos,
+            open_hours=(
+                _text(poi.get("business_hours")) if category == ContentCategory.ATTRACTION else None
+            ),
         )
+
+
+def _text(value: Any) -> str | None:
+    return value if isinstance(value, str) and value else None
+
+
+def _texts(value: Any) -> list[str]:
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+
+def _number(value: Any) -> float | None:
+    if value is None or value == "" or value == []:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _integer(value: Any) -> int | None:
+    number = _number(value)
+    return int(number) if number is not None else None
+
+
+# 各条目类型预编译的列表序列化器：同类型的一页条目整体序列化，不必逐条匹配 union 类型
+_ITEM_LIST_ADAPTERS = {
+    cls: TypeAdapter(list[cls]) for cls in (AttractionItem, HotelItem, DiningItem)
+}
+
+
+def _json_response(model: BaseModel) -> Response:
+    """
+    直接序列化响应模型
+    
+    条目已由 `_convert_poi_to_item` 构建，不必再经过 FastAPI 按 response_model
+    的 dump -> 校验 -> 序列化流程。`items` 为同一类型时用预编译的 TypeAdapter 序列化。
+    """
+    items = getattr(model, "items", None)
+    adapter = _ITEM_LIST_ADAPTERS.get(type(items[0])) if items else None
+    if adapter is None or any(type(item) is not type(items[0]) for item in items):
+        return Response(content=model.model_dump_json(), media_type="application/json")
+    
+    head = model.model_dump_json(exclude={"items"})
+    content = b"".join((head[:-1].encode(), b',"items":', adapter.dump_json(items), b"}"))
+    return Response(content=content, media_type="application/json")
@@ -8,6 +8,7 @@ from app.models.user import User
 
 # HTTP Bearer token security scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def get_current_user(
@@ -51,3 +52,16 @@ def get_current_user(
         )
     
     return user
+
+
+def get_optional_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+    db: Session = Depends(get_db)
+) -> User | None:
+    """
+    Dependency for endpoints that work anonymously but use the user when present.
+    Returns None without a bearer token; an invalid token still raises 401.
+    """
+    if credentials is None:
+        return None
+    return get_current_user(credentials, db)
@@ -0,0 +1,68 @@
+"""Geocoding / reverse-geocoding proxy endpoints backed by AMap with shared caching."""
+from fastapi import APIRouter, Query, HTTPException
+from ..schemas.content import GeoLocation
+from ..schemas.geo import RegeoResponse, GeocodeResponse, GeocodeResult
+from ..services.sources.amap import AmapError, AmapRateLimited, get_amap_source
+from ..services.sources.geo import quantize_coord
+
+router = APIRouter(prefix="/geo", tags=["Geo"])
+
+
+@router.get("/regeo", response_model=RegeoResponse)
+async def reverse_geocode(
+    lng: float = Query(..., ge=-180, le=180, description="经度"),
+    lat: float = Query(..., ge=-90, le=90, description="纬度"),
+):
+    """
+    逆地理编码（坐标 -> 地址）
+    
+    坐标量化到约 10 m 网格后查询，同一网格内所有用户共享缓存。
+    """
+    amap = get_amap_source()
+    if not amap.key_pool:
+        raise HTTPException(status_code=503, detail="数据源错误: AMAP_KEY_WEB not configured")
+    
+    try:
+        regeocode = await amap.regeo(lng, lat)
+    except AmapRateLimited as e:
+        raise HTTPException(status_code=429, detail=f"数据源限流: {e}")
+    except AmapError as e:
+        raise HTTPException(status_code=503, detail=f"数据源错误: {e}")
+    
+    if not regeocode:
+        raise HTTPException(status_code=404, detail="Address not found")
+    
+    qlng, qlat = quantize_coord(lng, lat, amap.settings.AMAP_GEO_QUANTIZE_DECIMALS)
+    formatted = regeocode.get("formatted_address")
+    return RegeoResponse(
+        location=GeoLocation(lng=qlng, lat=qlat),
+        formatted_address=formatted if isinstance(formatted, str) else None,
+        regeocode=regeocode,
+    )
+
+
+@router.get("/geocode", response_model=GeocodeResponse)
+async def geocode(
+    address: str = Query(..., min_length=1, description="结构化地址"),
+    city: str | None = Query(None, description="城市（可选，用于限定范围）"),
+):
+    """
+    地理编码（地址 -> 坐标）
+    
+    以归一化后的地址字符串为缓存键，所有用户共享缓存。
+    """
+    amap = get_amap_source()
+    if not amap.key_pool:
+        raise HTTPException(status_code=503, detail="数据源错误: AMAP_KEY_WEB not configured")
+    
+    try:
+        results = await amap.geocode(address, city)
+    except AmapRateLimited as e:
+        raise HTTPException(status_code=429, detail=f"数据源限流: {e}")
+    except AmapError as e:
+        raise HTTPException(status_code=503, detail=f"数据源错误: {e}")
+    
+    return GeocodeResponse(
+        address=address,
+        results=[GeocodeResult(**r) for r in results],
+    )
@@ -0,0 +1,51 @@
+"""Image proxy endpoints serving cached WebP thumbnails of upstream photos."""
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from ..core.config import get_settings
+from ..services.media.thumbnails import (
+    HostNotAllowed,
+    ThumbnailError,
+    get_thumbnail_cache,
+    host_allowed,
+)
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+
+@router.get("/thumb")
+async def get_thumbnail(
+    url: str = Query(..., description="原图地址（高德 / 小红书图片）"),
+    w: int = Query(320, ge=16, le=2048, description="期望宽度（像素），向上取整到 MEDIA_THUMB_WIDTHS 中的档位"),
+    if_none_match: str | None = Header(None),
+):
+    """
+    图片缩略图
+    
+    首次请求时下载原图、缩放并编码为 WebP 存入磁盘缓存，之后直接从本地返回。
+    宽度按档位取整以提高命中率；带 `If-None-Match` 且未变化时返回 304。
+    """
+    width = _snap_width(w)
+    cache = get_thumbnail_cache()
+    if not host_allowed(url, cache.allowed_hosts):
+        raise HTTPException(status_code=403, detail="不支持代理该图片地址")
+    
+    # ETag 由 (url, 宽度) 决定，条件请求无需读取缓存或回源
+    etag = cache.cache_key(url, width)
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": "public, max-age=604800, immutable",
+    }
+    if if_none_match and f'"{etag}"' in {t.strip() for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        _, data = await cache.get(url, width)
+    except HostNotAllowed:
+        raise HTTPException(status_code=403, detail="不支持代理该图片地址")
+    except ThumbnailError as e:
+        raise HTTPException(status_code=502, detail=f"图片获取失败: {e}")
+    return Response(content=data, media_type="image/webp", headers=headers)
+
+
+def _snap_width(w: int) -> int:
+    widths = sorted(get_settings().MEDIA_THUMB_WIDTHS)
+    return next((width for width in widths if width >= w), widths[-1])
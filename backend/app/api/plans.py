@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db.base import get_db
 from app.models.user import User
@@ -9,9 +9,14 @@ from app.schemas.itinerary import (
     ItineraryUpdate,
     ItineraryResponse,
     ItineraryListResponse,
+    DayOptimizeResponse,
     TripContent
 )
 from app.api.deps import get_current_user
+from app.services.content.optimize import optimize_day
+from app.services.content.prefetch import get_plan_prefetcher
+from app.services.content.split import split_trip
+from app.services.sources.amap import get_amap_source
 
 router = APIRouter(prefix="/plans", tags=["Itinerary Plans"])
 
@@ -83,12 +88,17 @@ def create_plan(
 @router.get("/{plan_id}", response_model=ItineraryResponse)
 def get_plan(
     plan_id: str,
+    background_tasks: BackgroundTasks,
+    prefetch: bool = Query(False, description="Warm AMap caches for this plan in the background"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get a specific itinerary plan by ID.
     Only accessible by the owner.
+    
+    With `prefetch=true`, node details, reverse geocodes and commute legs are
+    fetched after the response is sent, at low priority in the AMap key pool.
     """
     plan = db.query(ItineraryPlan).filter(
         ItineraryPlan.id == plan_id,
@@ -101,12 +111,16 @@ def get_plan(
             detail="Plan not found"
         )
     
+    content = TripContent.model_validate(plan.content_json)
+    if prefetch:
+        background_tasks.add_task(get_plan_prefetcher().prefetch, plan.id, content)
+    
     return ItineraryResponse(
         id=plan.id,
         user_id=plan.user_id,
         title=plan.title,
         description=plan.description,
-        content=TripContent.model_validate(plan.content_json),
+        content=content,
         created_at=plan.created_at,
         updated_at=plan.updated_at
     )
@@ -181,3 +195,87 @@ def delete_plan(
     db.commit()
     
     return None
+
+
+@router.post("/{plan_id}/days/{day_index}/optimize", response_model=DayOptimizeResponse)
+def optimize_day_route(
+    plan_id: str,
+    day_index: int,
+    mode: Literal["taxi", "transit"] = Query("taxi", description="Commute mode used for travel times"),
+    apply: bool = Query(False, description="Save the reordered day to the plan"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Reorder a day's nodes to minimise total travel time.
+    Hotels stay fixed at the start (and end); legs without a cached route are
+    estimated from straight-line distance. With `apply=true` the new order is saved.
+    """
+    plan = db.query(ItineraryPlan).filter(
+        ItineraryPlan.id == plan_id,
+        ItineraryPlan.user_id == current_user.id
+    ).first()
+
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found"
+        )
+
+    content = TripContent.model_validate(plan.content_json)
+    position = next((i for i, d in enumerate(content.days) if d.day_index == day_index), None)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Day not found"
+        )
+
+    result = optimize_day(content.days[position], get_amap_source(), mode, city=content.meta.city)
+
+    if apply and result.saved_duration_s > 0:
+        content.days[position] = result.day
+        plan.content_json = content.model_dump()
+        db.commit()
+
+    return result
+
+
+@router.post("/{plan_id}/split", response_model=TripContent)
+def split_plan_days(
+    plan_id: str,
+    days: int | None = Query(None, ge=1, le=30, description="Number of days (defaults to the plan's current day count)"),
+    order: bool = Query(True, description="Reorder each day to minimise travel time"),
+    mode: Literal["taxi", "transit"] = Query("taxi", description="Commute mode used when ordering"),
+    apply: bool = Query(False, description="Save the new days to the plan"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Redistribute all of a plan's nodes into geographically compact, balanced days.
+    Hotels start each day (nearest to the day's centre). Returns the new trip
+    content; with `apply=true` it is also saved.
+    """
+    plan = db.query(ItineraryPlan).filter(
+        ItineraryPlan.id == plan_id,
+        ItineraryPlan.user_id == current_user.id
+    ).first()
+
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found"
+        )
+
+    content = TripContent.model_validate(plan.content_json)
+    result = split_trip(
+        content,
+        days or max(len(content.days), 1),
+        amap=get_amap_source() if order else None,
+        mode=mode,
+    )
+
+    if apply:
+        plan.content_json = result.model_dump()
+        db.commit()
+
+    return result
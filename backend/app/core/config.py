@@ -15,9 +15,99 @@ class Settings(BaseSettings):
     
     # External APIs - 高德地图 (AMap)
     AMAP_KEY_WEB: str | None = None  # 高德地图 Web Service API Key (后端 POI 搜索)
+    AMAP_KEYS_WEB: str | None = None  # 额外的 Web Service Key，逗号分隔，与 AMAP_KEY_WEB 组成 Key 池
+    AMAP_KEY_QPS: float = 3.0  # 单个 Key 的 QPS 配额
+    AMAP_KEY_MAX_WAIT_SECONDS: float = 2.0  # 无可用 Key 时的最长排队时间
+    AMAP_KEY_COOLDOWN_SECONDS: float = 1.0  # QPS 超限后 Key 的冷却时间
+    AMAP_KEY_QUOTA_COOLDOWN_SECONDS: float = 3600.0  # 日配额用尽后 Key 的冷却时间
+    AMAP_KEY_LOW_PRIORITY_RESERVE_RATIO: float = 0.33  # 后台预取取令牌后 Key 仍需留有的未用配额（占桶容量的比例）
     AMAP_KEY_WEB_JS: str | None = None  # 高德地图 JS API Key (前端地图加载)
     GOOGLE_API_KEY: str | None = None  # Google API Key
     
+    # AMap 搜索缓存
+    AMAP_CACHE_TTL_SECONDS: int = 600  # 文本搜索结果缓存有效期
+    AMAP_CACHE_MAX_ENTRIES: int = 2048  # 缓存条目上限 (LRU 淘汰)
+    AMAP_MAX_CONCURRENT_PAGES: int = 3  # 大分页拆分后单次请求的并发上限
+    AMAP_CACHE_STALE_SECONDS: int = 24 * 3600  # 过期结果保留时长，上游故障时兜底返回
+    
+    # AMap 周边搜索 (geohash 瓦片缓存)
+    AMAP_AROUND_TILE_PRECISION: int = 6  # geohash 精度，6 约 1.2 km x 0.6 km
+    AMAP_AROUND_MAX_TILES: int = 16  # 单次查询最多瓦片数，超过时自动降低精度
+    AMAP_AROUND_TILE_PAGES: int = 2  # 每个瓦片最多拉取的高德分页数 (每页 25 条)
+    AMAP_AROUND_SUBDIVIDE_LEVELS: int = 2  # 瓦片 POI 超出分页上限时最多再细分的精度层数
+    AMAP_AROUND_MAX_SUBTILES: int = 64  # 单次查询细分出的子瓦片总数上限
+    AMAP_AROUND_CACHE_TTL_SECONDS: int = 24 * 3600
+    AMAP_AROUND_CACHE_MAX_ENTRIES: int = 20000
+    
+    # AMap 地理编码 / 逆地理编码缓存
+    AMAP_GEO_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    AMAP_GEO_CACHE_MAX_ENTRIES: int = 50000
+    AMAP_GEO_QUANTIZE_DECIMALS: int = 4  # 坐标量化精度，4 位小数约 10 m
+    
+    # AMap 路径规划缓存
+    AMAP_ROUTE_CACHE_TTL_SECONDS: int = 24 * 3600
+    AMAP_ROUTE_CACHE_MAX_ENTRIES: int = 20000
+    AMAP_MAX_CONCURRENT_ROUTES: int = 8  # 批量计算通勤时的并发上限
+    
+    # AMap POI 详情缓存
+    AMAP_DETAIL_CACHE_TTL_SECONDS: int = 24 * 3600
+    AMAP_DETAIL_CACHE_MAX_ENTRIES: int = 20000
+    AMAP_MAX_CONCURRENT_DETAILS: int = 8  # 批量获取详情时的并发上限
+    
+    # 打开行程时的后台预取 (详情 / 逆地理编码 / 通勤路段)
+    PLAN_PREFETCH_MAX_CONCURRENCY: int = 2
+    
+    # 热门搜索缓存预热 (闲时刷新访问量最高的搜索)
+    CACHE_WARMER_ENABLED: bool = False
+    CACHE_WARMER_INTERVAL_MINUTES: int = 30
+    CACHE_WARMER_OFFPEAK_START_HOUR: int = 2  # 闲时窗口 [start, end)，本地时间，支持跨零点
+    CACHE_WARMER_OFFPEAK_END_HOUR: int = 7
+    CACHE_WARMER_TOP_KEYS: int = 200  # 每轮考察的热门搜索数
+    CACHE_WARMER_MIN_DEMAND: int = 2  # 访问量低于该值的搜索不预热
+    CACHE_WARMER_CALL_BUDGET: int = 100  # 每轮最多消耗的上游调用次数
+    CACHE_WARMER_REFRESH_RATIO: float = 0.8  # 条目剩余有效期不足 TTL 的 (1 - 该比例) 即刷新
+    CACHE_WARMER_HOLD_HOURS: float = 4  # 预热条目在闲时窗口结束后继续有效的小时数（覆盖早高峰）
+    
+    # 多数据源内容搜索：各数据源的截止时间 (秒)，超时的数据源被跳过并在响应中标记
+    CONTENT_SOURCE_DEADLINES: dict[str, float] = {"amap": 4.0, "xiaohongshu": 6.0}
+    CONTENT_SOURCE_DEFAULT_DEADLINE: float = 5.0
+    
+    # AMap 熔断与耗时预算
+    AMAP_REQUEST_BUDGET_SECONDS: float = 3.0  # 单次调用总耗时上限 (含排队等待 Key)
+    AMAP_BREAKER_FAILURE_THRESHOLD: int = 5  # 连续失败多少次后熔断
+    AMAP_BREAKER_RESET_SECONDS: float = 30.0  # 熔断多久后进入半开试探
+    
+    # 本地 POI 存储 (持久化，重启后仍可命中)
+    POI_STORE_ENABLED: bool = True
+    POI_STORE_TTL_SECONDS: int = 7 * 24 * 3600  # POI 详情新鲜期
+    POI_STORE_SEARCH_TTL_SECONDS: int = 24 * 3600  # 搜索结果新鲜期
+    POI_STORE_RETENTION_DAYS: int = 30  # 超过该天数未刷新的记录在压缩时删除
+    POI_STORE_COMPACT_INTERVAL_HOURS: int = 24  # 压缩/VACUUM 周期
+    
+    # 离线城市 POI 索引 (由 python -m app.services.sources.local_index 生成)
+    LOCAL_POI_INDEX_ENABLED: bool = False  # 启用后关键字搜索先查本地索引，未命中再请求高德
+    LOCAL_POI_INDEX_DIR: str = "./data/poi_index"
+    LOCAL_POI_INDEX_RECHECK_SECONDS: int = 60  # 每隔多久检查索引文件是否新建或重新导入
+    
+    # 搜索联想 (基于已见过的 POI 名称与搜索词)
+    SUGGEST_TOP_K: int = 10  # 每个前缀缓存的候选数，即单次联想的最大返回数
+    SUGGEST_MAX_ENTRIES_PER_CITY: int = 20000
+    SUGGEST_MAX_CITIES: int = 200  # 最多为多少个城市建立联想索引
+    
+    # 地图 POI 聚合 (分层网格，按城市缓存)
+    CLUSTER_RADIUS_PX: int = 60  # 聚合半径（像素，256px 瓦片）
+    CLUSTER_MAX_ZOOM: int = 16  # 超过该缩放级别返回单个 POI
+    CLUSTER_INDEX_TTL_SECONDS: int = 600  # 索引重建周期，纳入新缓存的 POI
+    
+    # 图片缩略图代理 (/api/media/thumb)
+    MEDIA_CACHE_DIR: str = "./data/thumbs"
+    MEDIA_CACHE_MAX_MB: int = 512  # 磁盘缓存上限，超出后按 LRU 淘汰
+    MEDIA_THUMB_WIDTHS: list[int] = [160, 320, 480, 640]  # 缩略图宽度档位
+    MEDIA_THUMB_QUALITY: int = 80  # WebP 质量
+    MEDIA_ALLOWED_HOSTS: list[str] = ["autonavi.com", "amap.com", "xhscdn.com", "xiaohongshu.com"]  # 允许代理的图片域名（含子域名）
+    MEDIA_MAX_SOURCE_MB: int = 15  # 原图大小上限
+    MEDIA_FETCH_TIMEOUT_SECONDS: float = 10.0
+    
     # LLM - 火山引擎 (Volcengine)
     VOLCENGINE_API_KEY: str | None = None
     VOLCENGINE_MODEL: str = "doubao-seed-1-6-251015"
@@ -29,6 +119,14 @@ class Settings(BaseSettings):
     APP_NAME: str = "LiteTravel API"
     APP_VERSION: str = "2.1.0"
     
+    @property
+    def amap_web_keys(self) -> list[str]:
+        """AMAP_KEY_WEB 与 AMAP_KEYS_WEB 合并后的 Key 列表"""
+        keys = [self.AMAP_KEY_WEB] if self.AMAP_KEY_WEB else []
+        if self.AMAP_KEYS_WEB:
+            keys.extend(k.strip() for k in self.AMAP_KEYS_WEB.split(",") if k.strip())
+        return keys
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
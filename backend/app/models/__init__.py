@@ -1,5 +1,6 @@
 from .user import User
 from .itinerary import ItineraryPlan
 from .favorite import Favorite
+from .poi import PoiRecord, PoiSearchRecord
 
-__all__ = ["User", "ItineraryPlan", "Favorite"]
+__all__ = ["User", "ItineraryPlan", "Favorite", "PoiRecord", "PoiSearchRecord"]
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, DateTime, JSON, Integer
+from app.db.base import Base
+
+
+class PoiRecord(Base):
+    """Normalized POI persisted from data source responses (keyed by source POI id)."""
+    
+    __tablename__ = "poi_records"
+    
+    id = Column(String(64), primary_key=True)
+    source = Column(String(20), nullable=False, default="amap")
+    name = Column(String(255), nullable=False)
+    city = Column(String(100), nullable=True, index=True)
+    
+    # Normalized POI dict (see AmapSource._normalize_poi), without the raw payload
+    data = Column(JSON, nullable=False)
+    
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    
+    def __repr__(self):
+        return f"<PoiRecord(id={self.id}, name={self.name})>"
+
+
+class PoiSearchRecord(Base):
+    """Ordered POI ids returned for a search key, so repeat searches survive restarts."""
+    
+    __tablename__ = "poi_search_records"
+    
+    # "keyword|city|types|page|offset"
+    cache_key = Column(String(512), primary_key=True)
+    poi_ids = Column(JSON, nullable=False)
+    total_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    
+    def __repr__(self):
+        return f"<PoiSearchRecord(cache_key={self.cache_key})>"
@@ -0,0 +1,29 @@
+"""Schemas for batch commute computation."""
+from typing import Literal
+from pydantic import BaseModel, Field, model_validator
+from .itinerary import DayPlan, TripContent
+
+
+class CommuteFillRequest(BaseModel):
+    """批量计算通勤请求，day 与 trip 二选一"""
+    day: DayPlan | None = None
+    trip: TripContent | None = None
+    city: str | None = Field(None, description="城市（公交规划需要；传 trip 时默认取 trip.meta.city）")
+    mode: Literal["taxi", "transit"] | None = Field(
+        None, description="出行方式；为空时沿用各路段原有方式，默认打车"
+    )
+    overwrite: bool = Field(True, description="是否覆盖已有的通勤信息")
+
+    @model_validator(mode="after")
+    def check_target(self) -> "CommuteFillRequest":
+        if (self.day is None) == (self.trip is None):
+            raise ValueError("Exactly one of 'day' or 'trip' must be provided")
+        return self
+
+
+class CommuteFillResponse(BaseModel):
+    """批量计算通勤响应（已填充 to_next_commute 的 day 或 trip）"""
+    day: DayPlan | None = None
+    trip: TripContent | None = None
+    legs_computed: int
+    legs_failed: int
@@ -27,6 +27,13 @@ class GeoLocation(BaseModel):
     lat: float
 
 
+class ContentProvenance(BaseModel):
+    """合并后条目的来源记录"""
+    source: DataSource
+    source_id: str | None = None
+    name: str
+
+
 class ContentBase(BaseModel):
     """内容基础字段"""
     name: str
@@ -37,6 +44,7 @@ class ContentBase(BaseModel):
     category: ContentCategory
     source: DataSource
     source_id: str | None = None  # 原始数据源 ID
+    provenance: list[ContentProvenance] = []  # 跨数据源合并时的全部来源
     
 
 class AttractionItem(ContentBase):
@@ -115,6 +123,19 @@ class ContentSearchRequest(BaseModel):
     page_size: int = Field(default=20, ge=1, le=50)
 
 
+class ContentCityGroup(BaseModel):
+    """多城市搜索中单个城市的结果"""
+    city: str
+    items: list[AttractionItem | HotelItem | DiningItem | CommuteItem]
+    total: int
+    sources_used: list[DataSource] = []
+    sources_timed_out: list[DataSource] = []
+    sources_failed: list[DataSource] = []
+    stale: bool = False
+    error: str | None = None  # 该城市所有数据源均失败时的错误信息
+    rate_limited: bool = False  # 失败的数据源均为限流，稍后重试即可
+
+
 class ContentSearchResponse(BaseModel):
     """内容搜索响应"""
     items: list[AttractionItem | HotelItem | DiningItem | CommuteItem]
@@ -122,6 +143,46 @@ class ContentSearchResponse(BaseModel):
     page: int
     page_size: int
     sources_used: list[DataSource]
+    sources_timed_out: list[DataSource] = []  # 超过截止时间未返回的数据源
+    sources_failed: list[DataSource] = []  # 返回错误的数据源
+    stale: bool = False  # 数据源不可用时返回的最近一次成功结果
+    truncated: bool = False  # 周边搜索中部分区域 POI 过多未取全
+    groups: list[ContentCityGroup] | None = None  # 多城市搜索时按城市分组的结果（items 为空）
+
+
+class ContentSuggestion(BaseModel):
+    """搜索联想候选"""
+    text: str
+    kind: str  # poi: 见过的 POI 名称; query: 用户搜索过的关键词
+    score: float  # 热度
+    source_id: str | None = None
+    category: str | None = None  # 数据源原始类别，如 "风景名胜"
+    location: GeoLocation | None = None
+
+
+class ContentSuggestResponse(BaseModel):
+    """搜索联想响应"""
+    q: str
+    city: str
+    suggestions: list[ContentSuggestion]
+
+
+class ContentCluster(BaseModel):
+    """地图聚合点；count 为 1 时为单个 POI / 收藏"""
+    location: GeoLocation
+    count: int
+    layer: str  # poi: 已缓存的 POI; favorite: 当前用户的收藏
+    id: str | None = None  # 单点时的 POI id / 收藏 id
+    name: str | None = None
+    category: str | None = None  # 单点时的类别（POI 为数据源原始类别，收藏为 spot/hotel/dining）
+
+
+class ContentClusterResponse(BaseModel):
+    """地图聚合响应"""
+    city: str
+    zoom: float
+    total: int  # 范围内的点数（各聚合点 count 之和）
+    clusters: list[ContentCluster]
 
 
 class ContentDetailResponse(BaseModel):
@@ -129,3 +190,21 @@ class ContentDetailResponse(BaseModel):
     item: AttractionItem | HotelItem | DiningItem | CommuteItem
     ai_enhanced: bool = False  # 是否经过 LLM 增强
     last_updated: datetime | None = None
+
+
+class ContentRef(BaseModel):
+    """数据源中的一条内容"""
+    source: DataSource
+    id: str
+
+
+class ContentDetailsRequest(BaseModel):
+    """批量获取内容详情请求"""
+    items: list[ContentRef] = Field(..., min_length=1, max_length=100)
+    category: ContentCategory | None = None  # 为空时按数据源类别推断
+
+
+class ContentDetailsResponse(BaseModel):
+    """批量获取内容详情响应"""
+    items: list[AttractionItem | HotelItem | DiningItem | CommuteItem]  # 按请求顺序，不含未找到的条目
+    missing: list[ContentRef] = []
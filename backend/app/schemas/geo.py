@@ -0,0 +1,28 @@
+"""Schemas for geocoding / reverse-geocoding proxy endpoints."""
+from typing import Any
+from pydantic import BaseModel
+from .content import GeoLocation
+
+
+class RegeoResponse(BaseModel):
+    """逆地理编码响应"""
+    location: GeoLocation  # 量化后实际查询的坐标
+    formatted_address: str | None = None
+    regeocode: dict[str, Any]  # 高德 regeocode 原始结构 (含 addressComponent / pois / aois)
+
+
+class GeocodeResult(BaseModel):
+    """地理编码结果"""
+    formatted_address: str | None = None
+    province: str | None = None
+    city: str | None = None
+    district: str | None = None
+    adcode: str | None = None
+    level: str | None = None
+    location: GeoLocation | None = None
+
+
+class GeocodeResponse(BaseModel):
+    """地理编码响应"""
+    address: str
+    results: list[GeocodeResult]
@@ -48,6 +48,16 @@ class TripContent(BaseModel):
     days: List[DayPlan]
 
 
+class DayOptimizeResponse(BaseModel):
+    """A day with its nodes reordered to minimise total travel time."""
+    day: DayPlan
+    original_duration_s: float  # total travel time of the current order
+    optimized_duration_s: float
+    saved_duration_s: float
+    estimated_legs: int  # legs estimated from straight-line distance (no cached route)
+    elapsed_ms: float
+
+
 class ItineraryCreate(BaseModel):
     """Schema for creating a new itinerary."""
     title: str = Field(..., min_length=1, max_length=255)
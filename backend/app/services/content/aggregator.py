@@ -0,0 +1,213 @@
+"""Concurrent multi-source content search with per-source deadlines."""
+import asyncio
+from typing import AsyncIterator, Callable
+
+from pydantic import BaseModel
+
+from ...core.config import get_settings
+from ...schemas.content import ContentCategory, DataSource
+from ..sources.amap import get_amap_source
+from ..sources.base import BaseSource, SourceResult
+from ..sources.local import get_local_poi_source
+from ..sources.xiaohongshu import get_xiaohongshu_source
+
+# 高德 POI 类型映射
+AMAP_CATEGORY_MAP = {
+    ContentCategory.ATTRACTION: "风景名胜|旅游景点",
+    ContentCategory.HOTEL: "住宿服务",
+    ContentCategory.DINING: "餐饮服务",
+}
+
+
+def _amap_source() -> BaseSource:
+    """启用离线 POI 索引时先查本地索引，未命中再请求高德"""
+    if get_settings().LOCAL_POI_INDEX_ENABLED:
+        return get_local_poi_source()
+    return get_amap_source()
+
+
+# 已接入的数据源（新数据源在此注册）
+SOURCE_REGISTRY: dict[DataSource, Callable[[], BaseSource]] = {
+    DataSource.AMAP: _amap_source,
+    DataSource.XIAOHONGSHU: get_xiaohongshu_source,
+}
+
+
+def source_category(source: DataSource, category: ContentCategory | None) -> str | None:
+    """将统一内容类别转换为各数据源自己的类别参数"""
+    if category is None:
+        return None
+    if source == DataSource.AMAP:
+        return AMAP_CATEGORY_MAP.get(category)
+    return category.value
+
+
+class AggregatedResult(BaseModel):
+    """多数据源搜索结果"""
+    results: dict[DataSource, SourceResult] = {}  # 按请求顺序，仅包含成功的数据源
+    timed_out: list[DataSource] = []
+    failed: dict[DataSource, str] = {}
+    rate_limited: list[DataSource] = []  # failed 中因限流失败的数据源
+
+
+class StreamChunk(BaseModel):
+    """流式搜索中某个数据源的一次产出（部分结果、超时或失败）"""
+    source: DataSource
+    result: SourceResult | None = None
+    timed_out: bool = False
+    error: str | None = None
+
+
+class ContentAggregator:
+    """
+    多数据源并发搜索
+
+    每个数据源独立计时，超过各自的 deadline 即取消并标记为超时，
+    慢数据源（如爬虫）不会拖慢其他数据源的结果。
+    """
+
+    def __init__(
+        self,
+        registry: dict[DataSource, Callable[[], BaseSource]] | None = None,
+        deadlines: dict[str, float] | None = None,
+    ):
+        settings = get_settings()
+        self.registry = registry if registry is not None else SOURCE_REGISTRY
+        self.deadlines = deadlines if deadlines is not None else settings.CONTENT_SOURCE_DEADLINES
+        self.default_deadline = settings.CONTENT_SOURCE_DEFAULT_DEADLINE
+
+    def available_sources(self) -> list[DataSource]:
+        return list(self.registry.keys())
+
+    def deadline_for(self, source: DataSource) -> float:
+        return self.deadlines.get(source.value, self.default_deadline)
+
+    async def search_source(
+        self,
+        source: DataSource,
+        keyword: str,
+        city: str,
+        category: ContentCategory | None,
+        page: int,
+        page_size: int,
+        lightweight: bool = False,
+    ) -> SourceResult:
+        """
+        在 deadline 内搜索单个数据源
+
+        Raises:
+            asyncio.TimeoutError: 超过该数据源的 deadline
+        """
+        factory = self.registry.get(source)
+        if factory is None:
+            return SourceResult(source=source.value, success=False, error="Source not available")
+
+        return await asyncio.wait_for(
+            factory().search(
+                keyword=keyword,
+                city=city,
+                category=source_category(source, category),
+                page=page,
+                page_size=page_size,
+                lightweight=lightweight,
+            ),
+            timeout=self.deadline_for(source),
+        )
+
+    async def search(
+        self,
+        keyword: str,
+        city: str,
+        category: ContentCategory | None,
+        sources: list[DataSource],
+        page: int = 1,
+        page_size: int = 20,
+        lightweight: bool = False,
+    ) -> AggregatedResult:
+        """并发搜索所有请求的数据源，返回按时到达的结果"""
+        sources = list(dict.fromkeys(sources))
+        outcomes = await asyncio.gather(
+            *(
+                self.search_source(
+                    s, keyword, city, category, page, page_size, lightweight
+                )
+                for s in sources
+            ),
+            return_exceptions=True,
+        )
+
+        aggregated = AggregatedResult()
+        for source, outcome in zip(sources, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                aggregated.timed_out.append(source)
+            elif isinstance(outcome, BaseException):
+                aggregated.failed[source] = str(outcome) or type(outcome).__name__
+            elif not outcome.success:
+                aggregated.failed[source] = outcome.error or "Unknown error"
+                if outcome.rate_limited:
+                    aggregated.rate_limited.append(source)
+            else:
+                aggregated.results[source] = outcome
+        return aggregated
+
+    async def stream(
+        self,
+        keyword: str,
+        city: str,
+        category: ContentCategory | None,
+        sources: list[DataSource],
+        page: int = 1,
+        page_size: int = 20,
+        lightweight: bool = False,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        并发搜索所有请求的数据源，按到达顺序逐块产出
+
+        每个数据源的 deadline 覆盖其全部分页；超时前已产出的部分结果仍然有效。
+        """
+        sources = list(dict.fromkeys(sources))
+        queue: asyncio.Queue[StreamChunk | None] = asyncio.Queue()
+
+        async def drain(source: DataSource) -> None:
+            factory = self.registry.get(source)
+            if factory is None:
+                await queue.put(StreamChunk(source=source, error="Source not available"))
+                return
+            async for result in factory().iter_search(
+                keyword=keyword,
+                city=city,
+                category=source_category(source, category),
+                page=page,
+                page_size=page_size,
+                lightweight=lightweight,
+            ):
+                if result.success:
+                    await queue.put(StreamChunk(source=source, result=result))
+                else:
+                    await queue.put(
+                        StreamChunk(source=source, error=result.error or "Unknown error")
+                    )
+
+        async def run(source: DataSource) -> None:
+            try:
+                await asyncio.wait_for(drain(source), timeout=self.deadline_for(source))
+            except asyncio.TimeoutError:
+                await queue.put(StreamChunk(source=source, timed_out=True))
+            except Exception as e:
+                await queue.put(StreamChunk(source=source, error=str(e) or type(e).__name__))
+            finally:
+                await queue.put(None)  # 该数据源结束
+
+        tasks = [asyncio.create_task(run(s)) for s in sources]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                chunk = await queue.get()
+                if chunk is None:
+                    remaining -= 1
+                    continue
+                yield chunk
+        finally:
+            # 客户端断开时停止仍在进行的上游请求
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,216 @@
+"""Hierarchical grid clustering of POIs for map markers (supercluster-style)."""
+import asyncio
+import math
+import time
+from functools import lru_cache
+from typing import Any, Callable
+
+import numpy as np
+from loguru import logger
+
+from ...core.config import get_settings
+from ..sources.amap import get_amap_source
+from ..sources.geo import normalize_city
+from ..sources.snapshot import get_poi_snapshot
+
+# Web 墨卡托的纬度上限
+_MAX_LAT = 85.051129
+# 网格 key 中 y 分量的位数（最大缩放级别下每轴格数远小于 2^24）
+_KEY_SHIFT = 24
+
+
+def project(lng: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """经纬度 -> 归一化 Web 墨卡托坐标 [0, 1)，y 轴向南"""
+    x = np.asarray(lng, dtype=np.float64) / 360.0 + 0.5
+    sin = np.sin(np.radians(np.clip(np.asarray(lat, dtype=np.float64), -_MAX_LAT, _MAX_LAT)))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return x, y
+
+
+def unproject(x: float, y: float) -> tuple[float, float]:
+    lng = (x - 0.5) * 360.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lng, lat
+
+
+class _Level:
+    """某一缩放级别的聚合点，按 x 排序便于范围查询"""
+    __slots__ = ("x", "y", "count", "point")
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, count: np.ndarray, point: np.ndarray):
+        order = np.argsort(x, kind="stable")
+        self.x, self.y = x[order], y[order]
+        self.count = count[order]
+        self.point = point[order]  # 只含一个点时为该点下标，否则为 -1
+
+
+class ClusterIndex:
+    """
+    分层网格聚合索引
+
+    - 最高级别 max_zoom + 1 为原始点；每一级将下一级的聚合点按 radius 像素的网格合并，
+      质心按点数加权，因此每个聚合点恰好由上一级的若干聚合点组成
+    - 查询时取对应级别，按 x 二分后用向量化掩码过滤 bbox；
+      视口内返回的聚合点数只与视口大小 / radius 有关，与 POI 密度无关
+    """
+
+    def __init__(
+        self,
+        lng: np.ndarray,
+        lat: np.ndarray,
+        record: Callable[[int], dict[str, Any]],
+        min_zoom: int = 3,
+        max_zoom: int = 16,
+        radius_px: int = 60,
+        extent: int = 256,
+    ):
+        self.record = record
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.built_at = time.monotonic()
+
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        x, y = project(self.lng, self.lat)
+        n = len(x)
+        self.size = n
+        self.levels: dict[int, _Level] = {
+            max_zoom + 1: _Level(x, y, np.ones(n, dtype=np.int64), np.arange(n, dtype=np.int64)),
+        }
+
+        count = np.ones(n, dtype=np.int64)
+        point = np.arange(n, dtype=np.int64)
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            cell = radius_px / (extent * 2.0 ** zoom)
+            keys = (
+                (np.floor(x / cell).astype(np.int64) << _KEY_SHIFT)
+                | np.floor(y / cell).astype(np.int64)
+            )
+            _, inverse = np.unique(keys, return_inverse=True)
+            m = int(inverse.max()) + 1 if n else 0
+            merged = np.bincount(inverse, weights=count, minlength=m)
+            x = np.bincount(inverse, weights=x * count, minlength=m) / merged
+            y = np.bincount(inverse, weights=y * count, minlength=m) / merged
+            single = np.full(m, -1, dtype=np.int64)
+            single[inverse] = point
+            count = merged.astype(np.int64)
+            point = np.where(count == 1, single, -1)
+            self.levels[zoom] = _Level(x, y, count, point)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def query(
+        self,
+        min_lng: float,
+        min_lat: float,
+        max_lng: float,
+        max_lat: float,
+        zoom: float,
+    ) -> list[dict[str, Any]]:
+        """bbox 内的聚合点：{"lng", "lat", "count", "point"}，单点时 point 为 record(i)"""
+        level = self.levels[min(max(int(zoom), self.min_zoom), self.max_zoom + 1)]
+        x0, y1 = project(np.array([min_lng]), np.array([min_lat]))
+        x1, y0 = project(np.array([max_lng]), np.array([max_lat]))
+        lo = np.searchsorted(level.x, x0[0], side="left")
+        hi = np.searchsorted(level.x, x1[0], side="right")
+        ys = level.y[lo:hi]
+        found = np.flatnonzero((ys >= y0[0]) & (ys <= y1[0])) + lo
+
+        clusters = []
+        for i in found:
+            point = int(level.point[i])
+            if point >= 0:
+                lng, lat = float(self.lng[point]), float(self.lat[point])
+            else:
+                lng, lat = unproject(float(level.x[i]), float(level.y[i]))
+            clusters.append({
+                "lng": lng,
+                "lat": lat,
+                "count": int(level.count[i]),
+                "point": self.record(point) if point >= 0 else None,
+            })
+        return clusters
+
+
+def _point_summary(poi: dict[str, Any]) -> dict[str, Any]:
+    return {"id": poi.get("id"), "name": poi.get("name"), "category": poi.get("category")}
+
+
+def build_index(points: list[dict[str, Any]]) -> ClusterIndex:
+    """由带 location 的字典列表构建索引（本地 POI 存储中的 POI、按请求构建的收藏）"""
+    settings = get_settings()
+    located = [p for p in points if p.get("location")]
+    lng = np.fromiter((p["location"]["lng"] for p in located), dtype=np.float64, count=len(located))
+    lat = np.fromiter((p["location"]["lat"] for p in located), dtype=np.float64, count=len(located))
+    return ClusterIndex(
+        lng, lat,
+        lambda i: _point_summary(located[i]),
+        max_zoom=settings.CLUSTER_MAX_ZOOM,
+        radius_px=settings.CLUSTER_RADIUS_PX,
+    )
+
+
+class ClusterService:
+    """
+    按 (城市, 类别) 缓存的 POI 聚合索引
+
+    POI 来自城市离线快照（存在时）或本地 POI 存储中已缓存的该城市 POI；
+    索引超过 CLUSTER_INDEX_TTL_SECONDS 后在下次查询时重建，以纳入新缓存的 POI。
+    """
+
+    def __init__(self):
+        self._indexes: dict[tuple[str, str | None], ClusterIndex] = {}
+        self._locks: dict[tuple[str, str | None], asyncio.Lock] = {}
+
+    async def get_index(self, city: str, categories: str | None = None) -> ClusterIndex:
+        key = (normalize_city(city), categories)
+        ttl = get_settings().CLUSTER_INDEX_TTL_SECONDS
+        index = self._indexes.get(key)
+        if index is not None and time.monotonic() - index.built_at < ttl:
+            return index
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(key)
+            if index is None or time.monotonic() - index.built_at >= ttl:
+                index = await asyncio.to_thread(self._build, city, categories)
+                self._indexes[key] = index
+                logger.info(f"Cluster index for {key[0]} ({categories or 'all'}): {len(index)} POIs")
+        return index
+
+    def _build(self, city: str, categories: str | None) -> ClusterIndex:
+        settings = get_settings()
+        snapshot = get_poi_snapshot(city)
+        if snapshot is not None:
+            codes = snapshot.category_codes(categories)
+            rows = (
+                np.flatnonzero(np.isin(snapshot.pois["category"], codes))
+                if codes is not None else np.arange(len(snapshot))
+            )
+            pois = snapshot.pois[rows]
+            return ClusterIndex(
+                pois["lng"], pois["lat"],
+                lambda i: _point_summary(snapshot.record(int(rows[i]))),
+                max_zoom=settings.CLUSTER_MAX_ZOOM,
+                radius_px=settings.CLUSTER_RADIUS_PX,
+            )
+
+        store = get_amap_source().poi_store
+        pois = store.get_city_pois(city) if store is not None else []
+        if categories:
+            wanted = set(categories.split("|"))
+            pois = [p for p in pois if p.get("category") in wanted]
+        return build_index(pois)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            f"{city}:{categories or 'all'}": len(index)
+            for (city, categories), index in self._indexes.items()
+        }
+
+
+@lru_cache()
+def get_cluster_service() -> ClusterService:
+    """进程内共享的聚合索引服务"""
+    return ClusterService()
@@ -0,0 +1,120 @@
+"""Batch commute computation for itinerary plans."""
+import asyncio
+from typing import Literal
+
+from loguru import logger
+
+from ...schemas.itinerary import CommuteInfo, DayPlan, PlanNode, TripContent
+from ..sources.amap import AmapError, AmapSource
+
+CommuteMode = Literal["taxi", "transit"]
+
+
+def format_commute(distance_m: float, duration_s: float, mode: CommuteMode) -> CommuteInfo:
+    """与前端 getRoute 相同的展示格式"""
+    minutes = round(duration_s / 60)
+    return CommuteInfo(
+        distance_text=f"{distance_m / 1000:.1f} km",
+        duration_text=f"{max(minutes, 1)} min",
+        mode=mode,
+    )
+
+
+class CommuteCalculator:
+    """
+    批量计算行程相邻节点之间的通勤信息
+
+    所有路段并发请求（受 max_concurrency 限制），路线结果由 AmapSource 按
+    量化后的起终点与出行方式缓存，重复路段基本都能命中缓存。
+    """
+
+    def __init__(self, amap: AmapSource, max_concurrency: int = 8):
+        self.amap = amap
+        self.max_concurrency = max_concurrency
+        self.legs_computed = 0
+        self.legs_failed = 0
+
+    async def fill_trip(
+        self,
+        trip: TripContent,
+        mode: CommuteMode | None = None,
+        overwrite: bool = True,
+        city: str | None = None,
+    ) -> TripContent:
+        """计算整个行程所有天的通勤（city 默认取 trip.meta.city）"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        city = city or trip.meta.city
+        days = await asyncio.gather(*(
+            self._fill_day(day, city, mode, overwrite, semaphore)
+            for day in trip.days
+        ))
+        return trip.model_copy(update={"days": list(days)})
+
+    async def fill_day(
+        self,
+        day: DayPlan,
+        city: str | None,
+        mode: CommuteMode | None = None,
+        overwrite: bool = True,
+    ) -> DayPlan:
+        """计算单天所有相邻节点的通勤"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await self._fill_day(day, city, mode, overwrite, semaphore)
+
+    async def _fill_day(
+        self,
+        day: DayPlan,
+        city: str | None,
+        mode: CommuteMode | None,
+        overwrite: bool,
+        semaphore: asyncio.Semaphore,
+    ) -> DayPlan:
+        nodes = day.nodes
+        legs = [
+            self._leg(nodes[i], nodes[i + 1], city, mode, overwrite, semaphore)
+            for i in range(len(nodes) - 1)
+        ]
+        commutes = await asyncio.gather(*legs)
+
+        new_nodes = [
+            node.model_copy(update={"to_next_commute": commute})
+            for node, commute in zip(nodes, commutes)
+        ]
+        if nodes:
+            # 最后一个节点没有下一站
+            new_nodes.append(nodes[-1].model_copy(update={"to_next_commute": None}))
+        return day.model_copy(update={"nodes": new_nodes})
+
+    async def _leg(
+        self,
+        start: PlanNode,
+        end: PlanNode,
+        city: str | None,
+        mode: CommuteMode | None,
+        overwrite: bool,
+        semaphore: asyncio.Semaphore,
+    ) -> CommuteInfo | None:
+        existing = start.to_next_commute
+        if existing is not None and not overwrite:
+            return existing
+
+        # 未指定时沿用该路段原有的出行方式，默认打车
+        leg_mode: CommuteMode = mode or (existing.mode if existing else "taxi")
+        async with semaphore:
+            try:
+                route = await self.amap.route(
+                    (start.location.lng, start.location.lat),
+                    (end.location.lng, end.location.lat),
+                    mode=leg_mode,
+                    city=city,
+                )
+            except AmapError as e:
+                logger.warning(f"Commute {start.id} -> {end.id} failed: {e}")
+                route = None
+
+        if route is None:
+            self.legs_failed += 1
+            return existing
+
+        self.legs_computed += 1
+        return format_commute(route["distance_m"], route["duration_s"], leg_mode)
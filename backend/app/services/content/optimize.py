@@ -0,0 +1,203 @@
+"""Reorder a day's plan nodes to minimise total travel time (TSP heuristics)."""
+import time
+from typing import Literal
+
+import numpy as np
+
+from ...schemas.itinerary import DayOptimizeResponse, DayPlan
+from ..sources.amap import AmapSource
+from ..sources.geo import EARTH_RADIUS_M
+
+# 没有缓存路线的路段按直线距离估算：绕行系数与平均速度（米/秒）
+DETOUR_FACTOR = 1.4
+AVG_SPEED_MPS = {"taxi": 25 / 3.6, "transit": 15 / 3.6}
+# Or-opt 移动的最长片段
+OR_OPT_MAX_SEGMENT = 3
+
+
+def haversine_matrix(lng: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """两两之间的球面距离（米）"""
+    phi = np.radians(lat)
+    dphi = phi[None, :] - phi[:, None]
+    dlmb = np.radians(lng)[None, :] - np.radians(lng)[:, None]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def duration_matrix(
+    coords: list[tuple[float, float]],
+    amap: AmapSource,
+    mode: Literal["taxi", "transit"] = "taxi",
+    city: str | None = None,
+) -> tuple[np.ndarray, int]:
+    """
+    节点间通勤时长矩阵（秒），返回 (矩阵, 按直线距离估算的路段数)
+
+    优先使用路线缓存中的真实时长（不回源），其余按直线距离 × 绕行系数 / 平均速度估算。
+    """
+    n = len(coords)
+    lng = np.array([c[0] for c in coords], dtype=np.float64)
+    lat = np.array([c[1] for c in coords], dtype=np.float64)
+    matrix = haversine_matrix(lng, lat) * DETOUR_FACTOR / AVG_SPEED_MPS[mode]
+
+    estimated = 0
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            route = amap.cached_route(coords[i], coords[j], mode=mode, city=city)
+            if route is not None:
+                matrix[i, j] = route["duration_s"]
+            else:
+                estimated += 1
+    return matrix, estimated
+
+
+def path_cost(matrix: np.ndarray, path: list[int] | np.ndarray) -> float:
+    path = np.asarray(path)
+    return float(matrix[path[:-1], path[1:]].sum())
+
+
+def nearest_neighbour(matrix: np.ndarray, start: int, end: int, interior: list[int]) -> list[int]:
+    """最近邻构造初始路径：start -> 依次最近的未访问节点 -> end"""
+    path = [start]
+    remaining = list(interior)
+    while remaining:
+        costs = matrix[path[-1], remaining]
+        path.append(remaining.pop(int(np.argmin(costs))))
+    path.append(end)
+    return path
+
+
+def two_opt(matrix: np.ndarray, path: list[int]) -> list[int]:
+    """
+    2-opt：每轮向量化计算所有「反转 path[i..j]」的增量，应用最优的一个，直到无改进
+
+    矩阵可以不对称：反转片段内部的代价用正向 / 反向前缀和 O(1) 求得。
+    首尾节点固定。
+    """
+    path = np.asarray(path)
+    m = len(path)
+    if m < 4:
+        return path.tolist()
+    i, j = np.triu_indices(m - 1, k=1)
+    keep = i >= 1
+    i, j = i[keep], j[keep]  # 1 <= i < j <= m - 2
+
+    while True:
+        forward = np.concatenate(([0.0], np.cumsum(matrix[path[:-1], path[1:]])))
+        backward = np.concatenate(([0.0], np.cumsum(matrix[path[1:], path[:-1]])))
+        a, b, c, d = path[i - 1], path[i], path[j], path[j + 1]
+        delta = (
+            matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+            + (backward[j] - backward[i]) - (forward[j] - forward[i])
+        )
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-9:
+            return path.tolist()
+        bi, bj = i[best], j[best]
+        path = np.concatenate((path[:bi], path[bi:bj + 1][::-1], path[bj + 1:]))
+
+
+def or_opt(matrix: np.ndarray, path: list[int]) -> list[int]:
+    """Or-opt：把长度 1..3 的片段（保持方向）移到其他位置，首尾节点固定"""
+    path = list(path)
+    improved = True
+    while improved:
+        improved = False
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            for i in range(1, len(path) - length):
+                segment = path[i:i + length]
+                a, b = path[i - 1], path[i + length]
+                first, last = segment[0], segment[-1]
+                removal_gain = matrix[a, first] + matrix[last, b] - matrix[a, b]
+
+                rest = path[:i] + path[i + length:]
+                c = np.asarray(rest[:-1])
+                d = np.asarray(rest[1:])
+                insert_cost = matrix[c, first] + matrix[last, d] - matrix[c, d]
+                insert_cost[i - 1] = np.inf  # 原位置
+                k = int(np.argmin(insert_cost))
+                if insert_cost[k] < removal_gain - 1e-9:
+                    path = rest[:k + 1] + segment + rest[k + 1:]
+                    improved = True
+                    break
+            if improved:
+                break
+    return path
+
+
+def solve_path(matrix: np.ndarray, start: int, end: int, interior: list[int]) -> list[int]:
+    """首尾固定的路径：最近邻构造后交替 2-opt 与 Or-opt 直到都无改进"""
+    path = nearest_neighbour(matrix, start, end, interior)
+    while True:
+        cost = path_cost(matrix, path)
+        path = or_opt(matrix, two_opt(matrix, path))
+        if path_cost(matrix, path) >= cost - 1e-9:
+            return path
+
+
+def optimize_day(
+    day: DayPlan,
+    amap: AmapSource,
+    mode: Literal["taxi", "transit"] = "taxi",
+    city: str | None = None,
+) -> DayOptimizeResponse:
+    """
+    重新排列一天的节点使总通勤时长最短
+
+    - 有酒店节点时以第一个酒店为固定起点；最后一个节点也是酒店时以其为固定终点，
+      否则计入当天结束后返回起点酒店的路段
+    - 没有酒店时第一个节点为固定起点，终点不限
+    - 对比基准为原顺序（起点酒店移到首位）；结果不会比基准差
+    - 相邻关系改变的节点清空 to_next_commute，未变的保留
+    """
+    started = time.perf_counter()
+    nodes = list(day.nodes)
+    n = len(nodes)
+    if n < 3:
+        return DayOptimizeResponse(
+            day=day, original_duration_s=0.0, optimized_duration_s=0.0, saved_duration_s=0.0,
+            estimated_legs=0, elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+    durations, estimated = duration_matrix(
+        [(node.location.lng, node.location.lat) for node in nodes], amap, mode, city,
+    )
+
+    hotels = [i for i, node in enumerate(nodes) if node.type == "hotel"]
+    start = hotels[0] if hotels else 0
+    end = n - 1 if hotels and n - 1 != start and nodes[-1].type == "hotel" else None
+    movable = [i for i in range(n) if i != start and i != end]
+
+    # 末尾追加虚拟终点 n：固定终点时到达 n 即到达终点酒店；只有起点酒店时为返回酒店；
+    # 没有酒店时代价为 0，即终点不限
+    matrix = np.zeros((n + 1, n + 1))
+    matrix[:n, :n] = durations
+    if end is not None:
+        matrix[:n, n] = durations[:, end]
+    elif hotels:
+        matrix[:n, n] = durations[:, start]
+
+    original = [start, *movable, n]
+    path = solve_path(matrix, start, n, movable) if len(movable) > 1 else original
+    original_s, optimized_s = path_cost(matrix, original), path_cost(matrix, path)
+    if optimized_s >= original_s:
+        path, optimized_s = original, original_s
+
+    order = path[:-1] + ([end] if end is not None else [])
+    new_nodes = []
+    for pos, idx in enumerate(order):
+        node = nodes[idx]
+        successor_kept = pos + 1 < len(order) and order[pos + 1] == idx + 1
+        if not successor_kept and node.to_next_commute is not None:
+            node = node.model_copy(update={"to_next_commute": None})
+        new_nodes.append(node)
+
+    return DayOptimizeResponse(
+        day=day.model_copy(update={"nodes": new_nodes}),
+        original_duration_s=round(original_s, 1),
+        optimized_duration_s=round(optimized_s, 1),
+        saved_duration_s=round(original_s - optimized_s, 1),
+        estimated_legs=estimated,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -0,0 +1,109 @@
+"""Low-priority background prefetch of AMap data for an opened plan."""
+import asyncio
+import re
+from functools import lru_cache
+
+from loguru import logger
+
+from ...core.config import get_settings
+from ...schemas.itinerary import PlanNode, TripContent
+from ..sources.amap import AmapError, AmapSource, get_amap_source, low_priority
+
+# 高德 POI id，如 "B0FFFAB6J2"；前端生成的节点 id 不会匹配
+AMAP_POI_ID_RE = re.compile(r"^B[0-9A-Z]{9}$")
+
+
+class PlanPrefetcher:
+    """
+    打开行程后在后台预取该行程需要的高德数据，写入各自的缓存：
+
+    - 节点的 POI 详情（节点 id 为高德 POI id 时）
+    - 节点坐标的逆地理编码（点击节点时的地址展示）
+    - 相邻节点之间的通勤路段（沿用已有出行方式，默认打车）
+
+    所有调用都在 low_priority() 下发起，只使用 Key 池的富余配额，且不与交互请求共享加载；
+    已在缓存中的数据不再请求，同一行程正在预取时不会重复调度。
+    """
+
+    def __init__(self, amap: AmapSource, max_concurrency: int = 2):
+        self.amap = amap
+        self.max_concurrency = max_concurrency
+        self._inflight: set[str] = set()
+
+        self.completed = 0
+        self.skipped = 0
+
+    async def prefetch(self, plan_id: str, trip: TripContent) -> None:
+        if plan_id in self._inflight:
+            self.skipped += 1
+            return
+        self._inflight.add(plan_id)
+        try:
+            with low_priority():
+                await asyncio.gather(self._prefetch_nodes(trip), self._prefetch_legs(trip))
+            self.completed += 1
+        except Exception as e:
+            logger.warning(f"Plan {plan_id} prefetch failed: {e}")
+        finally:
+            self._inflight.discard(plan_id)
+
+    async def _prefetch_nodes(self, trip: TripContent) -> None:
+        nodes = [node for day in trip.days for node in day.nodes]
+        missing = [
+            node for node in nodes
+            if not self.amap.has_regeo(node.location.lng, node.location.lat)
+        ]
+        poi_ids = [
+            node.id for node in nodes
+            if AMAP_POI_ID_RE.match(node.id) and node.id not in self.amap.detail_cache
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def regeo(node: PlanNode) -> None:
+            async with semaphore:
+                try:
+                    await self.amap.regeo(node.location.lng, node.location.lat)
+                except AmapError:
+                    pass  # 配额紧张或上游不可用时放弃，不影响交互请求
+
+        tasks = [regeo(node) for node in missing]
+        if poi_ids:
+            tasks.append(self.amap.get_details(poi_ids))
+        await asyncio.gather(*tasks)
+
+    async def _prefetch_legs(self, trip: TripContent) -> None:
+        """相邻节点之间尚未缓存的通勤路段（沿用已有出行方式，默认打车）"""
+        legs = []
+        for day in trip.days:
+            for start, end in zip(day.nodes, day.nodes[1:]):
+                mode = start.to_next_commute.mode if start.to_next_commute else "taxi"
+                origin = (start.location.lng, start.location.lat)
+                destination = (end.location.lng, end.location.lat)
+                if not self.amap.has_route(origin, destination, mode, trip.meta.city):
+                    legs.append((origin, destination, mode))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def route(origin: tuple[float, float], destination: tuple[float, float], mode: str) -> None:
+            async with semaphore:
+                try:
+                    await self.amap.route(origin, destination, mode=mode, city=trip.meta.city)
+                except AmapError:
+                    pass
+
+        await asyncio.gather(*(route(*leg) for leg in legs))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "completed": self.completed,
+            "skipped": self.skipped,
+        }
+
+
+@lru_cache()
+def get_plan_prefetcher() -> PlanPrefetcher:
+    """进程内共享的行程预取器"""
+    return PlanPrefetcher(
+        get_amap_source(),
+        max_concurrency=get_settings().PLAN_PREFETCH_MAX_CONCURRENCY,
+    )
@@ -0,0 +1,66 @@
+"""Vectorized re-ranking of search results around the active plan day."""
+import math
+from typing import Any, Sequence, TypeVar
+
+import numpy as np
+
+from ..sources.geo import EARTH_RADIUS_M
+
+T = TypeVar("T")
+
+# 综合得分 = 原始排名 + 评分 + 与锚点距离，各项均归一化到 [0, 1]
+RANK_WEIGHT = 0.4
+RATING_WEIGHT = 0.2
+DISTANCE_WEIGHT = 0.4
+# 距离得分 exp(-d / scale)：距离为 scale 时得分约 0.37
+DISTANCE_SCALE_M = 2000.0
+# 没有评分的条目按中等评分计
+NEUTRAL_RATING = 3.0
+MAX_RATING = 5.0
+
+
+def nearest_anchor_distances(lng: np.ndarray, lat: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+    """每个点到最近锚点的球面距离（米），anchors 形如 (m, 2) 的 [lng, lat]"""
+    phi1 = np.radians(lat)[:, None]
+    phi2 = np.radians(anchors[:, 1])[None, :]
+    dphi = phi2 - phi1
+    dlmb = np.radians(anchors[:, 0])[None, :] - np.radians(lng)[:, None]
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return (2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))).min(axis=1)
+
+
+def rerank_by_anchors(items: Sequence[T], anchors: Sequence[tuple[float, float]]) -> list[T]:
+    """
+    按锚点（如当天行程节点）重新排序搜索结果
+
+    数据源原始顺序、评分与到最近锚点的距离一次性向量化计算综合得分，
+    得分相同时保持原始顺序；没有坐标的条目距离得分为 0。
+    """
+    n = len(items)
+    if n < 2 or not anchors:
+        return list(items)
+
+    lng = np.fromiter((_coord(item, "lng") for item in items), dtype=np.float64, count=n)
+    lat = np.fromiter((_coord(item, "lat") for item in items), dtype=np.float64, count=n)
+    rating = np.fromiter(
+        (_rating(item) for item in items), dtype=np.float64, count=n,
+    )
+
+    rank_score = 1.0 - np.arange(n, dtype=np.float64) / n
+    rating_score = np.clip(np.nan_to_num(rating, nan=NEUTRAL_RATING) / MAX_RATING, 0.0, 1.0)
+    distance = nearest_anchor_distances(lng, lat, np.asarray(anchors, dtype=np.float64))
+    distance_score = np.nan_to_num(np.exp(-distance / DISTANCE_SCALE_M), nan=0.0)
+
+    score = RANK_WEIGHT * rank_score + RATING_WEIGHT * rating_score + DISTANCE_WEIGHT * distance_score
+    order = np.argsort(-score, kind="stable")
+    return [items[i] for i in order]
+
+
+def _coord(item: Any, axis: str) -> float:
+    location = getattr(item, "location", None)
+    return getattr(location, axis) if location is not None else math.nan
+
+
+def _rating(item: Any) -> float:
+    rating = getattr(item, "rating", None)
+    return float(rating) if rating is not None else math.nan
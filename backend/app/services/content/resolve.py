@@ -0,0 +1,230 @@
+"""Cross-source POI entity resolution (dedup + merge with provenance)."""
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Iterable
+
+from ...schemas.content import ContentBase, ContentProvenance, DataSource
+from ..sources.geo import haversine_m
+
+# 括号内的分店/备注信息，如 "(五一广场店)"、"【必去】"
+_BRACKETS_RE = re.compile(r"[(\[{（【「『<《].*?[)\]}）】」』>》]")
+# 仅保留中文、字母与数字
+_NON_WORD_RE = re.compile(r"[^0-9a-z一-鿿]+")
+
+# 景点名称中的通用后缀
+_NAME_SUFFIXES = ("风景名胜区", "旅游风景区", "风景区", "旅游区", "景区", "景点")
+# 笔记标题中的常见修饰词
+_TITLE_STOPWORDS = (
+    "攻略", "必去", "打卡", "推荐", "旅游", "旅行", "一日游", "游玩", "避坑",
+    "保姆级", "超详细", "干货", "合集", "路线", "附近", "最全", "小众", "宝藏",
+)
+
+# 空间网格边长（度），约 300 m
+GRID_SIZE_DEG = 0.003
+# 常见 n-gram 的倒排表过长时不参与候选召回，保证近线性复杂度
+MAX_POSTING_LENGTH = 200
+
+
+def normalize_name(name: str, city: str | None = None) -> str:
+    """
+    名称归一化：全角转半角、小写、去括号备注、去城市名/通用后缀/标题修饰词、去标点
+    """
+    text = unicodedata.normalize("NFKC", name or "").lower()
+    text = _BRACKETS_RE.sub("", text)
+    if city:
+        for c in {city, city.rstrip("市")}:
+            if c:
+                text = text.replace(c.lower(), "")
+    for word in _TITLE_STOPWORDS:
+        text = text.replace(word, "")
+    text = _NON_WORD_RE.sub("", text)
+    for suffix in _NAME_SUFFIXES:
+        if text.endswith(suffix) and len(text) > len(suffix) + 1:
+            text = text[: -len(suffix)]
+            break
+    return text
+
+
+def name_ngrams(normalized: str) -> set[str]:
+    """字符二元组；单字名称返回其本身"""
+    if len(normalized) < 2:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+
+def _overlap(a: set[str], b: set[str]) -> tuple[float, int]:
+    """重叠系数 |A∩B| / min(|A|,|B|) 与交集大小（笔记标题通常包含 POI 名称）"""
+    if not a or not b:
+        return 0.0, 0
+    shared = len(a & b)
+    return shared / min(len(a), len(b)), shared
+
+
+class _Cluster:
+    """一组被判定为同一实体的内容"""
+
+    def __init__(self, position: int, item: ContentBase, grams: set[str]):
+        self.position = position  # 组内条目在输入中的最小下标，用于保持输出顺序
+        self.items = [item]
+        self.sources = {item.source}
+        self.grams = grams
+        self.location = item.location
+
+
+class EntityResolver:
+    """
+    跨数据源实体消解
+
+    按数据源优先级依次处理：每个条目通过空间网格（有坐标时）与名称 n-gram 倒排索引
+    召回候选实体，只与候选比较，整体近线性而非 O(n²) 两两比较。
+    匹配成功则并入该实体，否则成为新实体。同一数据源的条目不会互相合并
+    （各数据源内部已有唯一 id，如同名连锁店的不同分店）。
+    """
+
+    def __init__(
+        self,
+        max_distance_m: float = 500.0,
+        located_threshold: float = 0.5,
+        unlocated_threshold: float = 0.8,
+        source_priority: Iterable[DataSource] = (
+            DataSource.AMAP,
+            DataSource.CTRIP,
+            DataSource.MEITUAN,
+            DataSource.XIAOHONGSHU,
+        ),
+    ):
+        """
+        Args:
+            max_distance_m: 双方都有坐标时允许的最大距离
+            located_threshold: 双方都有坐标时的名称相似度阈值
+            unlocated_threshold: 任一方无坐标时的名称相似度阈值
+            source_priority: 数据源优先级，靠前的数据源作为合并后的主条目
+        """
+        self.max_distance_m = max_distance_m
+        self.located_threshold = located_threshold
+        self.unlocated_threshold = unlocated_threshold
+        self.source_rank = {s: i for i, s in enumerate(source_priority)}
+
+    def resolve(self, items: list[ContentBase]) -> list[ContentBase]:
+        """合并重复条目，返回带 provenance 的规范条目（保持首次出现的顺序）"""
+        if not items:
+            return []
+
+        order = sorted(
+            range(len(items)),
+            key=lambda i: (
+                self.source_rank.get(items[i].source, len(self.source_rank)),
+                items[i].location is None,
+                i,
+            ),
+        )
+
+        clusters: list[_Cluster] = []
+        grid: dict[tuple[int, int], list[int]] = defaultdict(list)
+        postings: dict[str, list[int]] = defaultdict(list)
+
+        for i in order:
+            item = items[i]
+            grams = name_ngrams(normalize_name(item.name, item.city))
+            best = self._best_match(item, grams, clusters, grid, postings)
+
+            if best is not None:
+                cluster = clusters[best]
+                cluster.items.append(item)
+                cluster.sources.add(item.source)
+                cluster.position = min(cluster.position, i)
+                if cluster.location is None and item.location is not None:
+                    cluster.location = item.location
+                    grid[_cell(item.location.lng, item.location.lat)].append(best)
+                continue
+
+            cluster_id = len(clusters)
+            clusters.append(_Cluster(i, item, grams))
+            if item.location is not None:
+                grid[_cell(item.location.lng, item.location.lat)].append(cluster_id)
+            for g in grams:
+                postings[g].append(cluster_id)
+
+        clusters.sort(key=lambda c: c.position)
+        return [_merge(c.items) for c in clusters]
+
+    def _best_match(
+        self,
+        item: ContentBase,
+        grams: set[str],
+        clusters: list[_Cluster],
+        grid: dict[tuple[int, int], list[int]],
+        postings: dict[str, list[int]],
+    ) -> int | None:
+        candidates: set[int] = set()
+        if item.location is not None:
+            cx, cy = _cell(item.location.lng, item.location.lat)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    candidates.update(grid.get((cx + dx, cy + dy), ()))
+        for g in grams:
+            posting = postings.get(g)
+            if posting and len(posting) <= MAX_POSTING_LENGTH:
+                candidates.update(posting)
+
+        best, best_score = None, 0.0
+        for cid in candidates:
+            cluster = clusters[cid]
+            if item.source in cluster.sources:
+                continue
+            sim, shared = _overlap(grams, cluster.grams)
+
+            if item.location is not None and cluster.location is not None:
+                distance = haversine_m(
+                    item.location.lng, item.location.lat,
+                    cluster.location.lng, cluster.location.lat,
+                )
+                if distance > self.max_distance_m or sim < self.located_threshold:
+                    continue
+                score = sim + 0.1 * (1 - distance / self.max_distance_m)
+            else:
+                if sim < self.unlocated_threshold or (shared < 2 and grams != cluster.grams):
+                    continue
+                score = sim
+
+            if score > best_score:
+                best, best_score = cid, score
+        return best
+
+
+def _cell(lng: float, lat: float) -> tuple[int, int]:
+    return int(lng // GRID_SIZE_DEG), int(lat // GRID_SIZE_DEG)
+
+
+def _merge(items: list[ContentBase]) -> ContentBase:
+    """以第一个条目为主，补全缺失字段并合并列表字段，记录来源"""
+    primary = items[0]
+    if len(items) == 1:
+        return primary.model_copy(update={"provenance": [_provenance(primary)]})
+
+    update: dict = {"provenance": [_provenance(x) for x in items]}
+    for field, value in primary:
+        if isinstance(value, list) and field != "provenance":
+            merged = list(value)
+            for other in items[1:]:
+                for v in getattr(other, field, None) or []:
+                    if v not in merged:
+                        merged.append(v)
+            update[field] = merged
+        elif value is None:
+            for other in items[1:]:
+                other_value = getattr(other, field, None)
+                if other_value is not None:
+                    update[field] = other_value
+                    break
+    return primary.model_copy(update=update)
+
+
+def _provenance(item: ContentBase) -> ContentProvenance:
+    return ContentProvenance(source=item.source, source_id=item.source_id, name=item.name)
+
+
+def resolve_entities(items: list[ContentBase]) -> list[ContentBase]:
+    """使用默认参数进行跨数据源实体消解"""
+    return EntityResolver().resolve(items)
@@ -0,0 +1,229 @@
+"""Split a trip's nodes into geographically compact, balanced days (capacity-constrained k-medoids)."""
+import math
+from datetime import date, timedelta
+from typing import Literal
+
+import numpy as np
+
+from ...schemas.itinerary import DayPlan, PlanNode, TripContent
+from ..sources.amap import AmapSource
+from .optimize import haversine_matrix, optimize_day, solve_path
+
+# k-medoids 的随机初始化次数与每次的最大迭代轮数
+SPLIT_RESTARTS = 4
+SPLIT_MAX_ITERATIONS = 30
+# 交换改进的最大轮数（相对节点数）
+SWAP_ROUNDS_PER_NODE = 2
+
+
+def init_medoids(dist: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-medoids++：按到已选中心的距离平方加权抽样"""
+    n = len(dist)
+    medoids = [int(rng.integers(n))]
+    nearest = dist[medoids[0]].copy()
+    for _ in range(1, k):
+        weights = nearest ** 2
+        total = weights.sum()
+        pick = int(rng.choice(n, p=weights / total)) if total > 0 else int(rng.integers(n))
+        medoids.append(pick)
+        nearest = np.minimum(nearest, dist[pick])
+    return np.array(medoids)
+
+
+def assign_with_capacity(cost: np.ndarray, capacity: int) -> np.ndarray:
+    """
+    带容量上限的分配：所有 (节点, 簇) 按代价升序，依次分配给未满的簇
+
+    cost 形如 (n, k)，返回每个节点所属簇的下标。
+    """
+    n, k = cost.shape
+    labels = np.full(n, -1, dtype=np.int64)
+    sizes = np.zeros(k, dtype=np.int64)
+    assigned = 0
+    for flat in np.argsort(cost, axis=None, kind="stable"):
+        point, cluster = divmod(int(flat), k)
+        if labels[point] >= 0 or sizes[cluster] >= capacity:
+            continue
+        labels[point] = cluster
+        sizes[cluster] += 1
+        assigned += 1
+        if assigned == n:
+            break
+    return labels
+
+
+def improve_by_swaps(cost: np.ndarray, labels: np.ndarray, max_rounds: int) -> np.ndarray:
+    """
+    交换改进：每轮执行收益最大的一次「两簇各出一个节点互换」
+
+    互换收益可拆成两簇各自的移出收益之和，因此每轮只需 O(n * k)：
+    best[a, b] 为簇 a 中移到簇 b 收益最大的节点。互换不改变各簇大小，不会破坏容量约束。
+    """
+    labels = labels.copy()
+    n, k = cost.shape
+    rows = np.arange(n)
+    for _ in range(max_rounds):
+        saving = cost[rows, labels][:, None] - cost  # saving[i, c]：节点 i 改放到簇 c 省下的距离
+        best = np.full((k, k), -np.inf)
+        best_node = np.zeros((k, k), dtype=np.int64)
+        for cluster in range(k):
+            members = np.flatnonzero(labels == cluster)
+            if len(members):
+                top = np.argmax(saving[members], axis=0)
+                best[cluster] = saving[members[top], np.arange(k)]
+                best_node[cluster] = members[top]
+        gain = best + best.T
+        np.fill_diagonal(gain, -np.inf)
+        flat = int(np.argmax(gain))
+        if gain.flat[flat] <= 1e-9:
+            break
+        a, b = divmod(flat, k)
+        labels[best_node[a, b]], labels[best_node[b, a]] = b, a
+    return labels
+
+
+def balanced_kmedoids(
+    dist: np.ndarray,
+    k: int,
+    restarts: int = SPLIT_RESTARTS,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    容量约束的 k-medoids：每簇最多 ceil(n / k) 个节点
+
+    交替执行「带容量分配 + 交换改进」与「每簇重选中心点」直到中心点不变，
+    多次随机初始化取总距离最小的结果。返回 (labels, medoids)。
+    """
+    n = len(dist)
+    capacity = math.ceil(n / k)
+    rng = np.random.default_rng(seed)
+    best: tuple[float, np.ndarray, np.ndarray] | None = None
+
+    for _ in range(restarts):
+        medoids = init_medoids(dist, k, rng)
+        for _ in range(SPLIT_MAX_ITERATIONS):
+            cost = dist[:, medoids]
+            labels = assign_with_capacity(cost, capacity)
+            labels = improve_by_swaps(cost, labels, SWAP_ROUNDS_PER_NODE * n)
+            updated = medoids.copy()
+            for cluster in range(k):
+                members = np.flatnonzero(labels == cluster)
+                if len(members):
+                    inner = dist[np.ix_(members, members)].sum(axis=1)
+                    updated[cluster] = members[int(np.argmin(inner))]
+            if np.array_equal(updated, medoids):
+                break
+            medoids = updated
+
+        total = float(dist[np.arange(n), medoids[labels]].sum())
+        if best is None or total < best[0]:
+            best = (total, labels, medoids)
+
+    return best[1], best[2]
+
+
+def _first_date(content: TripContent) -> date | None:
+    """出发日期；缺失、为空或无法解析时返回 None"""
+    try:
+        return date.fromisoformat(content.meta.dates[0])
+    except (IndexError, TypeError, ValueError):
+        return None
+
+
+def _day_dates(content: TripContent, days: int) -> list[str | None]:
+    """从出发日期起逐日递增；日期无法解析时沿用原有天的日期"""
+    first = _first_date(content)
+    if first is None:
+        existing = [d.date for d in content.days]
+        return [existing[i] if i < len(existing) else None for i in range(days)]
+    return [(first + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def split_trip(
+    content: TripContent,
+    days: int,
+    amap: AmapSource | None = None,
+    mode: Literal["taxi", "transit"] = "taxi",
+) -> TripContent:
+    """
+    把行程中的全部节点重新分到 days 天
+
+    - 非酒店节点按球面距离做容量约束的 k-medoids，每天最多 ceil(n / days) 个
+    - 天的先后顺序按中心点串成一条较短的路径，从第一个非酒店节点所在的簇开始
+    - 有酒店节点时每天以离当天中心点最近的酒店开头，未被选中的酒店放在离它最近那天的末尾；
+      重复出现的酒店节点 id 加 -day{n} 后缀，保证节点 id 唯一
+    - 传入 amap 时对每天调用 optimize_day 排序，否则按到中心点的距离由近及远排列
+    - 出发日期可解析时 meta.dates 改为 [出发日期, 出发日期 + days - 1]
+    """
+    nodes: list[PlanNode] = [node for day in content.days for node in day.nodes]
+    hotels = [node for node in nodes if node.type == "hotel"]
+    stops = [node for node in nodes if node.type != "hotel"]
+    dates = _day_dates(content, days)
+    k = min(days, len(stops))
+
+    groups: list[list[PlanNode]] = [[] for _ in range(days)]
+    centers: list[tuple[float, float] | None] = [None] * days
+    if k > 0:
+        lng = np.array([node.location.lng for node in stops], dtype=np.float64)
+        lat = np.array([node.location.lat for node in stops], dtype=np.float64)
+        dist = haversine_matrix(lng, lat)
+        labels, medoids = balanced_kmedoids(dist, k)
+
+        # 按中心点排出天的先后：首尾不固定，末尾补一个代价为 0 的虚拟终点
+        between = np.zeros((k + 1, k + 1))
+        between[:k, :k] = dist[np.ix_(medoids, medoids)]
+        first = int(labels[0])
+        day_order = solve_path(between, first, k, [c for c in range(k) if c != first])[:-1]
+
+        for position, cluster in enumerate(day_order):
+            members = np.flatnonzero(labels == cluster)
+            members = members[np.argsort(dist[medoids[cluster], members], kind="stable")]
+            groups[position] = [stops[i] for i in members]
+            centers[position] = (float(lng[medoids[cluster]]), float(lat[medoids[cluster]]))
+
+    # 酒店：每天以离中心点最近的酒店开头；未被选中的酒店放在离它最近那天的末尾
+    starts: list[int | None] = [None] * days
+    ends: dict[int, list[int]] = {}
+    located = [p for p in range(days) if centers[p] is not None]
+    if hotels and located:
+        dist_to_day = haversine_matrix(
+            np.array([h.location.lng for h in hotels] + [centers[p][0] for p in located]),
+            np.array([h.location.lat for h in hotels] + [centers[p][1] for p in located]),
+        )[:len(hotels), len(hotels):]
+        for column, position in enumerate(located):
+            starts[position] = int(np.argmin(dist_to_day[:, column]))
+        for h in sorted(set(range(len(hotels))) - set(starts)):
+            ends.setdefault(located[int(np.argmin(dist_to_day[h]))], []).append(h)
+    elif hotels:
+        ends[0] = list(range(len(hotels)))
+
+    result = []
+    used_ids: set[str] = set()
+    for position in range(days):
+        chosen = ([starts[position]] if starts[position] is not None else []) + ends.get(position, [])
+        day_hotels = []
+        for h in chosen:
+            hotel = hotels[h]
+            if hotel.id in used_ids:
+                hotel = hotel.model_copy(update={"id": f"{hotel.id}-day{position + 1}"})
+            used_ids.add(hotel.id)
+            day_hotels.append(hotel)
+        head = day_hotels[:1] if starts[position] is not None else []
+        tail = day_hotels[len(head):]
+        group = [
+            node.model_copy(update={"to_next_commute": None})
+            for node in (*head, *groups[position], *tail)
+        ]
+
+        day = DayPlan(day_index=position + 1, date=dates[position], nodes=group)
+        if amap is not None:
+            day = optimize_day(day, amap, mode, city=content.meta.city).day
+        result.append(day)
+
+    update: dict = {"days": result}
+    first = _first_date(content)
+    if first is not None:
+        # 天数变化后同步行程的起止日期
+        last = first + timedelta(days=days - 1)
+        update["meta"] = content.meta.model_copy(update={"dates": [first.isoformat(), last.isoformat()]})
+    return content.model_copy(update=update)
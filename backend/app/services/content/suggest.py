@@ -0,0 +1,199 @@
+"""Keyword autocomplete from POI names and queries already seen, ranked by popularity."""
+import asyncio
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+
+from ...core.config import get_settings
+from ..sources.amap import get_amap_source
+from ..sources.geo import normalize_city
+from ..sources.local_index import normalize_text
+
+# 用户提交的搜索词比出现在结果中的 POI 名称权重更高
+QUERY_WEIGHT = 5.0
+POI_WEIGHT = 1.0
+
+
+class _Entry:
+    __slots__ = ("key", "text", "kind", "score", "poi")
+
+    def __init__(self, key: str, text: str, kind: str):
+        self.key = key
+        self.text = text
+        self.kind = kind  # "poi" | "query"
+        self.score = 0.0
+        self.poi: dict[str, Any] | None = None
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.top: list[_Entry] = []  # 该前缀下得分最高的条目（降序）
+
+
+class SuggestIndex:
+    """
+    单个城市的前缀树
+
+    每个节点缓存该前缀下得分最高的 top_k 个条目，查询只需沿前缀走 len(q) 步。
+    得分只增不减，条目加分时沿路径更新各节点的 top 列表即可保持正确。
+    """
+
+    def __init__(self, top_k: int = 10, max_entries: int = 20000):
+        self.top_k = top_k
+        self.max_entries = max_entries
+        self.root = _Node()
+        self.entries: dict[str, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(
+        self,
+        text: str,
+        weight: float,
+        kind: str = "poi",
+        poi: dict[str, Any] | None = None,
+    ) -> None:
+        """记录一次出现（新条目在容量已满时忽略，已有条目照常加分）"""
+        key = normalize_text(text)
+        if not key:
+            return
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_entries:
+                return
+            entry = _Entry(key, text, kind)
+            self.entries[key] = entry
+        if poi is not None and entry.poi is None:
+            entry.poi = poi
+            entry.kind = "poi"
+            entry.text = text
+        entry.score += weight
+
+        node = self.root
+        self._promote(node, entry)
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            self._promote(node, entry)
+
+    def _promote(self, node: _Node, entry: _Entry) -> None:
+        top = node.top
+        if entry not in top:
+            if len(top) >= self.top_k and top[-1].score >= entry.score:
+                return
+            top.append(entry)
+        top.sort(key=lambda e: -e.score)
+        del top[self.top_k:]
+
+    def suggest(self, q: str, limit: int = 10) -> list[_Entry]:
+        node = self.root
+        for ch in normalize_text(q):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.top[:limit]
+
+
+class SuggestService:
+    """
+    按城市维护的联想词索引
+
+    - 搜索结果中的 POI 名称与用户提交的搜索词会被记录并累加热度；
+      搜索词只在结果中有 POI 名称包含它时才计入，任意字符串无法靠重复搜索进入联想
+    - 某城市首次联想时，从本地 POI 存储加载该城市已见过的 POI 名称
+    - 只为有真实 POI 的城市建立索引，城市数不超过 SUGGEST_MAX_CITIES
+    """
+
+    def __init__(
+        self,
+        top_k: int | None = None,
+        max_entries: int | None = None,
+        max_cities: int | None = None,
+    ):
+        settings = get_settings()
+        self.top_k = top_k or settings.SUGGEST_TOP_K
+        self.max_entries = max_entries or settings.SUGGEST_MAX_ENTRIES_PER_CITY
+        self.max_cities = max_cities or settings.SUGGEST_MAX_CITIES
+        self._indexes: dict[str, SuggestIndex] = {}
+        self._warmed: set[str] = set()
+        # 预热时本地存储中没有 POI 的城市（LRU，避免对未知城市反复查库）
+        self._cold: OrderedDict[str, None] = OrderedDict()
+
+    def _index(self, city: str, create: bool = False) -> SuggestIndex | None:
+        key = normalize_city(city)
+        index = self._indexes.get(key)
+        if index is None and create and len(self._indexes) < self.max_cities:
+            index = SuggestIndex(top_k=self.top_k, max_entries=self.max_entries)
+            self._indexes[key] = index
+        return index
+
+    def observe_pois(self, city: str, pois: list[dict[str, Any]]) -> None:
+        """记录搜索结果中出现的 POI"""
+        named = [poi for poi in pois if poi.get("name")]
+        index = self._index(city, create=True) if named else None
+        if index is None:
+            return
+        for poi in named:
+            index.add(poi["name"], POI_WEIGHT, poi=_poi_summary(poi))
+
+    def observe_query(self, city: str, keyword: str, pois: list[dict[str, Any]]) -> None:
+        """记录用户提交的搜索词（pois 为该次搜索的结果，没有名称包含搜索词的 POI 时不计入）"""
+        key = normalize_text(keyword)
+        if not key or not any(key in normalize_text(poi.get("name") or "") for poi in pois):
+            return
+        index = self._index(city, create=True)
+        if index is not None:
+            index.add(keyword.strip(), QUERY_WEIGHT, kind="query")
+
+    async def warm(self, city: str) -> None:
+        """首次访问某城市时从本地存储加载已见过的 POI 名称"""
+        key = normalize_city(city)
+        if key in self._warmed or key in self._cold:
+            return
+        store = get_amap_source().poi_store
+        if store is None:
+            return
+        try:
+            pois = await asyncio.to_thread(store.get_city_pois, city)
+        except Exception as e:
+            logger.warning(f"Suggest warm-up for {city} failed: {e}")
+            return
+        self.observe_pois(city, pois)
+        if key in self._indexes:
+            self._warmed.add(key)
+        else:
+            self._cold[key] = None
+            while len(self._cold) > self.max_cities:
+                self._cold.popitem(last=False)
+
+    async def suggest(self, city: str, q: str, limit: int = 10) -> list[dict[str, Any]]:
+        await self.warm(city)
+        index = self._index(city)
+        if index is None:
+            return []
+        return [
+            {"text": e.text, "kind": e.kind, "score": e.score, **(e.poi or {})}
+            for e in index.suggest(q, limit)
+        ]
+
+    def stats(self) -> dict[str, int]:
+        return {city: len(index) for city, index in self._indexes.items()}
+
+
+def _poi_summary(poi: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "source_id": poi.get("id"),
+        "category": poi.get("category"),
+        "location": poi.get("location"),
+    }
+
+
+@lru_cache()
+def get_suggest_service() -> SuggestService:
+    """进程内共享的联想词服务"""
+    return SuggestService()
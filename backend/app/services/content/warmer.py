@@ -0,0 +1,141 @@
+"""Scheduled cache warmer for the most popular AMap keyword searches."""
+import asyncio
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Hashable
+
+from loguru import logger
+
+from ...core.config import get_settings
+from ..sources.amap import AmapSource, get_amap_source, low_priority
+from ..sources.breaker import CircuitState
+
+
+class CacheWarmer:
+    """
+    搜索缓存预热
+
+    - 从搜索缓存的按 key 统计中挑出访问量最高的 (keyword, city, category, page) 组合
+    - 缓存条目已过期或即将过期（剩余有效期不足 TTL 的 1 - refresh_ratio）时重新拉取并写回缓存与本地存储
+    - 预热写入内存缓存的条目有效期延长到闲时窗口结束后再保留 hold_hours 小时，覆盖早高峰，
+      否则闲时写入的条目在白天流量到来前就已过期
+    - 每轮最多消耗 call_budget 次上游调用，全部以低优先级发起
+    - 只在闲时窗口 [offpeak_start, offpeak_end) 内运行
+    - 预热条目被用户请求首次命中（内存缓存或本地存储）时计入 misses_prevented
+    """
+
+    def __init__(
+        self,
+        amap: AmapSource,
+        top_keys: int = 200,
+        min_demand: int = 2,
+        call_budget: int = 100,
+        refresh_ratio: float = 0.8,
+        offpeak_start: int = 2,
+        offpeak_end: int = 7,
+        hold_hours: float = 4.0,
+    ):
+        self.amap = amap
+        self.top_keys = top_keys
+        self.min_demand = min_demand
+        self.call_budget = call_budget
+        self.refresh_ratio = refresh_ratio
+        self.offpeak_start = offpeak_start
+        self.offpeak_end = offpeak_end
+        self.hold_hours = hold_hours
+
+        self.runs = 0
+        self.upstream_calls = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.last_run_at: datetime | None = None
+
+    def in_offpeak(self, now: datetime) -> bool:
+        """当前是否处于闲时窗口（支持跨零点，如 22-6）"""
+        start, end = self.offpeak_start, self.offpeak_end
+        if start <= end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    def warm_ttl(self, now: datetime) -> float:
+        """预热条目的有效期（秒）：到下一次闲时窗口结束，再加 hold_hours"""
+        end = now.replace(hour=self.offpeak_end, minute=0, second=0, microsecond=0)
+        if end <= now:
+            end += timedelta(days=1)
+        return (end - now).total_seconds() + self.hold_hours * 3600
+
+    def candidates(self) -> list[Hashable]:
+        """需要刷新的热门搜索 key（按访问量降序）"""
+        cache = self.amap.search_cache
+        refresh_within = cache.ttl * (1 - self.refresh_ratio)
+        keys = []
+        for key, demand in cache.popular_keys(self.top_keys):
+            if demand < self.min_demand:
+                break
+            remaining = cache.expires_in(key)
+            if remaining is None or remaining <= refresh_within:
+                keys.append(key)
+        return keys
+
+    async def run_once(self) -> dict[str, int]:
+        """执行一轮预热，返回本轮的刷新统计"""
+        refreshed = failed = 0
+        with low_priority():
+            for key in self.candidates()[:self.call_budget]:
+                try:
+                    ok = await self.amap.refresh_search_page(key, ttl=self.warm_ttl(datetime.now()))
+                except Exception as e:
+                    logger.warning(f"Cache warm-up for {key} failed: {e}")
+                    ok = False
+                if ok:
+                    refreshed += 1
+                else:
+                    failed += 1
+                    if self.amap.breaker.state != CircuitState.CLOSED:
+                        break  # 上游不可用，本轮不再继续消耗预算
+
+        self.runs += 1
+        self.upstream_calls += refreshed + failed
+        self.refreshed += refreshed
+        self.failed += failed
+        self.last_run_at = datetime.now()
+        return {"refreshed": refreshed, "failed": failed}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "upstream_calls": self.upstream_calls,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "misses_prevented": self.amap.search_cache.prewarmed_hits + self.amap.prewarmed_store_hits,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
+
+
+async def run_warmer_loop(warmer: CacheWarmer, interval: float) -> None:
+    """定期在闲时窗口内预热搜索缓存（在应用启动时作为后台任务运行）"""
+    while True:
+        await asyncio.sleep(interval)
+        if not warmer.in_offpeak(datetime.now()):
+            continue
+        try:
+            result = await warmer.run_once()
+            logger.info(f"Search cache warmed: {result}")
+        except Exception as e:
+            logger.warning(f"Search cache warm-up failed: {e}")
+
+
+@lru_cache()
+def get_cache_warmer() -> CacheWarmer:
+    """进程内共享的搜索缓存预热器"""
+    settings = get_settings()
+    return CacheWarmer(
+        get_amap_source(),
+        top_keys=settings.CACHE_WARMER_TOP_KEYS,
+        min_demand=settings.CACHE_WARMER_MIN_DEMAND,
+        call_budget=settings.CACHE_WARMER_CALL_BUDGET,
+        refresh_ratio=settings.CACHE_WARMER_REFRESH_RATIO,
+        offpeak_start=settings.CACHE_WARMER_OFFPEAK_START_HOUR,
+        offpeak_end=settings.CACHE_WARMER_OFFPEAK_END_HOUR,
+        hold_hours=settings.CACHE_WARMER_HOLD_HOURS,
+    )
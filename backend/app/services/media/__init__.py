@@ -0,0 +1 @@
+# Media proxy services (image thumbnails)
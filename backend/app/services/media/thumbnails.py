@@ -0,0 +1,270 @@
+"""Upstream photo proxy with a size-bounded on-disk WebP thumbnail cache."""
+import asyncio
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ...core.config import get_settings
+
+
+class ThumbnailError(Exception):
+    """图片获取或转换失败"""
+
+
+class HostNotAllowed(ThumbnailError):
+    """图片地址不在允许代理的域名内"""
+
+
+def host_allowed(url: str, allowed_hosts: list[str]) -> bool:
+    """仅允许 http(s) 且域名为 allowed_hosts 之一或其子域名"""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        return False
+    return any(host == h or host.endswith("." + h) for h in allowed_hosts)
+
+
+class ThumbnailCache:
+    """
+    图片缩略图代理
+
+    - 同一 (url, 宽度) 只回源一次：下载原图、按宽度等比缩放、编码为 WebP 写入磁盘
+    - 磁盘缓存按总字节数做 LRU 淘汰；访问顺序保存在内存中，
+      命中时同步更新文件 mtime，重启后按 mtime 恢复顺序
+    - 缩略图内容由 (url, 宽度) 决定，ETag 即缓存 key
+    - 每次请求（含重定向）都校验域名，避免被用作任意地址的代理
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int,
+        allowed_hosts: list[str],
+        max_source_bytes: int = 15 * 1024 * 1024,
+        timeout: float = 10.0,
+        quality: int = 80,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.allowed_hosts = [h.lower() for h in allowed_hosts]
+        self.max_source_bytes = max_source_bytes
+        self.timeout = timeout
+        self.quality = quality
+
+        self._entries: OrderedDict[str, int] = OrderedDict()  # key -> 文件字节数，最久未用在前
+        self._bytes = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._client: httpx.AsyncClient | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.upstream_bytes = 0
+
+    @staticmethod
+    def cache_key(url: str, width: int) -> str:
+        return hashlib.sha256(f"{width}|{url}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.webp"
+
+    async def _load(self) -> None:
+        """首次使用时在线程中扫描磁盘，按 mtime 恢复 LRU 顺序"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            files = await asyncio.to_thread(self._scan)
+            for _, key, size in files:
+                if key not in self._entries:
+                    self._entries[key] = size
+                    self._bytes += size
+            self._loaded = True
+            await self._evict()
+
+    def _scan(self) -> list[tuple[float, str, int]]:
+        files = []
+        for path in self.directory.glob("*/*.webp"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        return sorted(files)
+
+    async def get(self, url: str, width: int) -> tuple[str, bytes]:
+        """返回 (ETag 用的 key, WebP 字节)"""
+        if not host_allowed(url, self.allowed_hosts):
+            raise HostNotAllowed(url)
+        await self._load()
+        key = self.cache_key(url, width)
+
+        data = await self._read(key)
+        if data is not None:
+            self.hits += 1
+            return key, data
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                data = await self._read(key)
+                if data is not None:
+                    self.hits += 1
+                    return key, data
+                self.misses += 1
+                source = await self._fetch(url)
+                data = await asyncio.to_thread(self._resize, source, width)
+                await asyncio.to_thread(self._write, key, data)
+                await self._add(key, len(data))
+                return key, data
+        finally:
+            if not lock.locked():
+                self._locks.pop(key, None)
+
+    async def _read(self, key: str) -> bytes | None:
+        if key not in self._entries:
+            return None
+        path = self._path(key)
+        try:
+            data = await asyncio.to_thread(_read_and_touch, path)
+        except FileNotFoundError:
+            data = None
+        # 读取期间条目可能已被淘汰
+        if key not in self._entries:
+            return data
+        if data is None:
+            self._bytes -= self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    async def _fetch(self, url: str) -> bytes:
+        """下载原图（流式读取，超过 max_source_bytes 即中止）"""
+        buffer = bytearray()
+        try:
+            async with self._get_client().stream("GET", url) as response:
+                if response.status_code != 200:
+                    raise ThumbnailError(f"upstream returned {response.status_code}")
+                async for chunk in response.aiter_bytes():
+                    buffer += chunk
+                    if len(buffer) > self.max_source_bytes:
+                        raise ThumbnailError("source image too large")
+        except httpx.HTTPError as e:
+            raise ThumbnailError(f"fetch failed: {e}") from e
+        self.upstream_bytes += len(buffer)
+        return bytes(buffer)
+
+    def _resize(self, source: bytes, width: int) -> bytes:
+        try:
+            with Image.open(io.BytesIO(source)) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+                if image.width > width:
+                    height = max(1, round(image.height * width / image.width))
+                    image = image.resize((width, height), Image.Resampling.LANCZOS)
+                out = io.BytesIO()
+                image.save(out, format="WEBP", quality=self.quality, method=4)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            raise ThumbnailError("not a valid image") from e
+        return out.getvalue()
+
+    def _write(self, key: str, data: bytes) -> None:
+        """写入文件（在线程中执行；LRU 记录只在事件循环上修改）"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    async def _add(self, key: str, size: int) -> None:
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)
+        self._entries[key] = size
+        self._bytes += size
+        await self._evict()
+
+    async def _evict(self) -> None:
+        """超出容量时淘汰最久未用的条目：记录在事件循环上更新，文件在线程中删除"""
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            evicted.append(self._path(key))
+        if evicted:
+            await asyncio.to_thread(_unlink_all, evicted)
+
+    async def _check_host(self, request: httpx.Request) -> None:
+        if not host_allowed(str(request.url), self.allowed_hosts):
+            raise HostNotAllowed(str(request.url))
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """进程内复用的 HTTP 连接池（跟随重定向，每一跳都校验域名）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                event_hooks={"request": [self._check_host]},
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """关闭 HTTP 连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "upstream_bytes": self.upstream_bytes,
+        }
+
+
+def _read_and_touch(path: Path) -> bytes:
+    """读取文件并更新 mtime（重启后按 mtime 恢复 LRU 顺序）"""
+    data = path.read_bytes()
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return data
+
+
+def _unlink_all(paths: list[Path]) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@lru_cache()
+def get_thumbnail_cache() -> ThumbnailCache:
+    """进程内共享的缩略图缓存"""
+    settings = get_settings()
+    return ThumbnailCache(
+        settings.MEDIA_CACHE_DIR,
+        max_bytes=settings.MEDIA_CACHE_MAX_MB * 1024 * 1024,
+        allowed_hosts=settings.MEDIA_ALLOWED_HOSTS,
+        max_source_bytes=settings.MEDIA_MAX_SOURCE_MB * 1024 * 1024,
+        timeout=settings.MEDIA_FETCH_TIMEOUT_SECONDS,
+        quality=settings.MEDIA_THUMB_QUALITY,
+    )
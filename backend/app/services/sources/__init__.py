@@ -1,6 +1,19 @@
 # Data source integrations (AMap, Ctrip, Xiaohongshu, etc.)
 from .base import BaseSource, SourceResult, SourceType
-from .amap import AmapSource
-from .xiaohongshu import XiaohongshuSource
+from .amap import AmapSource, get_amap_source
+from .cache import TTLCache
+from .local import LocalPoiSource, get_local_poi_source
+from .xiaohongshu import XiaohongshuSource, get_xiaohongshu_source
 
-__all__ = ["BaseSource", "SourceResult", "SourceType", "AmapSource", "XiaohongshuSource"]
+__all__ = [
+    "BaseSource",
+    "SourceResult",
+    "SourceType",
+    "AmapSource",
+    "get_amap_source",
+    "TTLCache",
+    "LocalPoiSource",
+    "get_local_poi_source",
+    "XiaohongshuSource",
+    "get_xiaohongshu_source",
+]
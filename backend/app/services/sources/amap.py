@@ -1,9 +1,73 @@
 """AMap (高德地图) API integration for POI data."""
+import asyncio
 import httpx
-from typing import Any
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterator
+from loguru import logger
 from .base import BaseSource, SourceType, SourceResult
+from .breaker import CircuitBreaker, CircuitState
+from .cache import TTLCache
+from .geo import (
+    format_coord,
+    geohash_bbox,
+    geohash_children,
+    geohash_cover,
+    haversine_m,
+    normalize_address,
+    parse_coord,
+    quantize_coord,
+)
+from .poi_store import PoiStore
+from .ratelimit import ApiKeyPool, RateLimitTimeout
 from ...core.config import get_settings
 
+# 高德返回的 QPS 超限类 infocode（需冷却后换 Key 重试）
+AMAP_QPS_EXCEEDED_INFOCODES = {"10004", "10014", "10019", "10020", "10021"}
+# 日配额用尽
+AMAP_DAILY_QUOTA_INFOCODES = {"10003", "10044", "10045"}
+
+# 当前上下文中的高德调用是否为低优先级（后台预取等），见 low_priority()
+_low_priority: ContextVar[bool] = ContextVar("amap_low_priority", default=False)
+
+
+@contextmanager
+def low_priority() -> Iterator[None]:
+    """
+    在此上下文（及其中创建的任务）内发起的高德调用以低优先级从 Key 池取令牌，
+    不与交互请求争抢配额
+    """
+    token = _low_priority.set(True)
+    try:
+        yield
+    finally:
+        _low_priority.reset(token)
+
+
+class AmapError(Exception):
+    """
+    高德接口调用失败（网络错误、状态码非 1、限流等待超时等）
+    
+    transient 为 True 表示上游不可用类错误（超时、网络、限流），计入熔断统计。
+    """
+    
+    def __init__(self, message: str, transient: bool = True):
+        super().__init__(message)
+        self.transient = transient
+
+
+class AmapRateLimited(AmapError):
+    """
+    所有 Key 都被高德限流，或本地限流排队超时
+
+    属于本服务的调用配额问题而非上游故障，不计入熔断统计；API 层返回 429。
+    """
+
+    def __init__(self, message: str):
+        super().__init__(message, transient=False)
+
 
 class AmapSource(BaseSource):
     """
@@ -13,17 +77,83 @@ class AmapSource(BaseSource):
     
     支持功能:
     - 关键词搜索 POI
-    - 周边搜索
+    - 周边搜索（按 geohash 瓦片缓存）
     - POI 详情查询
+    - 地理编码 / 逆地理编码（坐标量化缓存）
+    - 路径规划（驾车/打车、公交）
     """
     
     source_type = SourceType.AMAP
     BASE_URL = "https://restapi.amap.com/v3"
+    MAX_OFFSET = 25  # 高德单页最大条数
     
-    def __init__(self):
+    def __init__(self, poi_store: PoiStore | None = None, use_store: bool = True):
         self.settings = get_settings()
-        # 使用 AMAP_KEY_WEB 作为后端 Web Service API Key
-        self.api_key = self.settings.AMAP_KEY_WEB
+        # 使用 AMAP_KEY_WEB (+ AMAP_KEYS_WEB) 作为后端 Web Service API Key 池
+        self.key_pool = ApiKeyPool(
+            self.settings.amap_web_keys,
+            qps=self.settings.AMAP_KEY_QPS,
+            max_wait=self.settings.AMAP_KEY_MAX_WAIT_SECONDS,
+            low_priority_reserve_ratio=self.settings.AMAP_KEY_LOW_PRIORITY_RESERVE_RATIO,
+        )
+        self._client: httpx.AsyncClient | None = None
+        # 文本搜索结果缓存: (keyword, city, types, page, offset) -> SourceResult
+        self.search_cache = TTLCache(
+            ttl=self.settings.AMAP_CACHE_TTL_SECONDS,
+            maxsize=self.settings.AMAP_CACHE_MAX_ENTRIES,
+            name="amap_place_text",
+            stale_ttl=self.settings.AMAP_CACHE_STALE_SECONDS,
+        )
+        # 周边搜索瓦片缓存: (geohash, types, keyword) -> 瓦片内 POI 列表
+        self.around_cache = TTLCache(
+            ttl=self.settings.AMAP_AROUND_CACHE_TTL_SECONDS,
+            maxsize=self.settings.AMAP_AROUND_CACHE_MAX_ENTRIES,
+            name="amap_around_tiles",
+            stale_ttl=self.settings.AMAP_CACHE_STALE_SECONDS,
+        )
+        # 逆地理编码缓存: 量化后的 (lng, lat) -> regeocode
+        self.regeo_cache = TTLCache(
+            ttl=self.settings.AMAP_GEO_CACHE_TTL_SECONDS,
+            maxsize=self.settings.AMAP_GEO_CACHE_MAX_ENTRIES,
+            name="amap_regeo",
+            stale_ttl=self.settings.AMAP_CACHE_STALE_SECONDS,
+        )
+        # 地理编码缓存: (归一化地址, city) -> geocodes
+        self.geocode_cache = TTLCache(
+            ttl=self.settings.AMAP_GEO_CACHE_TTL_SECONDS,
+            maxsize=self.settings.AMAP_GEO_CACHE_MAX_ENTRIES,
+            name="amap_geocode",
+            stale_ttl=self.settings.AMAP_CACHE_STALE_SECONDS,
+        )
+        # 路径规划缓存: (mode, 量化起点, 量化终点, city) -> {distance_m, duration_s}
+        self.route_cache = TTLCache(
+            ttl=self.settings.AMAP_ROUTE_CACHE_TTL_SECONDS,
+            maxsize=self.settings.AMAP_ROUTE_CACHE_MAX_ENTRIES,
+            name="amap_route",
+            stale_ttl=self.settings.AMAP_CACHE_STALE_SECONDS,
+        )
+        # POI 详情缓存: POI id -> 标准化 POI
+        self.detail_cache = TTLCache(
+            ttl=self.settings.AMAP_DETAIL_CACHE_TTL_SECONDS,
+            maxsize=self.settings.AMAP_DETAIL_CACHE_MAX_ENTRIES,
+            name="amap_detail",
+        )
+        # 上游连续失败时熔断，熔断期间返回最近一次成功的结果
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.settings.AMAP_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=self.settings.AMAP_BREAKER_RESET_SECONDS,
+            name="amap",
+        )
+        # 本地持久化 POI 存储（重启后仍可命中）；use_store=False 时不打开存储
+        if not use_store:
+            poi_store = None
+        elif poi_store is None and self.settings.POI_STORE_ENABLED:
+            poi_store = PoiStore()
+        self.poi_store = poi_store
+        self._background_tasks: set[asyncio.Task] = set()
+        # 预热写入本地存储、尚未被用户请求命中的搜索 key（最久的在前）
+        self._prewarmed_store_keys: OrderedDict[str, None] = OrderedDict()
+        self.prewarmed_store_hits = 0
     
     async def search(
         self,
@@ -32,6 +162,7 @@ class AmapSource(BaseSource):
         category: str | None = None,
         page: int = 1,
         page_size: int = 20,
+        lightweight: bool = False,
     ) -> SourceResult:
         """
         搜索 POI
@@ -41,94 +172,858 @@ class AmapSource(BaseSource):
             city: 城市名称
             category: POI 类型 (如 "餐饮服务", "风景名胜", "住宿服务")
             page: 页码
-            page_size: 每页数量 (最大 25)
+            page_size: 每页数量；超过 25 时并发拉取多个高德分页后合并
+            lightweight: 列表模式，请求 extensions=base 且不保留 raw，
+                评分/营业时间/照片等详情字段通过 get_detail 按需获取
         """
-        if not self.api_key:
+        if not self.key_pool:
             return SourceResult(
                 source=self.source_type,
                 success=False,
                 error="AMAP_KEY_WEB not configured"
             )
         
+        if page_size <= self.MAX_OFFSET:
+            return await self._search_page(
+                keyword, city, category, page, page_size, lightweight
+            )
+        return await self._search_multi_page(
+            keyword, city, category, page, page_size, lightweight
+        )
+    
+    async def _search_multi_page(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None,
+        page: int,
+        page_size: int,
+        lightweight: bool = False,
+    ) -> SourceResult:
+        """
+        将大分页映射为若干 25 条的高德分页并发请求，按顺序合并并按 POI id 去重
+        
+        某一页失败时只保留其之前的连续结果，保证返回顺序与分页语义一致。
+        """
+        start, first_page, last_page = self._page_span(page, page_size)
+        
+        semaphore = asyncio.Semaphore(self.settings.AMAP_MAX_CONCURRENT_PAGES)
+        
+        async def fetch(amap_page: int) -> SourceResult:
+            async with semaphore:
+                return await self._search_page(
+                    keyword, city, category, amap_page, self.MAX_OFFSET, lightweight
+                )
+        
+        results = await asyncio.gather(
+            *(fetch(p) for p in range(first_page, last_page + 1))
+        )
+        
+        if not results[0].success:
+            return results[0]
+        
+        merged: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        total_count = 0
+        stale = False
+        for result in results:
+            if not result.success:
+                break
+            total_count = max(total_count, result.total_count)
+            stale = stale or result.stale
+            for poi in result.data:
+                poi_id = poi.get("id")
+                if poi_id and poi_id in seen:
+                    continue
+                if poi_id:
+                    seen.add(poi_id)
+                merged.append(poi)
+        
+        skip = start - (first_page - 1) * self.MAX_OFFSET
+        return SourceResult(
+            source=self.source_type,
+            success=True,
+            data=merged[skip:skip + page_size],
+            total_count=total_count,
+            stale=stale,
+        )
+    
+    async def iter_search(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        lightweight: bool = False,
+    ) -> AsyncIterator[SourceResult]:
+        """
+        流式搜索：多分页时每个高德分页到达即产出其落在请求范围内的 POI
+        
+        各分页按完成顺序产出（不保证顺序），跨分页按 POI id 去重；
+        只有全部分页都失败时才产出失败结果。
+        """
+        if not self.key_pool or page_size <= self.MAX_OFFSET:
+            yield await self.search(keyword, city, category, page, page_size, lightweight)
+            return
+        
+        start, first_page, last_page = self._page_span(page, page_size)
+        end = start + page_size
+        semaphore = asyncio.Semaphore(self.settings.AMAP_MAX_CONCURRENT_PAGES)
+        
+        async def fetch(amap_page: int) -> tuple[int, SourceResult]:
+            async with semaphore:
+                return amap_page, await self._search_page(
+                    keyword, city, category, amap_page, self.MAX_OFFSET, lightweight
+                )
+        
+        tasks = [
+            asyncio.ensure_future(fetch(p)) for p in range(first_page, last_page + 1)
+        ]
+        seen: set[str] = set()
+        failure: SourceResult | None = None
+        succeeded = False
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                amap_page, result = await next_done
+                if not result.success:
+                    failure = failure or result
+                    continue
+                succeeded = True
+                # 该分页在请求范围内的部分
+                offset = (amap_page - 1) * self.MAX_OFFSET
+                lo, hi = max(start - offset, 0), end - offset
+                pois = []
+                for poi in result.data[lo:hi]:
+                    poi_id = poi.get("id")
+                    if poi_id and poi_id in seen:
+                        continue
+                    if poi_id:
+                        seen.add(poi_id)
+                    pois.append(poi)
+                yield result.model_copy(update={"data": pois})
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        if not succeeded and failure is not None:
+            yield failure
+    
+    def _page_span(self, page: int, page_size: int) -> tuple[int, int, int]:
+        """大分页的起始下标，以及覆盖它所需的首/末高德分页号"""
+        start = (page - 1) * page_size
+        first_page = start // self.MAX_OFFSET + 1
+        last_page = (start + page_size - 1) // self.MAX_OFFSET + 1
+        return start, first_page, last_page
+    
+    async def _search_page(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None,
+        page: int,
+        offset: int,
+        lightweight: bool = False,
+    ) -> SourceResult:
+        """
+        带缓存的单页搜索
+        
+        熔断器未闭合时优先返回过期的旧结果（stale=True）；半开状态下同时在后台
+        发起一次刷新作为试探请求。上游失败时同样回退到旧结果。
+        
+        列表模式的结果单独缓存；已有完整结果（字段是列表模式的超集）时直接复用。
+        """
+        cache_key = (keyword, city, category, page, offset)
+        if lightweight:
+            full = self.search_cache.get(cache_key, None, record=False)
+            if full is not None:
+                return full
+            cache_key += ("base",)
+        
+        def load() -> Any:
+            return self.search_cache.get_or_load(
+                cache_key,
+                lambda: self._load_text_page(
+                    keyword, city, category, page, offset, lightweight
+                ),
+                should_cache=lambda result: result.success,
+                shared=not _low_priority.get(),
+            )
+        
+        state = self.breaker.state
+        if state != CircuitState.CLOSED and cache_key not in self.search_cache:
+            stale = await self._stale_text_page(cache_key)
+            if stale is not None:
+                if state == CircuitState.HALF_OPEN:
+                    self._spawn(load())
+                return stale
+        
+        result = await load()
+        if not result.success:
+            stale = await self._stale_text_page(cache_key)
+            if stale is not None:
+                return stale
+        return result
+    
+    async def _stale_text_page(self, cache_key: tuple) -> SourceResult | None:
+        """最近一次成功的搜索结果（内存中已过期的条目或本地存储中的旧记录）"""
+        result = self.search_cache.get_stale(cache_key, None)
+        if result is None:
+            stored = await self._store_call("get_search", self._store_key(cache_key[:5]), None)
+            if stored is None:
+                return None
+            pois, total_count = stored
+            result = SourceResult(
+                source=self.source_type,
+                success=True,
+                data=pois,
+                total_count=total_count,
+            )
+        return result.model_copy(update={"stale": True})
+    
+    async def _load_text_page(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None,
+        page: int,
+        offset: int,
+        lightweight: bool = False,
+    ) -> SourceResult:
+        """
+        内存缓存未命中时：先查本地 POI 存储，仍未命中再请求高德
+        
+        列表模式的结果字段不全，不写入本地存储，以免覆盖完整记录。
+        """
+        store_key = self._store_key((keyword, city, category, page, offset))
+        
+        stored = await self._store_call(
+            "get_search", store_key, self.settings.POI_STORE_SEARCH_TTL_SECONDS
+        )
+        if stored is not None:
+            if store_key in self._prewarmed_store_keys:
+                del self._prewarmed_store_keys[store_key]
+                self.prewarmed_store_hits += 1
+            pois, total_count = stored
+            return SourceResult(
+                source=self.source_type,
+                success=True,
+                data=pois,
+                total_count=total_count,
+            )
+        
+        result = await self._fetch_text_page(
+            keyword, city, category, page, offset, lightweight
+        )
+        if result.success and not lightweight and self.poi_store is not None:
+            self._spawn(asyncio.to_thread(
+                self.poi_store.save_search,
+                store_key,
+                result.data,
+                result.total_count,
+                self.source_type.value,
+            ))
+        return result
+    
+    async def refresh_search_page(self, cache_key: tuple, ttl: float | None = None) -> bool:
+        """
+        绕过缓存与本地存储重新拉取一页搜索结果并写回（缓存预热用）
+        
+        内存缓存与本地存储中的预热条目第一次被用户请求命中时，分别计入
+        search_cache.prewarmed_hits 与 prewarmed_store_hits。
+        
+        Args:
+            cache_key: search_cache 的 key，即 (keyword, city, category, page, offset[, "base"])
+            ttl: 写入内存缓存的有效期，默认为 AMAP_CACHE_TTL_SECONDS
+        
+        Returns:
+            是否刷新成功
+        """
+        keyword, city, category, page, offset = cache_key[:5]
+        lightweight = cache_key[5:] == ("base",)
+        result = await self._fetch_text_page(keyword, city, category, page, offset, lightweight)
+        if not result.success:
+            return False
+        self.search_cache.set(cache_key, result, prewarmed=True, ttl=ttl)
+        if not lightweight and self.poi_store is not None:
+            store_key = self._store_key(cache_key)
+            self._spawn(asyncio.to_thread(
+                self.poi_store.save_search,
+                store_key,
+                result.data,
+                result.total_count,
+                self.source_type.value,
+            ))
+            self._prewarmed_store_keys[store_key] = None
+            self._prewarmed_store_keys.move_to_end(store_key)
+            while len(self._prewarmed_store_keys) > self.search_cache.maxsize:
+                self._prewarmed_store_keys.popitem(last=False)
+        return True
+    
+    @staticmethod
+    def _store_key(cache_key: tuple) -> str:
+        return "|".join("" if part is None else str(part) for part in cache_key)
+    
+    async def _store_call(self, method: str, *args: Any) -> Any:
+        """在线程中访问本地 POI 存储，存储未启用或出错时返回 None"""
+        if self.poi_store is None:
+            return None
+        try:
+            return await asyncio.to_thread(getattr(self.poi_store, method), *args)
+        except Exception as e:
+            logger.warning(f"POI store {method} failed: {e}")
+            return None
+    
+    async def _fetch_text_page(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None,
+        page: int,
+        offset: int,
+        lightweight: bool = False,
+    ) -> SourceResult:
+        """请求高德关键字搜索的单页结果"""
         params = {
-            "key": self.api_key,
             "keywords": keyword,
             "city": city,
             "citylimit": "true",
-            "offset": min(page_size, 25),
+            "offset": offset,
             "page": page,
-            "extensions": "all",  # 返回详细信息
+            # all 返回评分/照片/营业时间等详细信息，base 仅返回基础字段
+            "extensions": "base" if lightweight else "all",
         }
         
         if category:
             params["types"] = category
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/place/text",
-                    params=params,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") != "1":
-                    return SourceResult(
-                        source=self.source_type,
-                        success=False,
-                        error=data.get("info", "Unknown error")
+            data = await self._request("/place/text", params)
+        except AmapError as e:
+            return SourceResult(
+                source=self.source_type,
+                success=False,
+                error=str(e),
+                rate_limited=isinstance(e, AmapRateLimited),
+            )
+        
+        pois = data.get("pois", [])
+        return SourceResult(
+            source=self.source_type,
+            success=True,
+            data=[self._normalize_poi(poi, include_raw=not lightweight) for poi in pois],
+            total_count=int(data.get("count", 0))
+        )
+    
+    async def _request(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        """
+        调用高德 Web Service 接口
+        
+        经过熔断器，并受 AMAP_REQUEST_BUDGET_SECONDS 总耗时预算约束（含排队等待 Key）。
+        """
+        if not self.breaker.allow_request():
+            raise AmapError("AMap circuit breaker open")
+        
+        try:
+            data = await asyncio.wait_for(
+                self._request_with_rotation(path, params),
+                timeout=self.settings.AMAP_REQUEST_BUDGET_SECONDS,
+            )
+        except asyncio.CancelledError:
+            # 调用方取消（数据源截止时间、流式搜索取消、客户端断开），与上游健康状况无关：
+            # 只归还半开试探名额，不计失败
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise AmapError("AMap request exceeded latency budget")
+        except RateLimitTimeout as e:
+            # 本地限流排队超时，与上游健康状况无关
+            self.breaker.release()
+            raise AmapRateLimited(str(e)) from e
+        except AmapRateLimited:
+            # Key 全部被高德限流：上游可达，只是配额不足，不计成功也不计失败
+            self.breaker.release()
+            raise
+        except AmapError as e:
+            if e.transient:
+                self.breaker.record_failure()
+            else:
+                # 上游可达，只是请求本身出错
+                self.breaker.record_success()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        
+        self.breaker.record_success()
+        return data
+    
+    async def _request_with_rotation(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        """
+        按 Key 池轮换调用高德接口
+        
+        从 Key 池中取出负载最低的 Key；遇到 QPS 超限时冷却该 Key 并换 Key 重试，
+        所有 Key 在等待预算内都不可用或重试次数用尽时抛出 AmapRateLimited。
+        """
+        tried: set[str] = set()
+        for _ in range(len(self.key_pool) + 1):
+            try:
+                async with self.key_pool.lease(
+                    exclude=tried, low_priority=_low_priority.get()
+                ) as key_state:
+                    response = await self._get_client().get(
+                        f"{self.BASE_URL}{path}",
+                        params={**params, "key": key_state.key},
+                        timeout=self.settings.AMAP_REQUEST_BUDGET_SECONDS,
                     )
-                
-                pois = data.get("pois", [])
-                return SourceResult(
-                    source=self.source_type,
-                    success=True,
-                    data=[self._normalize_poi(poi) for poi in pois],
-                    total_count=int(data.get("count", 0))
-                )
-                
-        except httpx.HTTPError as e:
+                    response.raise_for_status()
+                    data = response.json()
+            except httpx.HTTPError as e:
+                raise AmapError(str(e) or type(e).__name__) from e
+            except ValueError as e:
+                # 网关错误页等非 JSON 响应
+                raise AmapError("AMap returned a non-JSON response") from e
+            
+            if data.get("status") == "1":
+                return data
+            
+            infocode = str(data.get("infocode", ""))
+            if infocode in AMAP_QPS_EXCEEDED_INFOCODES:
+                self.key_pool.cooldown(key_state, self.settings.AMAP_KEY_COOLDOWN_SECONDS)
+            elif infocode in AMAP_DAILY_QUOTA_INFOCODES:
+                self.key_pool.cooldown(key_state, self.settings.AMAP_KEY_QUOTA_COOLDOWN_SECONDS)
+            else:
+                raise AmapError(data.get("info", "Unknown error"), transient=False)
+            
+            tried.add(key_state.key)
+            logger.warning(f"AMap key throttled (infocode={infocode}), rotating key")
+            if len(tried) >= len(self.key_pool):
+                # 所有 Key 都被限流过，清空排除列表，等待冷却结束
+                tried.clear()
+        
+        raise AmapRateLimited("AMap QPS limit exceeded on all keys")
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """进程内复用的 HTTP 连接池"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient()
+        return self._client
+    
+    async def aclose(self) -> None:
+        """关闭 HTTP 连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def search_around(
+        self,
+        lng: float,
+        lat: float,
+        radius: float = 1000,
+        category: str | None = None,
+        keyword: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> SourceResult:
+        """
+        周边搜索
+        
+        将查询圆拆分为固定的 geohash 瓦片，按 (瓦片, 类型, 关键词) 分别拉取并缓存，
+        不同用户相互重叠的视野查询可复用同一批瓦片。结果按距离排序，POI 带 distance 字段（米）。
+        
+        Args:
+            lng, lat: 圆心坐标
+            radius: 半径（米）
+            category: POI 类型 (如 "餐饮服务")
+            keyword: 可选关键词
+            page: 页码
+            page_size: 每页数量
+        """
+        if not self.key_pool:
+            return SourceResult(
+                source=self.source_type,
+                success=False,
+                error="AMAP_KEY_WEB not configured"
+            )
+        
+        # 瓦片过多时逐级降低精度（格子变大）
+        precision = self.settings.AMAP_AROUND_TILE_PRECISION
+        tiles = geohash_cover(lng, lat, radius, precision)
+        while len(tiles) > self.settings.AMAP_AROUND_MAX_TILES and precision > 1:
+            precision -= 1
+            tiles = geohash_cover(lng, lat, radius, precision)
+        
+        semaphore = asyncio.Semaphore(self.settings.AMAP_MAX_CONCURRENT_PAGES)
+        errors: list[AmapError] = []
+        
+        async def fetch(tile: str) -> tuple[list[dict[str, Any]], bool] | None:
+            async with semaphore:
+                try:
+                    return await self._around_tile(tile, category, keyword)
+                except AmapError as e:
+                    logger.warning(f"AMap around tile {tile} failed: {e}")
+                    errors.append(e)
+                    return None
+        
+        # POI 超出分页上限的瓦片细分为下一级精度中与查询圆相交的子瓦片，
+        # 超过细分层数或子瓦片总数上限时保留该瓦片的部分结果并标记 truncated
+        max_precision = precision + self.settings.AMAP_AROUND_SUBDIVIDE_LEVELS
+        subtile_budget = self.settings.AMAP_AROUND_MAX_SUBTILES
+        tile_results: list[tuple[list[dict[str, Any]], bool] | None] = []
+        pending = tiles
+        while pending:
+            batch, pending = pending, []
+            for tile, result in zip(batch, await asyncio.gather(*(fetch(t) for t in batch))):
+                if result is not None and result[1] and len(tile) < max_precision:
+                    children = geohash_children(tile, lng, lat, radius)
+                    if len(children) <= subtile_budget:
+                        subtile_budget -= len(children)
+                        pending.extend(children)
+                        continue
+                tile_results.append(result)
+        if tiles and all(r is None for r in tile_results):
             return SourceResult(
                 source=self.source_type,
                 success=False,
-                error=str(e)
+                error="AMap around search failed for all tiles",
+                rate_limited=all(isinstance(e, AmapRateLimited) for e in errors),
             )
+        
+        seen: set[str] = set()
+        hits: list[dict[str, Any]] = []
+        truncated = False
+        for result in tile_results:
+            if result is None:
+                continue
+            pois, tile_truncated = result
+            truncated = truncated or tile_truncated
+            for poi in pois:
+                if poi["id"] in seen:
+                    continue
+                seen.add(poi["id"])
+                loc = poi["location"]
+                distance = haversine_m(lng, lat, loc["lng"], loc["lat"])
+                if distance <= radius:
+                    hits.append({**poi, "distance": round(distance, 1)})
+        hits.sort(key=lambda p: p["distance"])
+        
+        start = (page - 1) * page_size
+        return SourceResult(
+            source=self.source_type,
+            success=True,
+            data=hits[start:start + page_size],
+            total_count=len(hits),
+            truncated=truncated,
+        )
+    
+    async def _around_tile(
+        self,
+        tile: str,
+        category: str | None,
+        keyword: str | None,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """
+        拉取单个 geohash 瓦片内的 POI（以瓦片中心为圆心、外接圆为半径请求，再裁剪到瓦片内）
+
+        返回 (POI 列表, 是否因超出 AMAP_AROUND_TILE_PAGES 分页上限而未取全)。
+        """
+        min_lng, min_lat, max_lng, max_lat = geohash_bbox(tile)
+        center_lng, center_lat = (min_lng + max_lng) / 2, (min_lat + max_lat) / 2
+        tile_radius = haversine_m(center_lng, center_lat, max_lng, max_lat)
+        
+        async def load() -> tuple[list[dict[str, Any]], bool]:
+            pois: list[dict[str, Any]] = []
+            truncated = False
+            for page in range(1, self.settings.AMAP_AROUND_TILE_PAGES + 1):
+                params: dict[str, Any] = {
+                    "location": format_coord(center_lng, center_lat),
+                    "radius": min(int(tile_radius) + 1, 50000),
+                    "sortrule": "distance",
+                    "offset": self.MAX_OFFSET,
+                    "page": page,
+                    "extensions": "all",
+                }
+                if category:
+                    params["types"] = category
+                if keyword:
+                    params["keywords"] = keyword
+                data = await self._request("/place/around", params)
+                batch = data.get("pois", [])
+                pois.extend(self._normalize_poi(p) for p in batch)
+                if len(batch) < self.MAX_OFFSET:
+                    break
+            else:
+                # 最后一页仍是满页：高德返回的总数更多时说明未取全
+                truncated = int(data.get("count") or 0) > len(pois)
+            
+            return [
+                p for p in pois
+                if p.get("id")
+                and min_lng <= p["location"]["lng"] < max_lng
+                and min_lat <= p["location"]["lat"] < max_lat
+            ], truncated
+        
+        return await self._cached_call(self.around_cache, (tile, category or "", keyword or ""), load)
     
     async def get_detail(self, item_id: str) -> dict[str, Any] | None:
-        """获取 POI 详情"""
-        if not self.api_key:
+        """
+        获取 POI 详情
+        
+        依次查询进程内缓存、本地存储中的新鲜记录、高德；同一 id 的并发请求只回源一次。
+        """
+        return await self.detail_cache.get_or_load(
+            item_id,
+            lambda: self._load_detail(item_id),
+            should_cache=lambda poi: poi is not None,
+            shared=not _low_priority.get(),
+        )
+    
+    async def get_details(self, item_ids: list[str]) -> dict[str, dict[str, Any] | None]:
+        """
+        批量获取 POI 详情，返回 id -> POI（不存在时为 None）
+        
+        缓存未命中的 id 先一次性批量查询本地存储，仍缺失的再并发请求高德
+        （并发上限 AMAP_MAX_CONCURRENT_DETAILS，整体仍受 Key 池限流约束）。
+        """
+        ids = list(dict.fromkeys(i for i in item_ids if i))
+        uncached = [i for i in ids if i not in self.detail_cache]
+        if uncached:
+            stored = await self._store_call(
+                "get_pois", uncached, self.settings.POI_STORE_TTL_SECONDS
+            ) or {}
+            for poi_id, poi in stored.items():
+                self.detail_cache.set(poi_id, poi)
+        
+        semaphore = asyncio.Semaphore(self.settings.AMAP_MAX_CONCURRENT_DETAILS)
+        
+        async def fetch(poi_id: str) -> dict[str, Any] | None:
+            async with semaphore:
+                return await self.detail_cache.get_or_load(
+                    poi_id,
+                    lambda: self._load_detail(poi_id, check_store=False),
+                    should_cache=lambda poi: poi is not None,
+                    shared=not _low_priority.get(),
+                )
+        
+        results = await asyncio.gather(*(fetch(i) for i in ids))
+        return dict(zip(ids, results))
+    
+    async def _load_detail(self, item_id: str, check_store: bool = True) -> dict[str, Any] | None:
+        """本地存储中的新鲜记录优先，上游失败时回退到旧记录"""
+        if check_store:
+            poi = await self._store_call("get_poi", item_id, self.settings.POI_STORE_TTL_SECONDS)
+            if poi is not None:
+                return poi
+        
+        if not self.key_pool:
             return None
-            
-        params = {
-            "key": self.api_key,
-            "id": item_id,
-        }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/place/detail",
-                    params=params,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") == "1" and data.get("pois"):
-                    return self._normalize_poi(data["pois"][0])
-                return None
-                
-        except httpx.HTTPError:
+            data = await self._request("/place/detail", {"id": item_id})
+        except AmapError:
+            return await self._store_call("get_poi", item_id, None)
+        
+        if not data.get("pois"):
             return None
+        
+        poi = self._normalize_poi(data["pois"][0])
+        if self.poi_store is not None:
+            self._spawn(asyncio.to_thread(
+                self.poi_store.upsert_pois,
+                [poi],
+                self.source_type.value,
+            ))
+        return poi
+    
+    async def regeo(self, lng: float, lat: float) -> dict[str, Any] | None:
+        """
+        逆地理编码
+        
+        坐标先量化到约 10 m 网格，同一网格内的请求共享缓存。
+        返回高德 regeocode 对象（extensions=all，含 pois / aois），无结果时返回 None。
+        
+        Raises:
+            AmapError: 上游不可用且无旧结果可用
+        """
+        qlng, qlat = quantize_coord(lng, lat, self.settings.AMAP_GEO_QUANTIZE_DECIMALS)
+        
+        async def load() -> dict[str, Any] | None:
+            data = await self._request("/geocode/regeo", {
+                "location": format_coord(qlng, qlat),
+                "extensions": "all",  # 返回 POI 和 AOI 信息
+                "radius": 1000,
+                "batch": "false",
+                "roadlevel": 0,
+            })
+            return data.get("regeocode") or None
+        
+        return await self._cached_call(self.regeo_cache, (qlng, qlat), load)
     
-    def _normalize_poi(self, poi: dict[str, Any]) -> dict[str, Any]:
-        """将高德 POI 数据标准化为统一格式"""
+    async def geocode(self, address: str, city: str | None = None) -> list[dict[str, Any]]:
+        """
+        地理编码（地址 -> 坐标）
+        
+        以归一化后的地址字符串和城市作为缓存键。
+        
+        Raises:
+            AmapError: 上游不可用且无旧结果可用
+        """
+        normalized = normalize_address(address)
+        
+        async def load() -> list[dict[str, Any]]:
+            params: dict[str, Any] = {"address": normalized}
+            if city:
+                params["city"] = city
+            data = await self._request("/geocode/geo", params)
+            return [self._normalize_geocode(g) for g in data.get("geocodes", [])]
+        
+        return await self._cached_call(self.geocode_cache, (normalized, city or ""), load)
+    
+    async def route(
+        self,
+        origin: tuple[float, float],
+        destination: tuple[float, float],
+        mode: str = "taxi",
+        city: str | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        路径规划，返回 {"distance_m", "duration_s"}，无可行路线时返回 None
+        
+        Args:
+            origin: 起点 (lng, lat)
+            destination: 终点 (lng, lat)
+            mode: "taxi" (驾车路线) 或 "transit" (公交/地铁换乘，需要 city)
+            city: 城市名称，公交规划必填
+        
+        Raises:
+            AmapError: 上游不可用且无旧结果可用
+        """
+        key = self._route_key(origin, destination, mode, city)
+        qo, qd = key[1:3], key[3:5]
+        
+        async def load() -> dict[str, Any] | None:
+            if mode == "transit":
+                data = await self._request("/direction/transit/integrated", {
+                    "origin": format_coord(*qo),
+                    "destination": format_coord(*qd),
+                    "city": city or "",
+                    "strategy": 0,
+                })
+                route = data.get("route") or {}
+                transits = route.get("transits") or []
+                if not transits:
+                    return None
+                return {
+                    "distance_m": float(transits[0].get("distance") or route.get("distance") or 0),
+                    "duration_s": float(transits[0].get("duration") or 0),
+                }
+            
+            data = await self._request("/direction/driving", {
+                "origin": format_coord(*qo),
+                "destination": format_coord(*qd),
+                "extensions": "base",
+                "strategy": 0,
+            })
+            paths = (data.get("route") or {}).get("paths") or []
+            if not paths:
+                return None
+            return {
+                "distance_m": float(paths[0].get("distance") or 0),
+                "duration_s": float(paths[0].get("duration") or 0),
+            }
+        
+        return await self._cached_call(self.route_cache, key, load)
+    
+    def cached_route(
+        self,
+        origin: tuple[float, float],
+        destination: tuple[float, float],
+        mode: str = "taxi",
+        city: str | None = None,
+    ) -> dict[str, Any] | None:
+        """
+        只读取路线缓存（不回源、不计入命中统计），未缓存或无可行路线时返回 None
+
+        不修改缓存内部结构，可在同步端点的线程池中调用。
+        """
+        return self.route_cache.peek(self._route_key(origin, destination, mode, city), None)
+    
+    def has_route(
+        self,
+        origin: tuple[float, float],
+        destination: tuple[float, float],
+        mode: str = "taxi",
+        city: str | None = None,
+    ) -> bool:
+        """路线缓存中是否已有该路段（含无可行路线的结果）"""
+        return self._route_key(origin, destination, mode, city) in self.route_cache
+    
+    def has_regeo(self, lng: float, lat: float) -> bool:
+        """逆地理编码缓存中是否已有该坐标所在网格"""
+        return quantize_coord(lng, lat, self.settings.AMAP_GEO_QUANTIZE_DECIMALS) in self.regeo_cache
+    
+    def _route_key(
+        self,
+        origin: tuple[float, float],
+        destination: tuple[float, float],
+        mode: str,
+        city: str | None,
+    ) -> tuple:
+        """路线缓存 key：量化后的起终点 + 出行方式（公交另含城市）"""
+        decimals = self.settings.AMAP_GEO_QUANTIZE_DECIMALS
+        qo = quantize_coord(*origin, decimals)
+        qd = quantize_coord(*destination, decimals)
+        return (mode, *qo, *qd, city if mode == "transit" else "")
+    
+    async def _cached_call(self, cache: TTLCache, key: Any, load) -> Any:
+        """带缓存与旧数据兜底的上游调用（结果为空时同样缓存）；低优先级加载不与交互请求共享"""
+        try:
+            return await cache.get_or_load(key, load, shared=not _low_priority.get())
+        except AmapError:
+            stale = cache.get_stale(key, None)
+            if stale is not None:
+                return stale
+            raise
+    
+    @staticmethod
+    def _normalize_geocode(geocode: dict[str, Any]) -> dict[str, Any]:
+        """将高德地理编码结果标准化"""
+        coord = parse_coord(geocode.get("location"))
+        
+        def text(value: Any) -> str | None:
+            # 高德对空字段返回 []
+            return value if isinstance(value, str) and value else None
+        
+        return {
+            "formatted_address": text(geocode.get("formatted_address")),
+            "province": text(geocode.get("province")),
+            "city": text(geocode.get("city")),
+            "district": text(geocode.get("district")),
+            "adcode": text(geocode.get("adcode")),
+            "level": text(geocode.get("level")),
+            "location": {"lng": coord[0], "lat": coord[1]} if coord else None,
+        }
+    
+    def _spawn(self, coro) -> None:
+        """在后台执行写入等非关键任务，失败仅记录日志"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        
+        def _done(t: asyncio.Task) -> None:
+            self._background_tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"AMap background task failed: {t.exception()}")
+        
+        task.add_done_callback(_done)
+    
+    def _normalize_poi(self, poi: dict[str, Any], include_raw: bool = True) -> dict[str, Any]:
+        """将高德 POI 数据标准化为统一格式（include_raw=False 时不保留原始数据）"""
         location = poi.get("location", "").split(",")
         lng = float(location[0]) if len(location) > 0 and location[0] else 0
         lat = float(location[1]) if len(location) > 1 and location[1] else 0
         
-        return {
+        normalized = {
             "id": poi.get("id"),
             "name": poi.get("name"),
             "address": poi.get("address"),
@@ -142,5 +1037,13 @@ class AmapSource(BaseSource):
             "photos": [p.get("url") for p in poi.get("photos", []) if p.get("url")],
             "business_hours": poi.get("biz_ext", {}).get("open_time"),
             "source": self.source_type.value,
-            "raw": poi,  # 保留原始数据供调试
         }
+        if include_raw:
+            normalized["raw"] = poi  # 保留原始数据供调试
+        return normalized
+
+
+@lru_cache()
+def get_amap_source() -> AmapSource:
+    """进程内共享的 AmapSource 实例（缓存跨请求复用）"""
+    return AmapSource()
@@ -1,6 +1,7 @@
 """Base class for all data sources."""
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator
 from pydantic import BaseModel
 from enum import Enum
 
@@ -20,6 +21,9 @@ class SourceResult(BaseModel):
     data: list[dict[str, Any]] = []
     error: str | None = None
     total_count: int = 0
+    stale: bool = False  # 上游不可用时返回的旧结果
+    truncated: bool = False  # 部分区域 POI 超出拉取上限，结果不完整
+    rate_limited: bool = False  # 失败原因是调用配额被限流（非上游故障）
 
 
 class BaseSource(ABC):
@@ -35,11 +39,52 @@ class BaseSource(ABC):
         category: str | None = None,
         page: int = 1,
         page_size: int = 20,
+        lightweight: bool = False,
     ) -> SourceResult:
-        """Search for content by keyword and city."""
+        """
+        Search for content by keyword and city.
+        
+        lightweight asks for list-level fields only; sources without a
+        cheaper upstream mode may ignore it.
+        """
         pass
     
+    async def iter_search(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        lightweight: bool = False,
+    ) -> AsyncIterator[SourceResult]:
+        """
+        Yield partial results of one search as they arrive.
+        
+        The default yields the single search() result; sources that fetch
+        several upstream pages override it to yield each page on arrival.
+        """
+        yield await self.search(
+            keyword=keyword,
+            city=city,
+            category=category,
+            page=page,
+            page_size=page_size,
+            lightweight=lightweight,
+        )
+    
     @abstractmethod
     async def get_detail(self, item_id: str) -> dict[str, Any] | None:
         """Get detailed information for a specific item."""
         pass
+    
+    async def get_details(self, item_ids: list[str]) -> dict[str, dict[str, Any] | None]:
+        """
+        Get details for many items, keyed by id (None when not found).
+        
+        The default fetches each id concurrently; sources with a cheaper
+        batch path override it.
+        """
+        ids = list(dict.fromkeys(i for i in item_ids if i))
+        results = await asyncio.gather(*(self.get_detail(i) for i in ids))
+        return dict(zip(ids, results))
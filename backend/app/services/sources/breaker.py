@@ -0,0 +1,82 @@
+"""Circuit breaker for upstream data source calls."""
+import time
+from enum import Enum
+from typing import Any
+
+
+class CircuitState(str, Enum):
+    """熔断器状态"""
+    CLOSED = "closed"        # 正常放行
+    OPEN = "open"            # 熔断中，直接拒绝
+    HALF_OPEN = "half_open"  # 试探期，只放行一个请求
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    - CLOSED: 连续失败 failure_threshold 次后进入 OPEN
+    - OPEN: 拒绝所有请求，reset_timeout 秒后进入 HALF_OPEN
+    - HALF_OPEN: 只放行一个试探请求，成功则 CLOSED，失败则重新 OPEN
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "breaker"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        self.rejected = 0
+        self.opened_count = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """判断是否放行本次请求（HALF_OPEN 时占用唯一的试探名额）"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                self.opened_count += 1
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """放行的请求未真正触达上游时调用，归还试探名额且不改变状态"""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+        }
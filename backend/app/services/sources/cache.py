@@ -0,0 +1,283 @@
+"""In-memory TTL + LRU cache with single-flight loading for data sources."""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    带过期时间 (TTL) 与容量上限 (LRU) 的内存缓存
+
+    - 条目写入超过 ttl 秒（可按条目指定）后视为过期；过期后仍保留 stale_ttl 秒，
+      供上游故障时通过 get_stale 兜底返回
+    - 条目数超过 maxsize 时淘汰最久未使用的条目
+    - get_or_load 对同一 key 的并发未命中只触发一次上游加载 (single-flight)
+    - 按 key 统计命中/未命中/淘汰次数，用于评估节省的上游调用量
+    - 预热写入的条目在第一次被命中时计入 prewarmed_hits（即预热避免的未命中）
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int,
+        name: str = "cache",
+        max_tracked_keys: int = 1000,
+        stale_ttl: float = 0,
+    ):
+        """
+        Args:
+            ttl: 条目有效期（秒）
+            maxsize: 最大条目数（含已过期但仍在保留期内的条目）
+            name: 缓存名称（用于统计输出）
+            max_tracked_keys: 最多保留多少个 key 的独立统计
+            stale_ttl: 过期后继续保留用于兜底的时间（秒）
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.name = name
+        self.max_tracked_keys = max_tracked_keys
+
+        # key -> (写入时间, 值, 该条目的有效期)
+        self._data: OrderedDict[Hashable, tuple[float, Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._key_stats: OrderedDict[Hashable, dict[str, int]] = OrderedDict()
+        self._prewarmed: set[Hashable] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.prewarmed_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, record=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = _MISSING, record: bool = True) -> Any:
+        """读取未过期的条目，不存在或已过期时返回 default"""
+        entry = self._data.get(key)
+        if entry is not None:
+            stored_at, value, ttl = entry
+            age = time.monotonic() - stored_at
+            if age < ttl:
+                self._data.move_to_end(key)
+                if record:
+                    self.hits += 1
+                    self._record(key, "hits")
+                    if key in self._prewarmed:
+                        self._prewarmed.discard(key)
+                        self.prewarmed_hits += 1
+                return value
+            if age >= ttl + self.stale_ttl:
+                del self._data[key]
+            self._prewarmed.discard(key)
+            if record:
+                self.expirations += 1
+
+        if record:
+            self.misses += 1
+            self._record(key, "misses")
+        return default
+
+    def peek(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """
+        读取未过期的条目，不更新 LRU 顺序、统计与预热标记
+
+        不修改任何内部结构，可在线程池中调用（如同步端点），不与事件循环上的读写冲突。
+        """
+        entry = self._data.get(key)
+        if entry is None or time.monotonic() - entry[0] >= entry[2]:
+            return default
+        return entry[1]
+
+    def get_stale(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """读取条目（允许已过期但仍在 stale_ttl 保留期内），用于上游故障兜底"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        stored_at, value, ttl = entry
+        if time.monotonic() - stored_at >= ttl + self.stale_ttl:
+            del self._data[key]
+            return default
+        self.stale_served += 1
+        return value
+
+    def age(self, key: Hashable) -> float | None:
+        """条目写入至今的秒数，不存在时返回 None"""
+        entry = self._data.get(key)
+        return time.monotonic() - entry[0] if entry is not None else None
+
+    def expires_in(self, key: Hashable) -> float | None:
+        """条目距过期的秒数（已过期时为负数），不存在时返回 None"""
+        entry = self._data.get(key)
+        return entry[0] + entry[2] - time.monotonic() if entry is not None else None
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        prewarmed: bool = False,
+        ttl: float | None = None,
+    ) -> None:
+        """
+        写入条目，必要时按 LRU 淘汰
+
+        prewarmed 表示由缓存预热写入；ttl 为该条目的有效期，默认使用缓存的 ttl。
+        """
+        self._data[key] = (time.monotonic(), value, self.ttl if ttl is None else ttl)
+        self._data.move_to_end(key)
+        if prewarmed:
+            self._prewarmed.add(key)
+        else:
+            self._prewarmed.discard(key)
+        while len(self._data) > self.maxsize:
+            evicted_key, _ = self._data.popitem(last=False)
+            self._prewarmed.discard(evicted_key)
+            self.evictions += 1
+            self._record(evicted_key, "evictions")
+
+    def invalidate(self, key: Hashable) -> None:
+        """删除指定条目"""
+        self._data.pop(key, None)
+        self._prewarmed.discard(key)
+
+    def clear(self) -> None:
+        """清空所有条目（保留统计数据）"""
+        self._data.clear()
+        self._prewarmed.clear()
+
+    def popular_keys(self, n: int) -> list[tuple[Hashable, int]]:
+        """按访问量（命中 + 未命中 + 被合并的并发请求）排序的前 n 个 key 及其访问量"""
+        demand = [
+            (key, stats["hits"] + stats["misses"] + stats["coalesced"])
+            for key, stats in self._key_stats.items()
+        ]
+        demand.sort(key=lambda kv: kv[1], reverse=True)
+        return demand[:n]
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] | None = None,
+        shared: bool = True,
+    ) -> Any:
+        """
+        读取缓存，未命中时调用 loader 加载
+
+        同一 key 的并发未命中共享同一次 loader 调用；loader 在独立任务中运行，
+        调用方被取消（超时、客户端断开）时只放弃自己的等待，加载继续完成并写入缓存。
+
+        Args:
+            key: 缓存键
+            loader: 无参异步加载函数
+            should_cache: 判断加载结果是否写入缓存（如失败结果不缓存）
+            shared: 为 False 时本次加载不登记为进行中，其他调用方不会加入等待
+                （低优先级加载受 Key 池让行与排队超时约束，不应拖累交互请求）；
+                仍可加入已在进行的加载
+        """
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            self._record(key, "coalesced")
+        else:
+            # 加载在独立任务中执行：任一调用方被取消只放弃自己的等待，不影响其他等待方，
+            # 加载完成后照常写入缓存
+            task = asyncio.ensure_future(self._load(key, loader, should_cache))
+            task.add_done_callback(_consume_exception)
+            if shared:
+                self._inflight[key] = task
+                task.add_done_callback(lambda t: self._forget(key, t))
+            self.loads += 1
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] | None,
+    ) -> Any:
+        value = await loader()
+        if should_cache is None or should_cache(value):
+            self.set(key, value)
+        return value
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def _record(self, key: Hashable, field: str) -> None:
+        stats = self._key_stats.get(key)
+        if stats is None:
+            stats = {"hits": 0, "misses": 0, "evictions": 0, "coalesced": 0}
+            self._key_stats[key] = stats
+            if len(self._key_stats) > self.max_tracked_keys:
+                self._key_stats.popitem(last=False)
+        else:
+            self._key_stats.move_to_end(key)
+        stats[field] += 1
+
+    def stats(self, top: int = 20) -> dict[str, Any]:
+        """
+        返回缓存统计
+
+        upstream_calls_saved = 命中次数 + 被合并的并发未命中次数，
+        即因缓存而免去的上游请求数量。
+        按 key 的明细只给出 key 的摘要：原始 key 含用户的搜索关键词、坐标与路线起终点。
+        """
+        lookups = self.hits + self.misses
+        top_keys = sorted(
+            self._key_stats.items(),
+            key=lambda kv: kv[1]["hits"] + kv[1]["coalesced"],
+            reverse=True,
+        )[:top]
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+            "prewarmed_hits": self.prewarmed_hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "upstream_calls_saved": self.hits + self.coalesced,
+            "keys": [
+                {"key": _digest_key(key), **stats} for key, stats in top_keys
+            ],
+        }
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    """标记加载任务的异常已读取，避免所有等待方都已取消时的告警"""
+    if not task.cancelled():
+        task.exception()
+
+
+def _format_key(key: Hashable) -> str:
+    if isinstance(key, tuple):
+        return "|".join("" if part is None else str(part) for part in key)
+    return str(key)
+
+
+def _digest_key(key: Hashable) -> str:
+    return hashlib.sha256(_format_key(key).encode("utf-8")).hexdigest()[:12]
@@ -0,0 +1,158 @@
+"""Geographic helpers shared by data sources (quantization, distance)."""
+import math
+import unicodedata
+
+EARTH_RADIUS_M = 6371008.8
+
+# 4 位小数约 11 m（纬度方向），作为坐标缓存的网格粒度
+DEFAULT_QUANTIZE_DECIMALS = 4
+
+
+def quantize_coord(lng: float, lat: float, decimals: int = DEFAULT_QUANTIZE_DECIMALS) -> tuple[float, float]:
+    """将坐标吸附到固定网格，使邻近点共享同一缓存键"""
+    return round(lng, decimals), round(lat, decimals)
+
+
+def format_coord(lng: float, lat: float, decimals: int = 6) -> str:
+    """格式化为高德接口使用的 "lng,lat" 字符串"""
+    return f"{lng:.{decimals}f},{lat:.{decimals}f}"
+
+
+def parse_coord(value: str | None) -> tuple[float, float] | None:
+    """解析高德 "lng,lat" 字符串，无效时返回 None"""
+    if not value:
+        return None
+    parts = value.split(",")
+    if len(parts) != 2 or not parts[0] or not parts[1]:
+        return None
+    try:
+        return float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+
+
+def normalize_address(address: str) -> str:
+    """地址归一化：全角转半角、去空白、小写，用作缓存键"""
+    text = unicodedata.normalize("NFKC", address)
+    return "".join(text.split()).lower()
+
+
+def normalize_city(city: str) -> str:
+    """城市名归一化（去空白、去 "市" 后缀），用作离线索引/快照的文件名"""
+    return normalize_address(city).rstrip("市")
+
+
+def haversine_m(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    """两点间球面距离（米）"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+# ==================== Geohash ====================
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_DECODE = {c: i for i, c in enumerate(_GEOHASH_BASE32)}
+
+
+def geohash_encode(lng: float, lat: float, precision: int = 6) -> str:
+    """坐标 -> geohash"""
+    lng_lo, lng_hi = -180.0, 180.0
+    lat_lo, lat_hi = -90.0, 90.0
+    chars = []
+    bit, ch, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                ch = (ch << 1) | 1
+                lng_lo = mid
+            else:
+                ch <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_GEOHASH_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars)
+
+
+def geohash_bbox(geohash: str) -> tuple[float, float, float, float]:
+    """geohash -> (min_lng, min_lat, max_lng, max_lat)"""
+    lng_lo, lng_hi = -180.0, 180.0
+    lat_lo, lat_hi = -90.0, 90.0
+    even = True
+    for c in geohash:
+        value = _GEOHASH_DECODE[c]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit:
+                    lng_lo = mid
+                else:
+                    lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lng_lo, lat_lo, lng_hi, lat_hi
+
+
+def geohash_cell_size(precision: int) -> tuple[float, float]:
+    """指定精度下单个 geohash 格子的 (经度跨度, 纬度跨度)"""
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 360.0 / (1 << lng_bits), 180.0 / (1 << lat_bits)
+
+
+def geohash_children(geohash: str, lng: float, lat: float, radius_m: float) -> list[str]:
+    """下一级精度中与圆 (lng, lat, radius_m) 相交的子格子"""
+    children = []
+    for c in _GEOHASH_BASE32:
+        min_lng, min_lat, max_lng, max_lat = geohash_bbox(geohash + c)
+        near_lng = min(max(lng, min_lng), max_lng)
+        near_lat = min(max(lat, min_lat), max_lat)
+        if haversine_m(lng, lat, near_lng, near_lat) <= radius_m:
+            children.append(geohash + c)
+    return children
+
+
+def geohash_cover(lng: float, lat: float, radius_m: float, precision: int) -> list[str]:
+    """返回与圆 (lng, lat, radius_m) 相交的所有 geohash 格子"""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    cell_lng, cell_lat = geohash_cell_size(precision)
+
+    # 对齐到格子网格后逐格枚举
+    lng0 = math.floor((lng - dlng + 180.0) / cell_lng) * cell_lng - 180.0
+    lat0 = math.floor((lat - dlat + 90.0) / cell_lat) * cell_lat - 90.0
+
+    tiles = []
+    y = lat0
+    while y < lat + dlat:
+        x = lng0
+        while x < lng + dlng:
+            # 圆心到格子的最近点距离
+            near_lng = min(max(lng, x), x + cell_lng)
+            near_lat = min(max(lat, y), y + cell_lat)
+            if haversine_m(lng, lat, near_lng, near_lat) <= radius_m:
+                tiles.append(geohash_encode(x + cell_lng / 2, y + cell_lat / 2, precision))
+            x += cell_lng
+        y += cell_lat
+    return tiles
@@ -0,0 +1,264 @@
+"""Local POI source answering searches from offline city indexes, with upstream fallback."""
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+from loguru import logger
+
+from .amap import get_amap_source
+from .base import BaseSource, SourceResult, SourceType
+from .geo import normalize_city
+from .local_index import PoiIndex, index_path
+from ...core.config import get_settings
+
+
+class LocalPoiSource(BaseSource):
+    """
+    本地 POI 数据源（与 AmapSource 接口兼容，返回的 POI 即高德 POI）
+
+    - 城市索引由 local_index 导入工具生成，首次查询该城市时加载；
+      每隔 LOCAL_POI_INDEX_RECHECK_SECONDS 检查索引文件的 mtime，新导入或重新导入的索引无需重启即生效
+    - 分页按合并排序进行：本地全部匹配结果在前，上游结果在后。本地结果填满当前页时直接返回；
+      本页跨过本地结果末尾或超出本地结果时，从上游排序的第 (page - 1) * page_size - 本地总数 条起补足，
+      跳过本地索引中已有的 POI（本页可能因此少于 page_size 条），total_count 为本地总数与上游总数之和
+      （本地结果填满的页不请求上游，只返回本地总数）；
+      城市无索引时直接请求上游
+    """
+
+    source_type = SourceType.AMAP
+
+    def __init__(self, index_dir: str | None = None, fallback: BaseSource | None = None):
+        settings = get_settings()
+        self.index_dir = index_dir or settings.LOCAL_POI_INDEX_DIR
+        self.recheck_seconds = settings.LOCAL_POI_INDEX_RECHECK_SECONDS
+        self.fallback = fallback
+        self._indexes: dict[str, PoiIndex | None] = {}
+        # 城市 -> (上次检查时间, 索引文件 mtime；文件不存在时为 None)
+        self._checked: dict[str, tuple[float, float | None]] = {}
+
+        self.local_hits = 0
+        self.fallbacks = 0
+
+    def _mtime(self, key: str) -> float | None:
+        try:
+            return index_path(self.index_dir, key).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load(self, key: str) -> PoiIndex | None:
+        path = index_path(self.index_dir, key)
+        if not path.exists():
+            return None
+        try:
+            index = PoiIndex.load(path)
+        except Exception as e:
+            logger.warning(f"Failed to load POI index {path}: {e}")
+            return None
+        logger.info(f"Loaded POI index {path} ({len(index)} POIs)")
+        return index
+
+    async def get_index(self, city: str) -> PoiIndex | None:
+        """城市索引（不存在时返回 None）；每隔 recheck_seconds 按文件 mtime 判断是否需要重新加载"""
+        key = normalize_city(city)
+        now = time.monotonic()
+        checked = self._checked.get(key)
+        if checked is not None and now - checked[0] < self.recheck_seconds:
+            return self._indexes.get(key)
+
+        mtime = await asyncio.to_thread(self._mtime, key)
+        if checked is None or mtime != checked[1]:
+            self._indexes[key] = await asyncio.to_thread(self._load, key) if mtime is not None else None
+        self._checked[key] = (now, mtime)
+        return self._indexes[key]
+
+    async def _search_local(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None,
+        page: int,
+        page_size: int,
+    ) -> tuple[PoiIndex, SourceResult] | None:
+        """本地搜索结果（本页可能为空，total_count 为本地匹配总数）；城市无索引时返回 None"""
+        index = await self.get_index(city)
+        if index is None:
+            return None
+        pois, total_count = index.search(keyword, category, page, page_size)
+        if pois:
+            self.local_hits += 1
+        return index, SourceResult(
+            source=self.source_type,
+            success=True,
+            data=pois,
+            total_count=total_count,
+        )
+
+    async def _upstream_slice(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None,
+        offset: int,
+        count: int,
+        page_size: int,
+        lightweight: bool,
+    ) -> SourceResult:
+        """上游排序中 [offset, offset + count) 的 POI：取覆盖该区间的一到两个按 page_size 对齐的上游分页再截取"""
+        first = offset // page_size
+        last = (offset + count - 1) // page_size
+        pages = await asyncio.gather(*(
+            self.fallback.search(keyword, city, category, p + 1, page_size, lightweight=lightweight)
+            for p in range(first, last + 1)
+        ))
+        failed = next((r for r in pages if not r.success), None)
+        if failed is not None:
+            return failed
+        data = [poi for r in pages for poi in r.data]
+        start = offset - first * page_size
+        return SourceResult(
+            source=pages[0].source,
+            success=True,
+            data=data[start:start + count],
+            total_count=pages[0].total_count,
+            stale=any(r.stale for r in pages),
+        )
+
+    @staticmethod
+    def _merge(index: PoiIndex, local: SourceResult, upstream: SourceResult) -> SourceResult:
+        """本地结果之后接上游结果：跳过本地索引中已有的 POI，total_count 为两者之和"""
+        if not upstream.success:
+            return local if local.data else upstream
+        seen = {p.get("id") for p in local.data}
+        extra = [
+            p for p in upstream.data
+            if p.get("id") not in seen and index.get(p.get("id")) is None
+        ]
+        return SourceResult(
+            source=local.source,
+            success=True,
+            data=local.data + extra,
+            total_count=local.total_count + upstream.total_count,
+            stale=upstream.stale,
+        )
+
+    def _upstream_window(self, local: SourceResult, page: int, page_size: int) -> tuple[int, int]:
+        """合并排序（本地全部结果在前、上游结果在后）中本页需要的上游区间 (offset, count)"""
+        start = (page - 1) * page_size
+        return max(start - local.total_count, 0), page_size - len(local.data)
+
+    async def search(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        lightweight: bool = False,
+    ) -> SourceResult:
+        """
+        搜索 POI：本地结果排在前面，本地结果用完后接上游结果
+        
+        参数同 AmapSource.search；本地结果本身不含原始数据，lightweight 对其无影响。
+        """
+        found = await self._search_local(keyword, city, category, page, page_size)
+        if found is not None and len(found[1].data) >= page_size:
+            return found[1]
+        if self.fallback is None:
+            if found is not None and found[1].data:
+                return found[1]
+            return SourceResult(
+                source=self.source_type,
+                success=False,
+                error=f"No local POI results for {city}",
+            )
+        self.fallbacks += 1
+        if found is None:
+            return await self.fallback.search(
+                keyword, city, category, page, page_size, lightweight=lightweight
+            )
+        index, local = found
+        offset, count = self._upstream_window(local, page, page_size)
+        upstream = await self._upstream_slice(
+            keyword, city, category, offset, count, page_size, lightweight
+        )
+        return self._merge(index, local, upstream)
+
+    async def iter_search(
+        self,
+        keyword: str,
+        city: str,
+        category: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        lightweight: bool = False,
+    ) -> AsyncIterator[SourceResult]:
+        """本页的本地结果先产出；不足一页时再产出合并排序中紧随其后的上游结果"""
+        found = await self._search_local(keyword, city, category, page, page_size)
+        if found is not None and found[1].data:
+            yield found[1]
+            if len(found[1].data) >= page_size:
+                return
+        if self.fallback is None:
+            if found is None or not found[1].data:
+                yield await self.search(keyword, city, category, page, page_size)
+            return
+        self.fallbacks += 1
+        if found is None:
+            async for chunk in self.fallback.iter_search(
+                keyword, city, category, page, page_size, lightweight=lightweight
+            ):
+                yield chunk
+            return
+
+        index, local = found
+        offset, count = self._upstream_window(local, page, page_size)
+        upstream = await self._upstream_slice(
+            keyword, city, category, offset, count, page_size, lightweight
+        )
+        if local.data and not upstream.success:
+            return  # 已有本地结果，上游失败不再报错
+        merged = self._merge(index, local, upstream)
+        yield merged.model_copy(update={"data": merged.data[len(local.data):]})
+
+    async def get_detail(self, item_id: str) -> dict[str, Any] | None:
+        """在已加载的城市索引中查找，找不到时请求上游"""
+        for index in self._indexes.values():
+            if index is not None and (poi := index.get(item_id)) is not None:
+                return poi
+        if self.fallback is None:
+            return None
+        return await self.fallback.get_detail(item_id)
+
+    async def get_details(self, item_ids: list[str]) -> dict[str, dict[str, Any] | None]:
+        """已加载索引中找不到的 id 交给上游批量获取"""
+        details: dict[str, dict[str, Any] | None] = {}
+        missing = []
+        for item_id in dict.fromkeys(i for i in item_ids if i):
+            poi = next(
+                (p for index in self._indexes.values()
+                 if index is not None and (p := index.get(item_id)) is not None),
+                None,
+            )
+            if poi is None:
+                missing.append(item_id)
+            details[item_id] = poi
+        if missing and self.fallback is not None:
+            details.update(await self.fallback.get_details(missing))
+        return details
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "index_dir": str(self.index_dir),
+            "cities": {
+                key: len(index) for key, index in self._indexes.items() if index is not None
+            },
+            "local_hits": self.local_hits,
+            "fallbacks": self.fallbacks,
+        }
+
+
+@lru_cache()
+def get_local_poi_source() -> LocalPoiSource:
+    """进程内共享的 LocalPoiSource 实例（未命中时回退到共享的 AmapSource）"""
+    return LocalPoiSource(fallback=get_amap_source())
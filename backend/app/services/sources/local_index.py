@@ -0,0 +1,223 @@
+"""Offline per-city POI index with Chinese character n-gram postings.
+
+Build an index (and the spatial snapshot, see snapshot.py) from the local POI
+store or a JSON / NDJSON dump:
+
+    python -m app.services.sources.local_index --city 长沙
+    python -m app.services.sources.local_index --city 长沙 --input changsha.jsonl
+"""
+import argparse
+import gzip
+import json
+import re
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Any
+
+from ...core.config import get_settings
+from .amap import AmapSource
+from .geo import normalize_city
+from .poi_store import PoiStore
+from .snapshot import PoiSnapshot
+
+# 仅保留中文、字母与数字
+_NON_WORD_RE = re.compile(r"[^0-9a-z一-鿿]+")
+
+INDEX_VERSION = 1
+
+
+def normalize_text(text: str | None) -> str:
+    """全角转半角、小写、去除标点与空白"""
+    return _NON_WORD_RE.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def text_grams(normalized: str) -> set[str]:
+    """索引用 n-gram：单字 + 相邻二元组（单字用于一个字的查询）"""
+    grams = set(normalized)
+    grams.update(normalized[i:i + 2] for i in range(len(normalized) - 1))
+    return grams
+
+
+def query_grams(normalized: str) -> set[str]:
+    """查询用 n-gram：两个字以上只用二元组，召回更精确"""
+    if len(normalized) < 2:
+        return set(normalized)
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+
+class PoiIndex:
+    """
+    单个城市的只读 POI 索引
+
+    - POI 按名称长度排序后编号（同长度保持导入顺序），编号越小名称越短
+    - 名称的 n-gram 倒排表为升序的 POI 编号数组
+    - 查询时从最短的倒排表开始求交集再按类别过滤，结果编号排序即为按名称长度排序
+    - 排序：名称完全匹配 > 前缀匹配 > 其他，各组内名称更短者优先
+    """
+
+    def __init__(
+        self,
+        city: str,
+        pois: list[dict[str, Any]],
+        postings: dict[str, array],
+    ):
+        self.city = city
+        self.pois = pois
+        self.postings = postings
+        self._names = [normalize_text(p.get("name")) for p in pois]
+        self._categories = [p.get("category") for p in pois]
+        self._by_id = {p["id"]: i for i, p in enumerate(pois) if p.get("id")}
+
+    def __len__(self) -> int:
+        return len(self.pois)
+
+    @classmethod
+    def build(cls, city: str, pois: list[dict[str, Any]]) -> "PoiIndex":
+        """由标准化 POI 列表构建索引（按 id 去重，保留第一次出现的记录）"""
+        unique: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for poi in pois:
+            poi_id = poi.get("id")
+            if not poi_id or poi_id in seen or not poi.get("name"):
+                continue
+            seen.add(poi_id)
+            unique.append({k: v for k, v in poi.items() if k != "raw"})
+        unique.sort(key=lambda p: len(normalize_text(p["name"])))
+
+        postings: dict[str, array] = {}
+        for i, poi in enumerate(unique):
+            for gram in text_grams(normalize_text(poi["name"])):
+                postings.setdefault(gram, array("I")).append(i)
+        return cls(normalize_city(city), unique, postings)
+
+    def get(self, poi_id: str) -> dict[str, Any] | None:
+        i = self._by_id.get(poi_id)
+        return self.pois[i] if i is not None else None
+
+    def match(self, keyword: str, category: str | None = None) -> list[int]:
+        """返回匹配的 POI 编号（已排序）"""
+        query = normalize_text(keyword)
+        grams = query_grams(query)
+        if not grams:
+            return []
+
+        lists = sorted((self.postings.get(g) for g in grams), key=lambda p: len(p or ()))
+        if not lists[0]:
+            return []
+        ids = set(lists[0])
+        for posting in lists[1:]:
+            ids.intersection_update(posting)
+            if not ids:
+                return []
+
+        if category:
+            wanted = set(category.split("|"))
+            categories = self._categories
+            ids = {i for i in ids if categories[i] in wanted}
+
+        names = self._names
+        if len(query) > 2:
+            # 二元组都命中不代表连续出现，需再确认子串
+            ids = {i for i in ids if query in names[i]}
+
+        exact: list[int] = []
+        prefix: list[int] = []
+        rest: list[int] = []
+        for i in sorted(ids):
+            name = names[i]
+            if name == query:
+                exact.append(i)
+            elif name.startswith(query):
+                prefix.append(i)
+            else:
+                rest.append(i)
+        return exact + prefix + rest
+
+    def search(
+        self,
+        keyword: str,
+        category: str | None = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """分页搜索，返回 (当前页 POI, 匹配总数)"""
+        ids = self.match(keyword, category)
+        start = (page - 1) * page_size
+        return [self.pois[i] for i in ids[start:start + page_size]], len(ids)
+
+    def save(self, path: Path) -> None:
+        """写入 gzip 压缩的 JSON 文件（倒排表一并保存，加载时无需重建）"""
+        payload = {
+            "version": INDEX_VERSION,
+            "city": self.city,
+            "built_at": int(time.time()),
+            "pois": self.pois,
+            "postings": {g: p.tolist() for g, p in self.postings.items()},
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "PoiIndex":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported POI index version in {path}")
+        postings = {g: array("I", ids) for g, ids in payload["postings"].items()}
+        return cls(payload["city"], payload["pois"], postings)
+
+
+def index_path(index_dir: str | Path, city: str) -> Path:
+    return Path(index_dir) / f"{normalize_city(city)}.json.gz"
+
+
+def _read_dump(path: Path) -> list[dict[str, Any]]:
+    """读取 JSON 数组或 NDJSON 格式的 POI 导出文件"""
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _normalize_dump(pois: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """高德原始 POI（location 为 "lng,lat" 字符串）先转换为标准化格式"""
+    if not any(isinstance(p.get("location"), str) for p in pois):
+        return pois
+    amap = AmapSource(use_store=False)
+    return [
+        amap._normalize_poi(p, include_raw=False) if isinstance(p.get("location"), str) else p
+        for p in pois
+    ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="构建城市离线 POI 索引")
+    parser.add_argument("--city", required=True, help="城市名称，如 长沙")
+    parser.add_argument("--input", type=Path, help="POI 导出文件（JSON 数组或 NDJSON）；缺省时读取本地 POI 存储")
+    parser.add_argument("--output-dir", default=settings.LOCAL_POI_INDEX_DIR, help="索引目录")
+    parser.add_argument("--no-snapshot", action="store_true", help="不生成内存映射的空间快照")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        pois = _normalize_dump(_read_dump(args.input))
+    else:
+        pois = PoiStore().get_city_pois(args.city)
+
+    index = PoiIndex.build(args.city, pois)
+    path = index_path(args.output_dir, args.city)
+    index.save(path)
+    print(f"{index.city}: {len(index)} POIs, {len(index.postings)} n-grams -> {path}")
+
+    if not args.no_snapshot:
+        snapshot = PoiSnapshot(PoiSnapshot.build(args.city, pois, args.output_dir))
+        print(f"{snapshot.city}: {len(snapshot)} located POIs, {len(snapshot.cells)} cells -> {snapshot.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Persistent local POI store backed by the application database (SQLite by default)."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import text
+
+from ...db.base import SessionLocal, engine
+from ...models.poi import PoiRecord, PoiSearchRecord
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite 读回的 DateTime 不带时区
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class PoiStore:
+    """
+    本地 POI 存储
+
+    - 以数据源 POI id 为主键 upsert 标准化后的 POI（不含 raw 原始数据）
+    - 记录搜索 key 对应的有序 POI id 列表，重启后重复搜索无需回源
+    - 通过 TTL 判断记录是否新鲜，过期记录由调用方回源刷新
+    - compact() 清理长期未刷新的记录并执行 VACUUM
+
+    所有方法均为同步调用，异步代码中请通过 asyncio.to_thread 使用。
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+
+    def upsert_pois(self, pois: list[dict[str, Any]], source: str = "amap") -> int:
+        """批量写入/更新 POI，返回写入条数"""
+        now = _utcnow()
+        count = 0
+        with self._session_factory() as db:
+            for poi in pois:
+                poi_id = poi.get("id")
+                if not poi_id:
+                    continue
+                data = {k: v for k, v in poi.items() if k != "raw"}
+                db.merge(PoiRecord(
+                    id=poi_id,
+                    source=source,
+                    name=poi.get("name") or "",
+                    city=poi.get("city") or None,
+                    data=data,
+                    updated_at=now,
+                ))
+                count += 1
+            db.commit()
+        return count
+
+    def get_poi(self, poi_id: str, max_age: float | None = None) -> dict[str, Any] | None:
+        """读取 POI，max_age 秒内未刷新的记录视为过期并返回 None"""
+        with self._session_factory() as db:
+            record = db.get(PoiRecord, poi_id)
+            if record is None or not self._is_fresh(record.updated_at, max_age):
+                return None
+            return dict(record.data)
+
+    def get_pois(self, poi_ids: list[str], max_age: float | None = None) -> dict[str, dict[str, Any]]:
+        """批量读取新鲜的 POI，返回 id -> POI"""
+        if not poi_ids:
+            return {}
+        with self._session_factory() as db:
+            records = db.query(PoiRecord).filter(PoiRecord.id.in_(poi_ids)).all()
+            return {
+                r.id: dict(r.data)
+                for r in records
+                if self._is_fresh(r.updated_at, max_age)
+            }
+
+    def get_city_pois(self, city: str, source: str = "amap") -> list[dict[str, Any]]:
+        """读取某城市的全部 POI（不论新旧），用于构建离线索引"""
+        names = {city, city.rstrip("市"), city.rstrip("市") + "市"}
+        with self._session_factory() as db:
+            records = db.query(PoiRecord).filter(
+                PoiRecord.source == source,
+                PoiRecord.city.in_(names),
+            ).order_by(PoiRecord.updated_at.desc()).all()
+            return [dict(r.data) for r in records]
+
+    def save_search(
+        self,
+        cache_key: str,
+        pois: list[dict[str, Any]],
+        total_count: int,
+        source: str = "amap",
+    ) -> None:
+        """保存一次搜索结果（POI 本体 + 有序 id 列表）"""
+        self.upsert_pois(pois, source=source)
+        with self._session_factory() as db:
+            db.merge(PoiSearchRecord(
+                cache_key=cache_key,
+                poi_ids=[p["id"] for p in pois if p.get("id")],
+                total_count=total_count,
+                updated_at=_utcnow(),
+            ))
+            db.commit()
+
+    def get_search(
+        self,
+        cache_key: str,
+        max_age: float | None = None,
+    ) -> tuple[list[dict[str, Any]], int] | None:
+        """
+        读取搜索结果
+
+        任一 POI 缺失或过期时返回 None，由调用方整体回源。
+        """
+        with self._session_factory() as db:
+            record = db.get(PoiSearchRecord, cache_key)
+            if record is None or not self._is_fresh(record.updated_at, max_age):
+                return None
+            poi_ids = list(record.poi_ids)
+            total_count = record.total_count
+
+        pois = self.get_pois(poi_ids, max_age=max_age)
+        if len(pois) < len(set(poi_ids)):
+            return None
+        return [pois[i] for i in poi_ids], total_count
+
+    def compact(self, retention: float) -> dict[str, int]:
+        """
+        删除超过 retention 秒未刷新的记录；SQLite 下额外执行 VACUUM 回收空间
+
+        Returns:
+            删除的 POI / 搜索记录条数
+        """
+        cutoff = _utcnow() - timedelta(seconds=retention)
+        with self._session_factory() as db:
+            pois_deleted = db.query(PoiRecord).filter(
+                PoiRecord.updated_at < cutoff
+            ).delete(synchronize_session=False)
+            searches_deleted = db.query(PoiSearchRecord).filter(
+                PoiSearchRecord.updated_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+
+        if engine.dialect.name == "sqlite":
+            # VACUUM 不能在事务中执行
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
+
+        return {"pois_deleted": pois_deleted, "searches_deleted": searches_deleted}
+
+    @staticmethod
+    def _is_fresh(updated_at: datetime | None, max_age: float | None) -> bool:
+        if max_age is None:
+            return True
+        if updated_at is None:
+            return False
+        return _utcnow() - _as_utc(updated_at) < timedelta(seconds=max_age)
+
+
+async def run_compaction_loop(store: PoiStore, interval: float, retention: float) -> None:
+    """定期压缩 POI 存储（在应用启动时作为后台任务运行）"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await asyncio.to_thread(store.compact, retention)
+            logger.info(f"POI store compacted: {result}")
+        except Exception as e:
+            logger.warning(f"POI store compaction failed: {e}")
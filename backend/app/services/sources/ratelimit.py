@@ -0,0 +1,251 @@
+"""Token-bucket rate limiting and API key rotation for upstream quotas."""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+
+class RateLimitTimeout(Exception):
+    """在允许的等待时间内没有可用的 API Key"""
+
+
+class _Preempted(Exception):
+    """低优先级请求等待期间有普通请求开始排队"""
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个。
+    surplus 为不受 capacity 限制的令牌数：桶满后继续按 rate 累计，直到下一次取出令牌，
+    表示这段时间内没有被使用的配额。
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._full_since: float | None = self._updated_at  # 桶变满的时刻，未满时为 None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._full_since is None:
+            filled = self._tokens + (now - self._updated_at) * self.rate
+            if filled >= self.capacity:
+                self._full_since = self._updated_at + (self.capacity - self._tokens) / self.rate
+            self._tokens = min(self.capacity, filled)
+        self._updated_at = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    @property
+    def surplus(self) -> float:
+        self._refill()
+        if self._full_since is None:
+            return self._tokens
+        return self.capacity + (self._updated_at - self._full_since) * self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """尝试取出令牌，不足时返回 False"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            self._full_since = None
+            return True
+        return False
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        """距离 surplus 达到 tokens 还需等待的秒数（tokens 可以超过 capacity）"""
+        surplus = self.surplus
+        if surplus >= tokens:
+            return 0.0
+        return (tokens - surplus) / self.rate
+
+
+class ApiKeyState:
+    """单个 API Key 的限流状态"""
+
+    def __init__(self, key: str, qps: float):
+        self.key = key
+        self.bucket = TokenBucket(rate=qps)
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def cooldown_remaining(self, now: float) -> float:
+        return max(0.0, self.cooldown_until - now)
+
+
+class ApiKeyPool:
+    """
+    多 API Key 轮换池
+
+    - 每个 Key 一个令牌桶，速率与该 Key 的 QPS 配额一致
+    - 选择冷却期外、剩余令牌最多（并发最少）的 Key
+    - 上游返回超限时调用 cooldown() 让该 Key 暂停一段时间
+    - 暂无可用 Key 时短暂等待，超过 max_wait 抛出 RateLimitTimeout
+    - 低优先级请求（后台预取等）只在没有普通请求排队、且取走一个令牌后 Key 仍留有
+      low_priority_reserve_ratio × 桶容量的未用配额时才取令牌，不与交互请求争抢配额；
+      按 TokenBucket.surplus 计算，桶容量只有 1 个令牌（QPS ≤ 1）时表现为桶满后还需空闲一段时间
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        qps: float,
+        max_wait: float = 2.0,
+        low_priority_reserve_ratio: float = 0.33,
+    ):
+        # 去重并保持配置顺序
+        self._keys = [ApiKeyState(k, qps) for k in dict.fromkeys(k for k in keys if k)]
+        self.qps = qps
+        self.max_wait = max_wait
+        self.low_priority_reserve_ratio = low_priority_reserve_ratio
+        self._waiting = 0  # 正在排队的普通请求数
+        self.low_priority_requests = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __bool__(self) -> bool:
+        return bool(self._keys)
+
+    @property
+    def keys(self) -> list[str]:
+        return [state.key for state in self._keys]
+
+    async def acquire(
+        self,
+        timeout: float | None = None,
+        exclude: set[str] | None = None,
+        low_priority: bool = False,
+    ) -> ApiKeyState:
+        """
+        获取一个可用的 Key（已扣除一个令牌）
+
+        Args:
+            timeout: 最长等待秒数，默认使用 max_wait
+            exclude: 本次不使用的 Key（如刚被限流的 Key）
+            low_priority: 后台请求，让位于普通请求
+        """
+        if not self._keys:
+            raise RateLimitTimeout("No API keys configured")
+
+        timeout = self.max_wait if timeout is None else timeout
+        if low_priority:
+            return await self._acquire_low_priority(timeout, exclude)
+
+        self._waiting += 1
+        try:
+            return await self._acquire(timeout, exclude)
+        finally:
+            self._waiting -= 1
+
+    async def _acquire_low_priority(
+        self,
+        timeout: float,
+        exclude: set[str] | None,
+    ) -> ApiKeyState:
+        deadline = time.monotonic() + timeout
+        while True:
+            if not self._waiting:
+                remaining = deadline - time.monotonic()
+                try:
+                    state = await self._acquire(
+                        max(remaining, 0.0), exclude,
+                        reserve_ratio=self.low_priority_reserve_ratio,
+                        yield_to_waiting=True,
+                    )
+                except _Preempted:
+                    continue
+                self.low_priority_requests += 1
+                return state
+            if time.monotonic() >= deadline:
+                raise RateLimitTimeout("AMap rate limit: low-priority request yielded to interactive traffic")
+            await asyncio.sleep(0.05)
+
+    async def _acquire(
+        self,
+        timeout: float,
+        exclude: set[str] | None,
+        reserve_ratio: float = 0.0,
+        yield_to_waiting: bool = False,
+    ) -> ApiKeyState:
+        """
+        等待直到某个 Key 的 surplus 至少为 1 + reserve_ratio × 桶容量，并取出一个令牌
+
+        yield_to_waiting 为 True 时，一旦有普通请求开始排队即抛出 _Preempted。
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if yield_to_waiting and self._waiting:
+                raise _Preempted()
+            now = time.monotonic()
+            candidates = [
+                s for s in self._keys
+                if (not exclude or s.key not in exclude) and s.cooldown_remaining(now) == 0
+            ]
+            # 剩余令牌最多者优先，令牌相同时选并发最少的
+            for state in sorted(candidates, key=lambda s: (-s.bucket.tokens, s.in_flight)):
+                required = 1.0 + reserve_ratio * state.bucket.capacity
+                if state.bucket.surplus >= required and state.bucket.try_acquire():
+                    state.in_flight += 1
+                    state.requests += 1
+                    return state
+
+            waits = [
+                max(
+                    s.cooldown_remaining(now),
+                    s.bucket.time_until_available(1.0 + reserve_ratio * s.bucket.capacity),
+                )
+                for s in self._keys
+                if not exclude or s.key not in exclude
+            ]
+            wait = min(waits) if waits else float("inf")
+            if now + wait > deadline:
+                raise RateLimitTimeout("AMap rate limit: no key available within wait budget")
+            await asyncio.sleep(max(wait, 0.005))
+
+    def release(self, state: ApiKeyState) -> None:
+        """请求完成后归还并发计数"""
+        state.in_flight = max(0, state.in_flight - 1)
+
+    def cooldown(self, state: ApiKeyState, seconds: float) -> None:
+        """上游提示超限时，让该 Key 暂停 seconds 秒"""
+        state.cooldown_until = max(state.cooldown_until, time.monotonic() + seconds)
+        state.throttled += 1
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        timeout: float | None = None,
+        exclude: set[str] | None = None,
+        low_priority: bool = False,
+    ) -> AsyncIterator[ApiKeyState]:
+        """acquire/release 的上下文管理器形式"""
+        state = await self.acquire(timeout=timeout, exclude=exclude, low_priority=low_priority)
+        try:
+            yield state
+        finally:
+            self.release(state)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """各 Key 的限流状态（Key 仅显示末 4 位）"""
+        now = time.monotonic()
+        return [
+            {
+                "key": f"***{s.key[-4:]}",
+                "tokens": round(s.bucket.tokens, 2),
+                "in_flight": s.in_flight,
+                "requests": s.requests,
+                "throttled": s.throttled,
+                "cooldown_remaining": round(s.cooldown_remaining(now), 2),
+            }
+            for s in self._keys
+        ]
@@ -0,0 +1,301 @@
+"""Read-only, memory-mapped spatial POI snapshot shared by all worker processes.
+
+A snapshot directory (``<LOCAL_POI_INDEX_DIR>/<city>.snapshot/``) holds:
+
+- ``pois.npy``: structured array (coordinates, category code, rating, string offsets),
+  sorted by grid cell
+- ``strings.bin``: UTF-8 blob with each POI's id, name and address
+- ``cells.npy``: sorted grid cell keys with the POI range of each cell
+- ``meta.json``: city, grid size and the category code table
+
+Files are opened with ``mmap``, so every worker on a host shares one physical
+copy through the page cache and queries slice the arrays without copying.
+"""
+import json
+import math
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ...core.config import get_settings
+from .geo import EARTH_RADIUS_M, normalize_city
+
+SNAPSHOT_VERSION = 1
+
+# 网格边长（度），约 1 km
+DEFAULT_GRID_DEG = 0.01
+# 网格坐标偏移，保证 key 为非负整数
+_CELL_OFFSET = 1 << 20
+_CELL_SPAN = 1 << 21
+
+# 纬度 1 度约 111 km
+_M_PER_DEG = math.pi * EARTH_RADIUS_M / 180
+
+POI_DTYPE = np.dtype([
+    ("lng", "<f8"),
+    ("lat", "<f8"),
+    ("category", "<u2"),  # meta.json 中 categories 的下标，0 表示无类别
+    ("rating", "<f4"),  # 无评分时为 NaN
+    ("str_offset", "<u8"),
+    ("id_len", "<u2"),
+    ("name_len", "<u2"),
+    ("address_len", "<u2"),
+])
+
+CELL_DTYPE = np.dtype([
+    ("key", "<i8"),
+    ("start", "<u4"),
+    ("end", "<u4"),
+])
+
+
+def _cell_keys(lng: np.ndarray, lat: np.ndarray, grid_deg: float) -> np.ndarray:
+    gx = np.floor(lng / grid_deg).astype(np.int64) + _CELL_OFFSET
+    gy = np.floor(lat / grid_deg).astype(np.int64) + _CELL_OFFSET
+    return gx * _CELL_SPAN + gy
+
+
+def _parse_rating(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _utf8(value: Any, limit: int = 0xFFFF) -> bytes:
+    # 长度字段为 uint16，超长时在字符边界截断
+    data = str(value or "").encode("utf-8")
+    return data[:limit].decode("utf-8", "ignore").encode("utf-8")
+
+
+class PoiSnapshot:
+    """
+    内存映射的城市 POI 空间快照（只读）
+
+    POI 按网格 key 排序，同一经度列上相邻的网格在数组中连续，
+    bbox 查询每一列只需一次二分查找和一个切片，再用向量化掩码精确过滤。
+    """
+
+    def __init__(self, path: Path):
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported POI snapshot version in {path}")
+
+        self.path = path
+        self.city = meta["city"]
+        self.city_name = meta.get("city_name")
+        self.grid_deg = meta["grid_deg"]
+        self.categories: list[str] = meta["categories"]
+        self._category_codes = {c: i for i, c in enumerate(self.categories)}
+
+        self.pois = np.load(path / "pois.npy", mmap_mode="r")
+        self.cells = np.load(path / "cells.npy", mmap_mode="r")
+        self.strings = (
+            np.memmap(path / "strings.bin", dtype=np.uint8, mode="r")
+            if os.path.getsize(path / "strings.bin") else np.zeros(0, dtype=np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return len(self.pois)
+
+    @classmethod
+    def build(
+        cls,
+        city: str,
+        pois: list[dict[str, Any]],
+        directory: str | Path,
+        grid_deg: float = DEFAULT_GRID_DEG,
+    ) -> Path:
+        """将标准化 POI 写成快照目录（原子替换已有快照），返回目录路径"""
+        located = [
+            p for p in pois
+            if p.get("id") and p.get("location")
+            and (p["location"].get("lng") or p["location"].get("lat"))
+        ]
+        categories = [""] + sorted({p["category"] for p in located if p.get("category")})
+        codes = {c: i for i, c in enumerate(categories)}
+
+        records = np.zeros(len(located), dtype=POI_DTYPE)
+        blob = bytearray()
+        for i, poi in enumerate(located):
+            parts = [_utf8(poi["id"]), _utf8(poi.get("name")), _utf8(poi.get("address"))]
+            records[i] = (
+                poi["location"]["lng"],
+                poi["location"]["lat"],
+                codes.get(poi.get("category") or "", 0),
+                _parse_rating(poi.get("rating")),
+                len(blob),
+                len(parts[0]),
+                len(parts[1]),
+                len(parts[2]),
+            )
+            for part in parts:
+                blob += part
+
+        keys = _cell_keys(records["lng"], records["lat"], grid_deg)
+        order = np.argsort(keys, kind="stable")
+        records, keys = records[order], keys[order]
+        unique_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        cells = np.zeros(len(unique_keys), dtype=CELL_DTYPE)
+        cells["key"], cells["start"], cells["end"] = unique_keys, starts, starts + counts
+
+        target = snapshot_path(directory, city)
+        tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "pois.npy", records)
+        np.save(tmp / "cells.npy", cells)
+        (tmp / "strings.bin").write_bytes(bytes(blob))
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "city": normalize_city(city),
+            "city_name": next((p.get("city") for p in located if p.get("city")), city),
+            "grid_deg": grid_deg,
+            "categories": categories,
+            "count": len(records),
+        }
+        (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+        # 已打开旧快照的进程仍持有旧文件映射，不受替换影响
+        old = target.with_name(f"{target.name}.old-{os.getpid()}")
+        if target.exists():
+            target.rename(old)
+        tmp.rename(target)
+        shutil.rmtree(old, ignore_errors=True)
+        return target
+
+    def category_codes(self, categories: str | None) -> np.ndarray | None:
+        """高德类别字符串（"|" 分隔）-> 类别编码数组；None 表示不过滤"""
+        if not categories:
+            return None
+        return np.array(
+            [self._category_codes[c] for c in categories.split("|") if c in self._category_codes],
+            dtype=np.uint16,
+        )
+
+    def within_bbox(
+        self,
+        min_lng: float,
+        min_lat: float,
+        max_lng: float,
+        max_lat: float,
+        categories: str | None = None,
+    ) -> np.ndarray:
+        """矩形范围内的 POI 下标"""
+        if not len(self.cells):
+            return np.zeros(0, dtype=np.int64)
+        codes = self.category_codes(categories)
+        gx0, gy0 = (int(math.floor(v / self.grid_deg)) + _CELL_OFFSET for v in (min_lng, min_lat))
+        gx1, gy1 = (int(math.floor(v / self.grid_deg)) + _CELL_OFFSET for v in (max_lng, max_lat))
+
+        keys = self.cells["key"]
+        # 每一列 [gx*S+gy0, gx*S+gy1] 的网格在 cells 中连续，对应的 POI 在 pois 中也连续
+        gx = np.arange(gx0, gx1 + 1, dtype=np.int64)
+        lo = np.searchsorted(keys, gx * _CELL_SPAN + gy0, side="left")
+        hi = np.searchsorted(keys, gx * _CELL_SPAN + gy1, side="right")
+
+        found = []
+        for a, b in zip(lo, hi):
+            if a == b:
+                continue
+            start, end = int(self.cells["start"][a]), int(self.cells["end"][b - 1])
+            block = self.pois[start:end]
+            mask = (
+                (block["lng"] >= min_lng) & (block["lng"] <= max_lng)
+                & (block["lat"] >= min_lat) & (block["lat"] <= max_lat)
+            )
+            if codes is not None:
+                mask &= np.isin(block["category"], codes)
+            found.append(np.flatnonzero(mask) + start)
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def nearest(
+        self,
+        lng: float,
+        lat: float,
+        k: int = 10,
+        radius_m: float = 3000,
+        categories: str | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """距离最近的 k 个 POI（半径 radius_m 内），返回 (下标, 距离米)，按距离升序"""
+        dlat = radius_m / _M_PER_DEG
+        dlng = radius_m / (_M_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        idx = self.within_bbox(lng - dlng, lat - dlat, lng + dlng, lat + dlat, categories)
+        if not len(idx):
+            return idx, np.zeros(0)
+
+        rows = self.pois[idx]
+        phi1, phi2 = math.radians(lat), np.radians(rows["lat"])
+        dphi = phi2 - phi1
+        dlmb = np.radians(rows["lng"] - lng)
+        a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+        dist = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+        inside = dist <= radius_m
+        idx, dist = idx[inside], dist[inside]
+        if len(idx) > k:
+            top = np.argpartition(dist, k)[:k]
+            idx, dist = idx[top], dist[top]
+        order = np.argsort(dist, kind="stable")
+        return idx[order], dist[order]
+
+    def record(self, i: int) -> dict[str, Any]:
+        """第 i 个 POI 的标准化字典（与 AmapSource._normalize_poi 字段一致的子集）"""
+        row = self.pois[i]
+        offset = int(row["str_offset"])
+        lengths = (int(row["id_len"]), int(row["name_len"]), int(row["address_len"]))
+        parts = []
+        for length in lengths:
+            parts.append(self.strings[offset:offset + length].tobytes().decode("utf-8"))
+            offset += length
+        rating = float(row["rating"])
+        return {
+            "id": parts[0],
+            "name": parts[1],
+            "address": parts[2] or None,
+            "city": self.city_name,
+            "location": {"lng": float(row["lng"]), "lat": float(row["lat"])},
+            "category": self.categories[int(row["category"])] or None,
+            "rating": None if math.isnan(rating) else rating,
+            "source": "amap",
+        }
+
+
+def snapshot_path(directory: str | Path, city: str) -> Path:
+    return Path(directory) / f"{normalize_city(city)}.snapshot"
+
+
+# 城市 -> (上次检查时间, meta.json 的 mtime，不存在时为 None, 快照)
+_snapshots: dict[str, tuple[float, float | None, PoiSnapshot | None]] = {}
+
+
+def get_poi_snapshot(city: str) -> PoiSnapshot | None:
+    """
+    进程内缓存的城市快照（不存在时返回 None）
+
+    每隔 LOCAL_POI_INDEX_RECHECK_SECONDS 检查 meta.json 的 mtime：build 替换目录后重新映射新文件，
+    新建的快照无需重启即生效（旧映射在不再被引用后释放）。
+    """
+    settings = get_settings()
+    key = normalize_city(city)
+    now = time.monotonic()
+    cached = _snapshots.get(key)
+    if cached is not None and now - cached[0] < settings.LOCAL_POI_INDEX_RECHECK_SECONDS:
+        return cached[2]
+
+    path = snapshot_path(settings.LOCAL_POI_INDEX_DIR, key)
+    try:
+        mtime = (path / "meta.json").stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if cached is not None and cached[1] == mtime:
+        snapshot = cached[2]
+    else:
+        snapshot = PoiSnapshot(path) if mtime is not None else None
+    _snapshots[key] = (now, mtime, snapshot)
+    return snapshot
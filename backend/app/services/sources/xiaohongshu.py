@@ -1,5 +1,6 @@
 """Xiaohongshu data source integration for travel-tool backend."""
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -48,6 +49,7 @@ class XiaohongshuSource(BaseSource):
         category: str | None = None,
         page: int = 1,
         page_size: int = 20,
+        lightweight: bool = False,
     ) -> SourceResult:
         """
         搜索小红书内容
@@ -58,6 +60,7 @@ class XiaohongshuSource(BaseSource):
             category: 内容类别 (attraction/dining)
             page: 页码 (暂不支持分页)
             page_size: 每页数量
+            lightweight: 列表模式（爬虫结果无更轻量的接口，忽略）
         """
         try:
             # 组合搜索词
@@ -151,3 +154,9 @@ class XiaohongshuSource(BaseSource):
             return 4.0
         else:
             return 3.8
+
+
+@lru_cache()
+def get_xiaohongshu_source() -> XiaohongshuSource:
+    """进程内共享的 XiaohongshuSource 实例"""
+    return XiaohongshuSource()
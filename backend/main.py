@@ -1,8 +1,13 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import get_settings
 from app.db.base import init_db
-from app.api import auth, plans, content, analyze, config, favorites
+from app.api import auth, plans, content, analyze, config, favorites, geo, commute, media
+from app.services.content.warmer import get_cache_warmer, run_warmer_loop
+from app.services.media.thumbnails import get_thumbnail_cache
+from app.services.sources.amap import get_amap_source
+from app.services.sources.poi_store import run_compaction_loop
 
 settings = get_settings()
 
@@ -38,6 +43,9 @@ app.include_router(content.router, prefix="/api")
 app.include_router(analyze.router, prefix="/api")
 app.include_router(config.router, prefix="/api")
 app.include_router(favorites.router, prefix="/api")
+app.include_router(geo.router, prefix="/api")
+app.include_router(commute.router, prefix="/api")
+app.include_router(media.router, prefix="/api")
 
 
 @app.on_event("startup")
@@ -46,6 +54,37 @@ def on_startup():
     init_db()
 
 
+# Long-running background jobs started with the app
+_background_tasks: list[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def start_background_jobs():
+    """Start periodic maintenance jobs."""
+    amap = get_amap_source()
+    if amap.poi_store is not None:
+        _background_tasks.append(asyncio.create_task(run_compaction_loop(
+            amap.poi_store,
+            interval=settings.POI_STORE_COMPACT_INTERVAL_HOURS * 3600,
+            retention=settings.POI_STORE_RETENTION_DAYS * 86400,
+        )))
+    if settings.CACHE_WARMER_ENABLED:
+        _background_tasks.append(asyncio.create_task(run_warmer_loop(
+            get_cache_warmer(),
+            interval=settings.CACHE_WARMER_INTERVAL_MINUTES * 60,
+        )))
+
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    """Cancel background jobs on shutdown."""
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    await get_amap_source().aclose()
+    await get_thumbnail_cache().aclose()
+
+
 @app.get("/")
 def root():
     """Health check endpoint."""
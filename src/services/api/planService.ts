@@ -55,7 +55,8 @@ export const planService = {
    * Get a specific plan by ID
    */
   async getPlan(planId: string): Promise<ItineraryPlan> {
-    return apiClient.get<ItineraryPlan>(`/api/plans/${planId}`);
+    // Ask the backend to warm node details and commute legs at low priority
+    return apiClient.get<ItineraryPlan>(`/api/plans/${planId}?prefetch=true`);
   },
 
   /**
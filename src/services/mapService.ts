@@ -5,7 +5,8 @@ import {
   type RouteResult,
 } from "./mock/mockMapService";
 import { formatPOI } from "./utils/formatPOI";
-import type { AmapRegeoResponse } from "../types/amap";
+import { apiClient } from "./api/apiClient";
+import type { AmapRegeocode } from "../types/amap";
 
 const useMock =
   !import.meta.env.VITE_AMAP_KEY_WEB_JS ||
@@ -32,6 +33,13 @@ export interface AddressResult {
   address?: string; // 短地址（已去除省市）或完整地址
 }
 
+/** 后端 /api/geo/regeo 响应 */
+interface RegeoProxyResponse {
+  location: GeoLocation; // 量化后实际查询的坐标
+  formatted_address?: string | null;
+  regeocode: AmapRegeocode;
+}
+
 // 导出类型以便 formatPOI 使用
 export type { AmapRegeocode } from "../types/amap";
 
@@ -187,33 +195,16 @@ const realMapService: MapServiceApi = {
   },
 
   async fetchAddressByLocation(lng: number, lat: number): Promise<AddressResult> {
-    const key = AMAP_WEB_KEY;
-    if (!key) {
-      return mockMapService.fetchAddressByLocation(lng, lat);
-    }
-
-    const base =
-      typeof window !== "undefined" ? window.location.origin : "http://localhost";
-    const url = new URL("/amap/v3/geocode/regeo", base);
-    url.searchParams.set("key", key);
-    url.searchParams.set("location", `${lng},${lat}`);
-    url.searchParams.set("extensions", "all"); // 使用 all 获取 POI 和 AOI 信息
-    url.searchParams.set("radius", "1000"); // 搜索半径 1000 米
-    url.searchParams.set("batch", "false");
-    url.searchParams.set("roadlevel", "0");
-
+    // 通过后端代理逆地理编码：坐标按约 10 m 网格量化，所有用户共享缓存，
+    // 同时避免消耗前端 JS Key 的配额
     try {
-      const res = await fetch(url.toString());
-      if (!res.ok) {
-        console.error("AMap regeo failed", await res.text());
-        return mockMapService.fetchAddressByLocation(lng, lat);
-      }
-
-      const data: AmapRegeoResponse = await res.json();
+      const data = await apiClient.get<RegeoProxyResponse>(
+        `/api/geo/regeo?lng=${lng}&lat=${lat}`,
+        false
+      );
 
-      // 检查 API 响应状态
-      if (data.status !== "1" || !data.regeocode) {
-        console.warn("AMap regeo returned invalid status", data.info);
+      if (!data?.regeocode) {
+        console.warn("Backend regeo returned empty result");
         return mockMapService.fetchAddressByLocation(lng, lat);
       }
 